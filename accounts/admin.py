@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User
+from .models import User, Follow
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -8,4 +8,10 @@ class CustomUserAdmin(UserAdmin):
     list_filter = ('role', 'is_staff', 'is_active')
     fieldsets = UserAdmin.fieldsets + (
         ('Додаткова інформація', {'fields': ('role', 'bio', 'avatar', 'steam_profile')}),
-    )
\ No newline at end of file
+    )
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('follower', 'following', 'created_at')
+    search_fields = ('follower__username', 'following__username')
+    raw_id_fields = ('follower', 'following')
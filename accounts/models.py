@@ -20,3 +20,14 @@ class User(AbstractUser):
     
     def is_admin(self):
         return self.role == 'admin'
+
+class Follow(models.Model):
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
+    following = models.ForeignKey(User, on_delete=models.CASCADE, related_name='followers')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['follower', 'following']
+
+    def __str__(self):
+        return f"{self.follower.username} -> {self.following.username}"
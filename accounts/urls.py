@@ -18,6 +18,7 @@ urlpatterns = [
     # Профіль користувача
     path('profile/<int:pk>/', views.ProfileView.as_view(), name='profile'),
     path('profile/edit/', views.ProfileUpdateView.as_view(), name='profile_edit'),
+    path('profile/<int:pk>/follow/', views.FollowUserView.as_view(), name='follow'),
     
     # Список користувачів (тільки для адмінів/модераторів)
     path('users/', views.UserListView.as_view(), name='user_list'),
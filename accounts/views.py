@@ -2,7 +2,12 @@ from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, UpdateView, DetailView, ListView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
-from .models import User
+from django.shortcuts import get_object_or_404, redirect
+from django.http import JsonResponse
+from django.views import View
+from posts import timeline
+from posts.querysets import post_cards
+from .models import User, Follow
 from .forms import CustomUserCreationForm, UserProfileForm
 
 class SignUpView(CreateView):
@@ -27,13 +32,41 @@ class ProfileView(LoginRequiredMixin, DetailView):
         context['is_own_profile'] = self.request.user == user
         
         # Додаємо доповнення до профілю
-        context['posts'] = user.posts.all()[:10] if hasattr(user, 'posts') else []
+        context['posts'] = post_cards(user.posts.all()).order_by('-created_at')[:10]
         context['portfolio_items'] = user.portfolio_items.filter(is_approved=True)[:6] if hasattr(user, 'portfolio_items') else []
         context['gallery_items'] = user.gallery_items.filter(is_approved=True)[:6] if hasattr(user, 'gallery_items') else []
         context['topics'] = user.forum_topics.all()[:5] if hasattr(user, 'forum_topics') else []
         
+        # Підписки
+        context['followers_count'] = user.followers.count()
+        context['following_count'] = user.following.count()
+        context['is_following'] = (
+            not context['is_own_profile'] and
+            Follow.objects.filter(follower=self.request.user, following=user).exists()
+        )
+        
         return context
 
+class FollowUserView(LoginRequiredMixin, View):
+    def post(self, request, pk):
+        author = get_object_or_404(User, pk=pk)
+        if author == request.user:
+            messages.error(request, 'Не можна підписатися на себе.')
+            return redirect('accounts:profile', pk=pk)
+        
+        if Follow.objects.filter(follower=request.user, following=author).exists():
+            timeline.unfollow(request.user, author)
+            following = False
+        else:
+            timeline.follow(request.user, author)
+            following = True
+        
+        # Для AJAX запитів
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({'following': following})
+        
+        return redirect('accounts:profile', pk=pk)
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     form_class = UserProfileForm
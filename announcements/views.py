@@ -3,6 +3,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
+from core.facets import get_facets
 from .models import Announcement
 from .forms import AnnouncementForm
 
@@ -18,6 +19,7 @@ class AnnouncementListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['pinned_announcements'] = Announcement.objects.filter(is_pinned=True)
+        context['announcement_types'] = get_facets('announcements:announcement_type')['announcements:announcement_type']
         return context
 
 class AnnouncementDetailView(DetailView):
@@ -102,14 +104,10 @@ class AnnouncementTypeListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Отримуємо відображення типу
-        type_choices = dict([
-            ('tournament', 'Турніри'),
-            ('server', 'Новини сервера'),
-            ('rules', 'Правила'),
-            ('update', 'Оновлення'),
-        ])
+        announcement_types = get_facets('announcements:announcement_type')['announcements:announcement_type']
+        type_choices = {value: label for value, label, _ in announcement_types}
         context['type_name'] = type_choices.get(self.kwargs.get('announcement_type'), 'Невідомий тип')
+        context['announcement_types'] = announcement_types
         context['announcement_type'] = self.kwargs.get('announcement_type')
         return context
 
@@ -1,3 +1,24 @@
 from django.contrib import admin
+from django.utils import timezone
+from .models import FileInfo, Job
 
-# Register your models here.
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'queue', 'status', 'attempts', 'run_after', 'finished_at')
+    list_filter = ('status', 'queue', 'name')
+    readonly_fields = ('locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at')
+    actions = ['retry']
+
+    @admin.action(description='Повторити вибрані задачі')
+    def retry(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, attempts=0, run_after=timezone.now(), finished_at=None, last_error='',
+        )
+
+
+@admin.register(FileInfo)
+class FileInfoAdmin(admin.ModelAdmin):
+    list_display = ('model', 'object_id', 'field', 'name', 'size', 'scan_status', 'inspected_at')
+    list_filter = ('model', 'scan_status')
+    search_fields = ('name', 'sha256')
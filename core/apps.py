@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import facets, fragments, images, jobs, search, site_counters, uploads  # noqa: F401
+        search.register_defaults()
+        site_counters.register_defaults()
+        facets.register_defaults()
+        images.register_defaults()
+        uploads.register_defaults()
+        jobs.autodiscover()
@@ -0,0 +1,55 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.views.generic import View
+from django.views.generic.base import ContextMixin, TemplateResponseMixin
+
+
+class AsyncTemplateView(TemplateResponseMixin, ContextMixin, View):
+    """TemplateView з async get: контекст збирається в aget_context_data.
+
+    Async ORM і кеш Django виконуються через sync_to_async в одному sync-потоці,
+    тож запити view йдуть послідовно — швидше вони від цього не стають.
+    Шаблон рендериться вже після view (Django робить це через sync_to_async),
+    тож ліниві звертання в шаблоні до БД допустимі.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        context = await self.aget_context_data(**kwargs)
+        return self.render_to_response(context)
+
+    async def aget_context_data(self, **kwargs):
+        return self.get_context_data(**kwargs)
+
+
+class AsyncCursorListView(AsyncTemplateView):
+    """Async-аналог ListView + CursorPaginationMixin: сторінка вибирається
+    через async ORM. Клас має також наслідувати core.pagination.CursorPaginationMixin."""
+
+    model = None
+    queryset = None
+    paginate_by = 20
+    context_object_name = 'object_list'
+
+    def get_queryset(self):
+        # Як у ListView; у перевизначеннях self.user уже завантажено через request.auser()
+        if self.queryset is not None:
+            return self.queryset.all()
+        if self.model is not None:
+            return self.model._default_manager.all()
+        raise ImproperlyConfigured(
+            f'{self.__class__.__name__} не має queryset: задайте model, queryset або get_queryset().'
+        )
+
+    async def aget_context_data(self, **kwargs):
+        context = await super().aget_context_data(**kwargs)
+        self.user = await self.request.auser()
+        paginator, page, object_list, is_paginated = await self.apaginate_queryset(
+            self.get_queryset(), self.paginate_by
+        )
+        context.update({
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': is_paginated,
+            'object_list': object_list,
+            self.context_object_name: object_list,
+        })
+        return context
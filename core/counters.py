@@ -0,0 +1,108 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+logger = logging.getLogger(__name__)
+
+# Як часто фоновий потік скидає накопичені інкременти в БД (секунди)
+COUNTER_FLUSH_INTERVAL = getattr(settings, 'COUNTER_FLUSH_INTERVAL', 5)
+# Скільки різних об'єктів можна накопичити до примусового скидання
+COUNTER_MAX_PENDING = getattr(settings, 'COUNTER_MAX_PENDING', 1000)
+
+_registry = []
+
+
+class BufferedCounter:
+    """Write-behind лічильник для поля моделі.
+
+    Інкременти накопичуються в пам'яті процесу і пачками записуються
+    одним UPDATE ... SET field = field + n на кожну різну величину n,
+    тож паралельні воркери не перезаписують значення одне одного.
+    """
+
+    def __init__(self, model, field, flush_interval=COUNTER_FLUSH_INTERVAL, max_pending=COUNTER_MAX_PENDING):
+        self.model = model
+        self.field = field
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        _registry.append(self)
+
+    def incr(self, pk, amount=1):
+        with self._lock:
+            self._pending[pk] += amount
+            overflow = len(self._pending) >= self.max_pending
+        if overflow or not self.flush_interval:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def pending(self, pk):
+        with self._lock:
+            return self._pending.get(pk, 0)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, defaultdict(int)
+        if not batch:
+            return 0
+
+        by_amount = defaultdict(list)
+        for pk, amount in batch.items():
+            if amount:
+                by_amount[amount].append(pk)
+
+        try:
+            with transaction.atomic():
+                for amount, pks in by_amount.items():
+                    value = F(self.field) + amount
+                    if amount < 0:
+                        # Лічильники не від'ємні: якщо +1 загубився (SIGKILL), -1 не має
+                        # порушити обмеження поля й вічно повертатися в буфер
+                        value = Greatest(value, Value(0))
+                    self.model.objects.filter(pk__in=pks).update(**{self.field: value})
+        except DatabaseError:
+            # Повертаємо інкременти в буфер, щоб не втратити їх
+            with self._lock:
+                for pk, amount in batch.items():
+                    self._pending[pk] += amount
+            logger.exception('Не вдалося скинути лічильник %s.%s', self.model.__name__, self.field)
+            return 0
+        return len(batch)
+
+    def _ensure_flusher(self):
+        # Після fork() потік батьківського процесу не успадковується
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+        thread = threading.Thread(target=self._run, name=f'counter-flush-{self.model.__name__}', daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            finally:
+                connections.close_all()
+
+
+def flush_all():
+    return sum(counter.flush() for counter in _registry)
+
+
+atexit.register(flush_all)
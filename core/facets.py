@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+
+# Скільки тримати лічильники фасетів, секунди; зміни моделі скидають їх раніше
+FACET_CACHE_TIMEOUT = getattr(settings, 'FACET_CACHE_TIMEOUT', 3600)
+
+
+class FacetSpec:
+    def __init__(self, name, model, field, filters=None):
+        self.name = name
+        self.model = model
+        self.field = field
+        # Умова, за якою рядок потрапляє у фасет (напр. is_approved=True)
+        self.filters = filters or {}
+
+    @property
+    def cache_key(self):
+        return f'facet:{self.name}'
+
+    @property
+    def choices(self):
+        return self.model._meta.get_field(self.field).flatchoices
+
+    def compute(self):
+        # Один GROUP BY замість COUNT(*) на кожен варіант вибору
+        rows = (
+            self.model._default_manager.filter(**self.filters).order_by()
+            .values_list(self.field).annotate(n=Count('pk'))
+        )
+        counts = {value: 0 for value, _ in self.choices}
+        counts.update(dict(rows))
+        return counts
+
+    def items(self, counts):
+        return [(value, label, counts.get(value, 0)) for value, label in self.choices]
+
+
+_registry = {}
+
+
+def register(name, model, field, filters=None):
+    """Заводить фасет і скидає його кеш на post_save/post_delete моделі.
+
+    queryset.update() сигналів не шле — після масових змін викликайте
+    invalidate_model.
+    """
+    spec = FacetSpec(name, model, field, filters)
+    _registry[name] = spec
+    uid = f'facets-{model._meta.label_lower}'
+    post_save.connect(_invalidate, sender=model, dispatch_uid=f'{uid}-save')
+    post_delete.connect(_invalidate, sender=model, dispatch_uid=f'{uid}-delete')
+    return spec
+
+
+def _invalidate(sender, **kwargs):
+    invalidate_model(sender)
+
+
+def invalidate_model(model):
+    keys = [spec.cache_key for spec in _registry.values() if spec.model is model]
+    if keys:
+        cache.delete_many(keys)
+
+
+def get_counts(*names):
+    """{фасет: {значення: кількість}} одним зверненням до кешу."""
+    specs = [_registry[name] for name in names]
+    cached = cache.get_many([spec.cache_key for spec in specs])
+    result = {}
+    missing = {}
+    for spec in specs:
+        if spec.cache_key in cached:
+            result[spec.name] = cached[spec.cache_key]
+        else:
+            result[spec.name] = missing[spec.cache_key] = spec.compute()
+    if missing:
+        cache.set_many(missing, FACET_CACHE_TIMEOUT)
+    return result
+
+
+def get_facets(*names):
+    """{фасет: [(значення, назва, кількість), ...]} у порядку choices."""
+    counts = get_counts(*names)
+    return {name: _registry[name].items(counts[name]) for name in names}
+
+
+def register_defaults():
+    from announcements.models import Announcement
+    from events.models import Event
+    from gallery.models import MediaItem
+    from materials.models import Material
+    from portfolio.models import PortfolioItem
+
+    register('materials:category', Material, 'category')
+    register('gallery:media_type', MediaItem, 'media_type', {'is_approved': True})
+    register('portfolio:item_type', PortfolioItem, 'item_type', {'is_approved': True})
+    register('portfolio:role', PortfolioItem, 'role', {'is_approved': True})
+    register('events:event_type', Event, 'event_type', {'is_active': True})
+    register('announcements:announcement_type', Announcement, 'announcement_type')
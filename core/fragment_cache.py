@@ -0,0 +1,138 @@
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+# Бекенд кешу для фрагментів (див. CACHES у settings). Версії моделей живуть
+# у ньому ж: з кешем у пам'яті процесу bump() бачить лише процес, що виконав
+# запис, а решта віддає старий фрагмент до кінця його TTL
+FRAGMENT_CACHE_ALIAS = getattr(settings, 'FRAGMENT_CACHE_ALIAS', 'default')
+# TTL окремих фрагментів, секунди: {'home:latest_posts': 30, ...}
+FRAGMENT_CACHE_TTLS = getattr(settings, 'FRAGMENT_CACHE_TTLS', {})
+DEFAULT_TTL = 60
+# Скільки ще тримаємо застаріле значення, поки один процес його перераховує
+STALE_GRACE = 300
+LOCK_TIMEOUT = 10
+
+PROCESS_LOCAL_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache')
+
+_fragments = {}
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get(FRAGMENT_CACHE_ALIAS, {}).get('BACKEND')
+    if backend in PROCESS_LOCAL_BACKENDS:
+        return [checks.Warning(
+            f'Кеш фрагментів "{FRAGMENT_CACHE_ALIAS}" живе в пам\'яті процесу: інші воркери '
+            'бачитимуть зміни лише після TTL фрагмента.',
+            hint='Задайте REDIS_URL або CACHE_DIR.',
+            id='core.W001',
+        )]
+    return []
+
+
+def _cache():
+    return caches[FRAGMENT_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return f'fragver:{model._meta.label_lower}'
+
+
+def bump(sender, **kwargs):
+    # Версія — час зміни в нс: після витіснення ключа з кешу вона не повториться
+    _cache().set(_version_key(sender), time.time_ns(), None)
+
+
+class Fragment:
+    def __init__(self, name, build, depends_on=(), ttl=DEFAULT_TTL):
+        self.name = name
+        self.build = build
+        self.depends_on = tuple(depends_on)
+        self.default_ttl = ttl
+
+    @property
+    def ttl(self):
+        return FRAGMENT_CACHE_TTLS.get(self.name, self.default_ttl)
+
+    def key(self):
+        cache = _cache()
+        version_keys = [_version_key(model) for model in self.depends_on]
+        versions = cache.get_many(version_keys)
+        missing = {key: time.time_ns() for key in version_keys if key not in versions}
+        if missing:
+            cache.set_many(missing, None)
+            versions.update(missing)
+        signature = '.'.join(str(versions[key]) for key in version_keys)
+        return f'frag:{self.name}:{signature}'
+
+    def get(self):
+        cache = _cache()
+        key = self.key()
+        stale_key = f'frag:{self.name}:stale'
+        cached = cache.get_many([key, stale_key])
+
+        entry = cached.get(key)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+
+        # Захист від stampede: перераховує лише той, хто взяв блокування,
+        # решта віддає попереднє значення
+        lock_key = f'{key}:lock'
+        if cache.add(lock_key, 1, LOCK_TIMEOUT):
+            try:
+                value = self.build()
+                ttl = self.ttl
+                cache.set_many({
+                    key: (time.time() + ttl, value),
+                    stale_key: value,
+                }, ttl + STALE_GRACE)
+                return value
+            finally:
+                cache.delete(lock_key)
+
+        if entry is not None:
+            return entry[1]
+        if stale_key in cached:
+            return cached[stale_key]
+        logger.debug('Фрагмент %s перераховується без кешу', self.name)
+        return self.build()
+
+
+def fragment(name, depends_on=(), ttl=DEFAULT_TTL):
+    """Реєструє функцію-будівник фрагмента; версії моделей з depends_on
+    змінюються на post_save/post_delete, що робить старі ключі недійсними."""
+    def decorator(build):
+        _fragments[name] = Fragment(name, build, depends_on, ttl)
+        for model in depends_on:
+            uid = f'fragment-cache-{model._meta.label_lower}'
+            post_save.connect(bump, sender=model, dispatch_uid=f'{uid}-save')
+            post_delete.connect(bump, sender=model, dispatch_uid=f'{uid}-delete')
+        return build
+    return decorator
+
+
+def get_fragment(name):
+    return _fragments[name].get()
+
+
+async def aget_fragment(name):
+    return await sync_to_async(_fragments[name].get)()
+
+
+async def aget_fragments(*names):
+    """Кілька фрагментів одним викликом sync_to_async; повертає {назва: значення}.
+
+    Фрагменти читаються послідовно в одному sync-потоці: asyncio.gather над
+    thread_sensitive-викликами нічого не пришвидшив би, а окремий потік на
+    фрагмент — це окреме з'єднання з БД поза транзакцією й керуванням запиту.
+    Промахи й так рідкісні: фрагменти здебільшого віддає кеш.
+    """
+    return await sync_to_async(lambda: {name: _fragments[name].get() for name in names})()
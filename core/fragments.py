@@ -0,0 +1,56 @@
+from django.db.models import Q
+from django.utils import timezone
+
+from announcements.models import Announcement
+from events.models import Event
+from forum.models import Topic
+from gallery.models import MediaItem
+from portfolio.models import PortfolioItem
+from posts import trending
+from posts.models import Hashtag, Post
+from votes.models import Vote
+from . import site_counters
+from .fragment_cache import fragment
+
+
+# Фрагменти головної сторінки. Значення мають бути готовими списками,
+# а не лінивими QuerySet, щоб у кеш потрапляли дані, а не запит
+
+@fragment('home:latest_posts', depends_on=[Post], ttl=30)
+def latest_posts():
+    return list(Post.objects.select_related('author').order_by('-created_at')[:5])
+
+
+@fragment('home:trending_hashtags', depends_on=[Post, Hashtag], ttl=60)
+def trending_hashtags():
+    return trending.top_hashtags()
+
+
+@fragment('home:upcoming_events', depends_on=[Event], ttl=300)
+def upcoming_events():
+    return list(Event.objects.filter(date__gte=timezone.now(), is_active=True).order_by('date')[:3])
+
+
+@fragment('home:latest_announcements', depends_on=[Announcement], ttl=300)
+def latest_announcements():
+    return list(Announcement.objects.filter(is_pinned=True).order_by('-created_at')[:3])
+
+
+@fragment('home:active_votes', depends_on=[Vote], ttl=120)
+def active_votes():
+    now = timezone.now()
+    return list(Vote.objects.filter(is_active=True).filter(Q(end_date__isnull=True) | Q(end_date__gt=now))[:3])
+
+
+# Лічильники читаються з core.SiteCounter одним запитом по ключу.
+# User не входить у залежності: last_login оновлюється при кожному вході
+@fragment('home:stats', depends_on=[Post, Topic, MediaItem, PortfolioItem], ttl=300)
+def stats():
+    counters = site_counters.get_counters()
+    return {
+        'users_count': counters['users'],
+        'posts_count': counters['posts'],
+        'topics_count': counters['topics'],
+        'gallery_count': counters['gallery_approved'],
+        'portfolio_count': counters['portfolio_approved'],
+    }
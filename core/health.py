@@ -0,0 +1,70 @@
+import os
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+
+# Ліміт часу на SELECT 1 у /readyz, мілісекунди (діє на PostgreSQL)
+READYZ_DB_TIMEOUT_MS = getattr(settings, 'READYZ_DB_TIMEOUT_MS', 1000)
+
+# Після першої успішної перевірки міграції в цьому процесі вже не змінюються
+_migrations_applied = False
+
+
+def check_database():
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('SET LOCAL statement_timeout = %s', [int(READYZ_DB_TIMEOUT_MS)])
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+    except DatabaseError as exc:
+        return False, str(exc)
+    return True, 'ok'
+
+
+def check_migrations():
+    global _migrations_applied
+    if _migrations_applied:
+        return True, 'ok'
+    try:
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    except DatabaseError as exc:
+        return False, str(exc)
+    if plan:
+        return False, f'{len(plan)} unapplied'
+    _migrations_applied = True
+    return True, 'ok'
+
+
+def check_media_dir():
+    media_root = str(settings.MEDIA_ROOT)
+    if not os.path.isdir(media_root):
+        return False, 'missing'
+    if not os.access(media_root, os.R_OK | os.W_OK):
+        return False, 'not writable'
+    return True, 'ok'
+
+
+READINESS_CHECKS = {
+    'database': check_database,
+    'migrations': check_migrations,
+    'media': check_media_dir,
+}
+
+
+def readiness():
+    """Повертає (готовий?, {перевірка: статус}). Міграції перевіряються
+    лише після того, як БД відповіла."""
+    results = {}
+    ready = True
+    for name, check in READINESS_CHECKS.items():
+        if name == 'migrations' and not ready:
+            results[name] = 'skipped'
+            continue
+        ok, detail = check()
+        results[name] = detail
+        ready = ready and ok
+    return ready, results
@@ -0,0 +1,161 @@
+import hashlib
+import logging
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import jobs
+from .uploads import on_new_file
+
+logger = logging.getLogger(__name__)
+
+# Пресети похідних зображень: назва -> (ширина, висота, обрізати до квадрата/розміру)
+IMAGE_VARIANTS = getattr(settings, 'IMAGE_VARIANTS', {
+    'square_sm': (96, 96, True),      # аватари й іконки 48px на екранах 2x
+    'square_lg': (320, 320, True),    # аватар у профілі
+    'thumb': (640, 640, False),       # картки й сітки
+    'large': (1600, 1600, False),     # сторінка перегляду
+})
+# Формати кожного варіанта: WebP для сучасних браузерів, JPEG як запасний
+IMAGE_VARIANT_FORMATS = {'webp': ('WEBP', 80), 'jpg': ('JPEG', 82)}
+
+_registry = []
+# Шляхи варіантів, які вже точно є у сховищі
+_known_variants = set()
+KNOWN_VARIANTS_LIMIT = 10000
+# Скільки пам'ятати відсутній варіант, секунди: інакше кожен рендер питає
+# storage.exists() (на віддаленому сховищі — HTTP-запит). Задача генерації
+# знімає позначку одразу, тож затримка лише на кешах, що не спільні між процесами
+IMAGE_VARIANT_MISS_TIMEOUT = getattr(settings, 'IMAGE_VARIANT_MISS_TIMEOUT', 60)
+
+
+class ImageFieldSpec:
+    def __init__(self, model, field, presets):
+        self.model = model
+        self.field = field
+        self.presets = tuple(presets)
+
+    def queryset(self):
+        return self.model._default_manager.exclude(**{self.field: ''}).exclude(**{f'{self.field}__isnull': True})
+
+
+def variant_name(name, preset, ext):
+    return f'variants/{name}.{preset}.{ext}'
+
+
+def _miss_key(path):
+    return 'images:missing:' + hashlib.md5(path.encode()).hexdigest()
+
+
+def variant_exists(storage, path):
+    if path in _known_variants:
+        return True
+    if cache.get(_miss_key(path)):
+        return False
+    if not storage.exists(path):
+        cache.set(_miss_key(path), 1, IMAGE_VARIANT_MISS_TIMEOUT)
+        return False
+    if len(_known_variants) >= KNOWN_VARIANTS_LIMIT:
+        _known_variants.clear()
+    _known_variants.add(path)
+    return True
+
+
+def _render(image, width, height, crop, image_format, quality):
+    if crop:
+        result = ImageOps.fit(image, (width, height), Image.LANCZOS)
+    else:
+        result = image.copy()
+        result.thumbnail((width, height), Image.LANCZOS)  # не збільшує менші зображення
+    if image_format == 'JPEG' and result.mode != 'RGB':
+        background = Image.new('RGB', result.size, (255, 255, 255))
+        rgba = result.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        result = background
+    buffer = BytesIO()
+    result.save(buffer, image_format, quality=quality, optimize=image_format == 'JPEG')
+    return buffer.getvalue()
+
+
+def generate_variants(storage, name, presets, force=False):
+    """Створює WebP/JPEG-варіанти файлу name. Не-зображення (відео, демки)
+    пропускаються. Повертає список створених шляхів."""
+    try:
+        with storage.open(name, 'rb') as fh:
+            image = Image.open(fh)
+            image.seek(0)  # для анімацій — перший кадр
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (UnidentifiedImageError, FileNotFoundError, OSError):
+        return []
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    created = []
+    for preset in presets:
+        width, height, crop = IMAGE_VARIANTS[preset]
+        for ext, (image_format, quality) in IMAGE_VARIANT_FORMATS.items():
+            path = variant_name(name, preset, ext)
+            if storage.exists(path):
+                if not force:
+                    continue
+                storage.delete(path)
+            storage.save(path, ContentFile(_render(image, width, height, crop, image_format, quality)))
+            created.append(path)
+    cache.delete_many([_miss_key(path) for path in created])
+    return created
+
+
+def generate_for(model, field, name, presets):
+    """Задача images.generate_variants: сховище береться з поля моделі."""
+    storage = apps.get_model(model)._meta.get_field(field).storage
+    return generate_variants(storage, name, presets)
+
+
+def register(model, field, presets):
+    """Ставить у чергу генерацію варіантів щоразу, як у полі field з'являється новий файл."""
+    spec = ImageFieldSpec(model, field, presets)
+    _registry.append(spec)
+
+    def schedule(instance, field_file):
+        jobs.enqueue(
+            'images.generate_variants',
+            model=model._meta.label_lower, field=field, name=field_file.name, presets=list(spec.presets),
+        )
+
+    on_new_file(model, field, schedule, uid='image-variants')
+    return spec
+
+
+def registered_fields():
+    return list(_registry)
+
+
+def variant_url(field_file, preset, ext='webp'):
+    """URL варіанта, якщо він уже згенерований, інакше оригіналу."""
+    if not field_file:
+        return ''
+    path = variant_name(field_file.name, preset, ext)
+    if variant_exists(field_file.storage, path):
+        return field_file.storage.url(path)
+    return field_file.url
+
+
+def register_defaults():
+    from django.contrib.auth import get_user_model
+    from events.models import Event
+    from gallery.models import MediaItem
+    from portfolio.models import PortfolioItem
+    from posts.models import Post
+    from votes.models import VoteOption
+
+    register(get_user_model(), 'avatar', ['square_sm', 'square_lg'])
+    register(MediaItem, 'file', ['thumb', 'large'])
+    register(PortfolioItem, 'file', ['thumb', 'large'])
+    register(Event, 'image', ['thumb', 'large'])
+    register(VoteOption, 'image', ['square_sm', 'thumb'])
+    register(Post, 'media_file', ['thumb', 'large'])
@@ -0,0 +1,186 @@
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Ліміти читаються з settings на кожен запит, щоб їх можна було
+# вмикати в тестах через override_settings:
+#   QUERY_BUDGET — загальний ліміт запитів до БД (None — без ліміту)
+#   QUERY_BUDGETS — ліміти окремих view: {'posts:post_list': 10, ...}
+#   QUERY_BUDGET_STRICT — перевищення піднімає QueryBudgetExceeded
+
+# Запити, довші за цей поріг (мс), логуються окремо
+SLOW_QUERY_MS = getattr(settings, 'SLOW_QUERY_MS', 200)
+SERVER_TIMING_HEADER = getattr(settings, 'SERVER_TIMING_HEADER', True)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    """Обгортка для connection.execute_wrapper: рахує запити та їх час."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += duration
+            if duration * 1000 >= SLOW_QUERY_MS:
+                self.slow_queries.append({'sql': sql[:500], 'ms': round(duration * 1000, 1)})
+
+
+class ViewStats:
+    """Накопичені метрики по view в межах процесу."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, metrics, total_time, over_budget):
+        with self._lock:
+            row = self._views.setdefault(view_name, {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'db_ms': 0.0,
+                'render_ms': 0.0, 'total_ms': 0.0, 'max_total_ms': 0.0,
+                'slow_queries': 0, 'over_budget': 0,
+            })
+            row['requests'] += 1
+            row['queries'] += metrics.queries
+            row['max_queries'] = max(row['max_queries'], metrics.queries)
+            row['db_ms'] += metrics.db_time * 1000
+            row['render_ms'] += metrics.render_time * 1000
+            row['total_ms'] += total_time * 1000
+            row['max_total_ms'] = max(row['max_total_ms'], total_time * 1000)
+            row['slow_queries'] += len(metrics.slow_queries)
+            row['over_budget'] += int(over_budget)
+
+    def snapshot(self):
+        with self._lock:
+            views = {name: dict(row) for name, row in self._views.items()}
+        for row in views.values():
+            requests = row['requests']
+            row['avg_queries'] = round(row['queries'] / requests, 2)
+            row['avg_db_ms'] = round(row['db_ms'] / requests, 2)
+            row['avg_render_ms'] = round(row['render_ms'] / requests, 2)
+            row['avg_total_ms'] = round(row['total_ms'] / requests, 2)
+            for key in ('db_ms', 'render_ms', 'total_ms', 'max_total_ms'):
+                row[key] = round(row[key], 2)
+        return views
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+view_stats = ViewStats()
+
+
+def budget_for(view_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view_name, getattr(settings, 'QUERY_BUDGET', None))
+
+
+class QueryInstrumentationMiddleware:
+    """Кількість запитів, час БД і рендеру шаблону для кожного запиту.
+
+    Пише Server-Timing, JSON-рядок у лог core.instrumentation та агрегати
+    для /core/metrics/queries/.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Під ASGI ланцюжок асинхронний — не змушуємо Django перемикати потоки
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        request._query_metrics = metrics
+        start = time.perf_counter()
+        with self.wrap_connections(metrics):
+            response = self.get_response(request)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        request._query_metrics = metrics
+        start = time.perf_counter()
+        with self.wrap_connections(metrics):
+            response = await self.get_response(request)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    def wrap_connections(self, metrics):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(metrics))
+        return stack
+
+    def finish(self, request, response, metrics, total_time):
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else None
+        budget = budget_for(view_name)
+        over_budget = budget is not None and metrics.queries > budget
+
+        if SERVER_TIMING_HEADER:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+                f'tpl;dur={metrics.render_time * 1000:.1f}',
+                f'total;dur={total_time * 1000:.1f}',
+            ])
+
+        if view_name:
+            view_stats.record(view_name, metrics, total_time, over_budget)
+
+        log_level = logging.WARNING if over_budget or metrics.slow_queries else logging.INFO
+        if logger.isEnabledFor(log_level):
+            logger.log(log_level, json.dumps({
+                'event': 'request',
+                'method': request.method,
+                'path': request.path,
+                'view': view_name,
+                'status': response.status_code,
+                'queries': metrics.queries,
+                'budget': budget,
+                'db_ms': round(metrics.db_time * 1000, 1),
+                'render_ms': round(metrics.render_time * 1000, 1),
+                'total_ms': round(total_time * 1000, 1),
+                'slow_queries': metrics.slow_queries,
+            }, ensure_ascii=False))
+
+        if over_budget and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(f'{view_name}: {metrics.queries} запитів при ліміті {budget}')
+        return response
+
+    def process_template_response(self, request, response):
+        # Рендер TemplateResponse відбувається після цього хука, тож міряємо
+        # від нього до post-render callback
+        metrics = request._query_metrics
+        start = time.perf_counter()
+
+        def finish(rendered):
+            metrics.render_time += time.perf_counter() - start
+
+        response.add_post_render_callback(finish)
+        return response
@@ -0,0 +1,17 @@
+"""Точки входу дочірніх процесів воркера (core.jobs.Worker).
+
+Процеси стартують через spawn, тож модуль не імпортує моделей до
+django.setup() і не успадковує з'єднань з БД батьківського процесу.
+"""
+import os
+
+
+def init():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'group_project.settings')
+    import django
+    django.setup()
+
+
+def execute(name, payload):
+    from core.jobs import execute as execute_job
+    return execute_job(name, payload)
@@ -0,0 +1,274 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from . import job_process
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# JOBS_EAGER читається на кожен виклик (щоб працював override_settings):
+# True — задачі виконуються одразу після коміту в тому ж процесі, без черги
+# (зручно для локальної розробки без воркера)
+
+# Ліміт одночасних задач окремих черг у воркері: {'images': 2, ...}
+JOB_QUEUE_CONCURRENCY = getattr(settings, 'JOB_QUEUE_CONCURRENCY', {})
+# Затримка перед повтором: JOB_RETRY_DELAY * 2**(спроба-1), але не більше JOB_RETRY_MAX_DELAY
+JOB_RETRY_DELAY = getattr(settings, 'JOB_RETRY_DELAY', 10)
+JOB_RETRY_MAX_DELAY = getattr(settings, 'JOB_RETRY_MAX_DELAY', 3600)
+# Задача, чий locked_at не оновлювався довше за цей час, вважається покинутою
+# (воркер упав або його вбили)
+JOB_TIMEOUT = getattr(settings, 'JOB_TIMEOUT', 600)
+# Як часто воркер оновлює locked_at своїх задач і перевіряє покинуті, секунди
+JOB_HEARTBEAT_INTERVAL = getattr(settings, 'JOB_HEARTBEAT_INTERVAL', 60)
+# Скільки днів тримати виконані задачі
+JOB_RETENTION_DAYS = getattr(settings, 'JOB_RETENTION_DAYS', 7)
+
+_tasks = {}
+
+
+class Task:
+    def __init__(self, name, func, queue='default', max_attempts=3, cpu_bound=False):
+        self.name = name
+        self.func = func
+        self.queue = queue
+        self.max_attempts = max_attempts
+        # CPU-важкі задачі воркер виконує в пулі процесів, а не потоків
+        self.cpu_bound = cpu_bound
+
+    def enqueue(self, **payload):
+        return enqueue(self.name, **payload)
+
+
+def task(name, queue='default', max_attempts=3, cpu_bound=False):
+    """Реєструє функцію як фонову задачу. Аргументи задачі — лише JSON-значення."""
+    def decorator(func):
+        _tasks[name] = Task(name, func, queue, max_attempts, cpu_bound)
+        return func
+    return decorator
+
+
+def autodiscover():
+    # Задачі оголошуються в модулях tasks.py застосунків
+    autodiscover_modules('tasks')
+
+
+def get_task(name):
+    return _tasks[name]
+
+
+def enqueue(task_name, /, priority=0, delay=None, **payload):
+    """Ставить задачу в чергу. Рядок Job створюється в поточній транзакції,
+    тож воркер побачить задачу лише після її коміту."""
+    spec = _tasks[task_name]
+    if getattr(settings, 'JOBS_EAGER', False):
+        transaction.on_commit(lambda: spec.func(**payload))
+        return None
+    return Job.objects.create(
+        name=task_name,
+        queue=spec.queue,
+        payload=payload,
+        priority=priority,
+        max_attempts=spec.max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay or 0),
+    )
+
+
+def claim(worker_id, queues=None, limit=1, exclude_queues=()):
+    """Забирає до limit готових задач. SKIP LOCKED на PostgreSQL і умовний
+    UPDATE за статусом гарантують, що задачу отримає лише один воркер."""
+    now = timezone.now()
+    with transaction.atomic():
+        due = Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+        if queues is not None:
+            due = due.filter(queue__in=queues)
+        if exclude_queues:
+            due = due.exclude(queue__in=exclude_queues)
+        ids = list(
+            due.order_by('-priority', 'run_after', 'pk')
+            .select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(pk__in=ids, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(pk__in=ids, status=Job.RUNNING, locked_by=worker_id).order_by('-priority', 'run_after', 'pk'))
+
+
+def execute(name, payload):
+    """Виконує задачу; викликається і в потоці воркера, і в дочірньому процесі."""
+    try:
+        return _tasks[name].func(**payload)
+    finally:
+        close_old_connections()
+
+
+def mark_done(job):
+    Job.objects.filter(pk=job.pk).update(status=Job.DONE, finished_at=timezone.now(), last_error='')
+
+
+def mark_failed(job, error):
+    if job.attempts < job.max_attempts:
+        delay = min(JOB_RETRY_DELAY * 2 ** (job.attempts - 1), JOB_RETRY_MAX_DELAY)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.QUEUED, run_after=timezone.now() + timedelta(seconds=delay),
+            locked_by='', locked_at=None, last_error=error,
+        )
+        logger.warning('Задача %s#%s впала (спроба %s/%s), повтор через %s с', job.name, job.pk, job.attempts, job.max_attempts, delay)
+    else:
+        Job.objects.filter(pk=job.pk).update(status=Job.FAILED, finished_at=timezone.now(), last_error=error)
+        logger.error('Задача %s#%s остаточно впала: %s', job.name, job.pk, error.strip().splitlines()[-1])
+
+
+def requeue_stale(timeout=JOB_TIMEOUT):
+    """Задачі без heartbeat довше за timeout повертає в чергу, а ті, що
+    вичерпали спроби, позначає FAILED (інакше задача, яка валить воркер,
+    повторювалася б вічно). Повертає (повернуто, остаточно впало)."""
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=timeout))
+    error = f'Воркер не оновлював задачу понад {timeout} с (впав або був зупинений)'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished_at=now, last_error=error,
+    )
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(
+        status=Job.QUEUED, locked_by='', locked_at=None, run_after=now, last_error=error,
+    )
+    if failed:
+        logger.error('Покинуті задачі остаточно впали: %s', failed)
+    return requeued, failed
+
+
+def prune(days=JOB_RETENTION_DAYS):
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status=Job.DONE, finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def run_pending(queues=None, worker_id='inline'):
+    """Виконує всі готові задачі в поточному потоці; для тестів і cron."""
+    count = 0
+    while True:
+        jobs = claim(worker_id, queues, limit=1)
+        if not jobs:
+            return count
+        job = jobs[0]
+        try:
+            execute(job.name, job.payload)
+        except Exception:
+            mark_failed(job, traceback.format_exc())
+        else:
+            mark_done(job)
+        count += 1
+
+
+class Worker:
+    def __init__(self, queues=None, concurrency=4, processes=2, poll_interval=1.0, burst=False):
+        self.queues = queues
+        self.concurrency = concurrency
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+        self.inflight = {}
+
+    def stop(self, *args):
+        logger.info('Воркер %s завершує роботу після поточних задач', self.worker_id)
+        self.stopping = True
+
+    def heartbeat(self):
+        # Задачі, що ще виконуються, не мають потрапити в requeue_stale
+        ids = [job.pk for job in self.inflight.values()]
+        if ids:
+            Job.objects.filter(pk__in=ids, status=Job.RUNNING, locked_by=self.worker_id).update(locked_at=timezone.now())
+
+    def claim_next(self):
+        """Бере задачі по одній, поки є вільні слоти; черги, що досягли
+        ліміту з JOB_QUEUE_CONCURRENCY, пропускаються."""
+        jobs = []
+        running = Counter(job.queue for job in self.inflight.values())
+        while len(self.inflight) + len(jobs) < self.concurrency:
+            full = [queue for queue, limit in JOB_QUEUE_CONCURRENCY.items() if running[queue] >= limit]
+            claimed = claim(self.worker_id, self.queues, limit=1, exclude_queues=full)
+            if not claimed:
+                break
+            jobs.append(claimed[0])
+            running[claimed[0].queue] += 1
+        return jobs
+
+    def process_pool(self):
+        if not self.processes:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'), initializer=job_process.init,
+        )
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        threads = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job')
+        processes = self.process_pool()
+        # Задачі поточного пулу процесів; після його заміни старі не рахуються
+        pool_futures = set()
+        logger.info('Воркер %s запущено (черги: %s)', self.worker_id, ', '.join(self.queues or ['усі']))
+        last_maintenance = 0
+        try:
+            while not (self.stopping and not self.inflight):
+                if time.monotonic() - last_maintenance > JOB_HEARTBEAT_INTERVAL:
+                    self.heartbeat()
+                    requeue_stale()
+                    last_maintenance = time.monotonic()
+
+                if not self.stopping:
+                    for job in self.claim_next():
+                        spec = _tasks.get(job.name)
+                        if spec is None:
+                            mark_failed(job, f'Невідома задача {job.name}')
+                        elif spec.cpu_bound and processes:
+                            future = processes.submit(job_process.execute, job.name, job.payload)
+                            pool_futures.add(future)
+                            self.inflight[future] = job
+                        else:
+                            self.inflight[threads.submit(execute, job.name, job.payload)] = job
+
+                if not self.inflight:
+                    if self.burst:
+                        break
+                    close_old_connections()
+                    time.sleep(self.poll_interval)
+                    continue
+
+                done, _ = wait(list(self.inflight), timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = self.inflight.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        mark_done(job)
+                        continue
+                    mark_failed(job, ''.join(traceback.format_exception(error)))
+                    if isinstance(error, BrokenProcessPool) and future in pool_futures:
+                        # Дочірній процес упав (напр. OOM) — пул більше не приймає задач
+                        logger.error('Пул процесів зламано, створюємо новий')
+                        processes.shutdown(wait=False)
+                        processes = self.process_pool()
+                        pool_futures = set()
+                    pool_futures.discard(future)
+        finally:
+            threads.shutdown(wait=True)
+            if processes:
+                processes.shutdown(wait=True)
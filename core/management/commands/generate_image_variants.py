@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.images import generate_variants, registered_fields
+
+
+class Command(BaseCommand):
+    help = 'Створює WebP/JPEG-варіанти для вже завантажених зображень'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', help='Лише ці моделі, напр. gallery.mediaitem (можна кілька разів)')
+        parser.add_argument('--force', action='store_true', help='Перегенерувати наявні варіанти')
+
+    def handle(self, *args, **options):
+        models = {label.lower() for label in options['model'] or []}
+        for spec in registered_fields():
+            label = spec.model._meta.label_lower
+            if models and label not in models:
+                continue
+            created = 0
+            storage = spec.model._meta.get_field(spec.field).storage
+            for name in spec.queryset().values_list(spec.field, flat=True).iterator():
+                created += len(generate_variants(storage, name, spec.presets, force=options['force']))
+            self.stdout.write(f'{label}.{spec.field}: створено файлів {created}')
+        self.stdout.write(self.style.SUCCESS('Варіанти зображень оновлено'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Перебудовує індекс глобального пошуку (core.SearchDocument)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kinds', nargs='*', help='Типи документів: post, topic, gallery, portfolio, user')
+
+    def handle(self, *args, **options):
+        for kind, count in rebuild(options['kinds']).items():
+            self.stdout.write(f'{kind}: {count}')
+        self.stdout.write(self.style.SUCCESS('Індекс пошуку перебудовано'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.site_counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Звіряє лічильники core.SiteCounter з COUNT(*) по таблицях'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Назви лічильників (за замовчуванням усі)')
+
+    def handle(self, *args, **options):
+        for name, value in reconcile(options['names']).items():
+            self.stdout.write(f'{name}: {value}')
+        self.stdout.write(self.style.SUCCESS('Лічильники звірено'))
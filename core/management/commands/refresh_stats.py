@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import refresh_stats
+
+
+class Command(BaseCommand):
+    help = 'Перераховує знімок статистики сайту (core.StatsSnapshot)'
+
+    def handle(self, *args, **options):
+        snapshot = refresh_stats()
+        self.stdout.write(self.style.SUCCESS(f'Статистику оновлено о {snapshot.refreshed_at:%H:%M:%S}'))
@@ -0,0 +1,148 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from forum.models import Topic
+
+User = get_user_model()
+
+# (назва, шлях, чи потрібен вхід)
+TARGETS = [
+    ('posts', '/', False),
+    ('feed', '/feed/', True),
+    ('home', '/core/', False),
+    ('forum', '/forum/', False),
+    ('forum_latest', '/forum/latest/', False),
+    ('gallery', '/gallery/', False),
+    ('stats', '/core/stats/', True),
+    ('search', '/core/search/?q=mirage', False),
+]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Вимірює p50/p95 часу відповіді та кількість запитів до БД для основних сторінок'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--user', help='Користувач для сторінок із входом (за замовчуванням bench_0)')
+        parser.add_argument('--only', nargs='*', help='Назви сторінок: ' + ', '.join(name for name, _, _ in TARGETS))
+        parser.add_argument('--cold', action='store_true', help='Очищати кеш перед кожним запитом')
+        parser.add_argument('--output', default='bench-results.json')
+        parser.add_argument('--compare', help='Попередній файл результатів для порівняння')
+
+    def handle(self, *args, **options):
+        username = options['user'] or 'bench_0'
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            raise CommandError(f'Користувача {username} не знайдено; спершу запустіть manage.py seed_bench')
+
+        targets = list(TARGETS)
+        topic_id = Topic.objects.order_by('-pk').values_list('pk', flat=True).first()
+        if topic_id:
+            targets.append(('topic', f'/forum/topic/{topic_id}/', False))
+        if options['only']:
+            targets = [target for target in targets if target[0] in options['only']]
+
+        anonymous = Client()
+        authenticated = Client()
+        authenticated.force_login(user)
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['*'], SECURE_SSL_REDIRECT=False, DEBUG=False):
+            for name, path, login in targets:
+                client = authenticated if login else anonymous
+                results[name] = self.measure(client, path, options)
+                row = results[name]
+                self.stdout.write(
+                    f'{name:<14} {row["status"]}  p50 {row["p50_ms"]:>8.1f} мс  '
+                    f'p95 {row["p95_ms"]:>8.1f} мс  запитів {row["queries"]}'
+                )
+
+        report = {'meta': self.meta(options), 'results': results}
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f'Результати записано у {options["output"]}'))
+
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def measure(self, client, path, options):
+        for _ in range(options['warmup']):
+            client.get(path)
+
+        timings = []
+        queries = []
+        status = None
+        for _ in range(options['iterations']):
+            if options['cold']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = client.get(path)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(ctx.captured_queries))
+            status = response.status_code
+
+        return {
+            'path': path,
+            'status': status,
+            'iterations': len(timings),
+            'p50_ms': round(percentile(timings, 0.5), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'min_ms': round(min(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': max(queries),
+        }
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR,
+            ).stdout.strip() or None
+        except OSError:
+            commit = None
+        return {
+            'commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'iterations': options['iterations'],
+            'cold_cache': options['cold'],
+            'rows': {
+                'users': User.objects.count(),
+                'topics': Topic.objects.count(),
+            },
+        }
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as fh:
+            previous = json.load(fh)['results']
+        self.stdout.write(f'\nПорівняння з {path}:')
+        for name, row in results.items():
+            old = previous.get(name)
+            if not old:
+                continue
+            change = (row['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0
+            self.stdout.write(
+                f'{name:<14} p50 {old["p50_ms"]:>8.1f} → {row["p50_ms"]:>8.1f} мс ({change:+.0f}%)  '
+                f'запитів {old["queries"]} → {row["queries"]}'
+            )
@@ -0,0 +1,29 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import Worker, prune
+
+
+class Command(BaseCommand):
+    help = 'Запускає воркер фонових задач (core.Job)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues', help='Обробляти лише ці черги (можна кілька разів)')
+        parser.add_argument('--concurrency', type=int, default=4, help='Скільки задач виконувати одночасно')
+        parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                            help='Розмір пулу процесів для CPU-важких задач (0 — виконувати в потоках)')
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--burst', action='store_true', help='Вийти, коли черга спорожніє')
+
+    def handle(self, *args, **options):
+        deleted = prune()
+        if deleted:
+            self.stdout.write(f'Видалено старих задач: {deleted}')
+        Worker(
+            queues=options['queues'],
+            concurrency=options['concurrency'],
+            processes=options['processes'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst'],
+        ).run()
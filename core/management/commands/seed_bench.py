@@ -0,0 +1,339 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Follow
+from announcements.models import Announcement
+from events.models import Event
+from forum.models import ForumCategory, Message, Topic
+from gallery.likes import recount_likes
+from gallery.models import MediaItem, MediaLike
+from posts.models import Comment, Hashtag, Post, TimelineEntry
+from posts.timeline import TIMELINE_MAX_LENGTH
+from votes.models import UserVote, Vote, VoteOption
+
+User = get_user_model()
+
+MAPS = ['mirage', 'inferno', 'nuke', 'ancient', 'anubis', 'vertigo', 'dust2', 'train', 'overpass']
+WEAPONS = ['ak47', 'm4a4', 'm4a1s', 'awp', 'deagle', 'usp', 'glock', 'mp9', 'famas', 'galil']
+WORDS = [
+    'клатч', 'ейс', 'смоук', 'флешка', 'моллік', 'раш', 'ретейк', 'еко', 'форс', 'бай',
+    'тіммейт', 'хедшот', 'спрей', 'прострел', 'позиція', 'раунд', 'матч', 'турнір', 'патч', 'конфіг',
+    'clutch', 'ace', 'smoke', 'flash', 'entry', 'lurk', 'rotate', 'site', 'bomb', 'defuse',
+]
+
+# Обсяги за замовчуванням (--scale множить усі)
+VOLUMES = {
+    'users': 100_000,
+    'hashtags': 2_000,
+    'posts': 1_000_000,
+    'likes_per_post': 3,
+    'comments_per_post': 0.5,
+    'follows_per_user': 10,
+    'topics': 50_000,
+    'messages': 500_000,
+    'gallery': 50_000,
+    'gallery_likes': 200_000,
+    'votes': 200,
+    'user_votes': 100_000,
+    'events': 500,
+    'announcements': 500,
+}
+
+
+@contextmanager
+def manual_timestamps(*models):
+    # bulk_create викликає pre_save, тож auto_now/auto_now_add перезаписали б
+    # розкидані в часі дати; на час сідингу вимикаємо їх
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Заповнює БД великим синтетичним набором даних для manage.py run_bench'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Множник обсягів (1.0 = 100k користувачів і 1M постів)')
+        parser.add_argument('--days', type=int, default=90, help='За скільки днів розкидати дати')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='bench', help='Префікс імен згенерованих користувачів')
+        parser.add_argument('--timeline-users', type=int, default=100,
+                            help='Скільки користувачів отримають заповнену стрічку /feed/')
+        parser.add_argument('--skip-search', action='store_true', help='Не перебудовувати індекс пошуку')
+        parser.add_argument('--flush', action='store_true',
+                            help='Спершу видалити попередні дані з тим самим префіксом (на повному обсязі — повільно)')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.days = options['days']
+        self.prefix = options['prefix']
+        # Відносні обсяги (на пост/користувача) не масштабуються
+        volumes = {
+            name: value if name.endswith(('_per_post', '_per_user')) else max(1, int(value * options['scale']))
+            for name, value in VOLUMES.items()
+        }
+
+        existing = User.objects.filter(username__startswith=f'{self.prefix}_')
+        if existing.exists():
+            if not options['flush']:
+                raise CommandError(f'Користувачі з префіксом "{self.prefix}_" вже існують; додайте --flush')
+            self.step('Видалення попередніх даних', lambda: existing.delete()[0])
+
+        with manual_timestamps(User, Post, Comment, Topic, Message, MediaItem, MediaLike,
+                               Follow, Vote, UserVote, Event, Announcement, TimelineEntry):
+            self.user_ids = self.step('Користувачі', lambda: self.seed_users(volumes['users']))
+            self.hashtag_ids = self.step('Хештеги', lambda: self.seed_hashtags(volumes['hashtags']))
+            self.step('Підписки', lambda: self.seed_follows(volumes['follows_per_user']))
+            self.post_ids = self.step('Пости, лайки, хештеги', lambda: self.seed_posts(
+                volumes['posts'], volumes['likes_per_post'],
+            ))
+            self.step('Коментарі', lambda: self.seed_comments(int(volumes['posts'] * volumes['comments_per_post'])))
+            self.step('Теми та повідомлення форуму', lambda: self.seed_forum(volumes['topics'], volumes['messages']))
+            self.step('Галерея', lambda: self.seed_gallery(volumes['gallery'], volumes['gallery_likes']))
+            self.step('Голосування', lambda: self.seed_votes(volumes['votes'], volumes['user_votes']))
+            self.step('Події та оголошення', lambda: self.seed_events(volumes['events'], volumes['announcements']))
+            self.step('Стрічки', lambda: self.seed_timelines(options['timeline_users']))
+
+        # Денормалізовані таблиці, які сигнали не бачать при bulk_create
+        self.step('Лічильники', lambda: self.call('reconcile_counters'))
+        self.step('Лічильники форуму', lambda: self.call('recount_forum'))
+        self.step('Тренди', lambda: self.call('rebuild_trending'))
+        self.step('Статистика', lambda: self.call('refresh_stats'))
+        if not options['skip_search']:
+            self.step('Індекс пошуку', lambda: self.call('rebuild_search_index'))
+        self.stdout.write(self.style.SUCCESS('Дані для бенчмарку згенеровано'))
+
+    def step(self, title, func):
+        start = time.perf_counter()
+        result = func()
+        size = len(result) if isinstance(result, list) else result
+        suffix = f' ({size})' if isinstance(size, int) else ''
+        self.stdout.write(f'{title}{suffix}: {time.perf_counter() - start:.1f} c')
+        return result
+
+    def call(self, name):
+        # Команди пишуть підсумки без огляду на verbosity; у звіті сідингу вистачає step()
+        call_command(name, verbosity=0, stdout=StringIO())
+
+    def moment(self):
+        # Свіжі дні трапляються частіше, як на живому сайті
+        age = self.days * 86400 * self.rng.random() ** 2
+        return self.now - timedelta(seconds=age)
+
+    def text(self, words=12):
+        parts = [self.rng.choice(WORDS) for _ in range(words)]
+        parts.insert(self.rng.randrange(len(parts)), self.rng.choice(MAPS))
+        return ' '.join(parts)
+
+    def insert(self, model, objects, **kwargs):
+        """bulk_create пачками з генератора, щоб не тримати мільйон об'єктів у пам'яті."""
+        total = 0
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                with transaction.atomic():
+                    model.objects.bulk_create(batch, **kwargs)
+                total += len(batch)
+                batch = []
+        if batch:
+            with transaction.atomic():
+                model.objects.bulk_create(batch, **kwargs)
+            total += len(batch)
+        return total
+
+    def new_ids(self, model, before):
+        return list(model.objects.filter(pk__gt=before).order_by('pk').values_list('pk', flat=True))
+
+    def last_pk(self, model):
+        return model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+    def seed_users(self, count):
+        before = self.last_pk(User)
+        password = make_password('bench-password')
+        self.insert(User, (
+            User(
+                username=f'{self.prefix}_{i}', email=f'{self.prefix}_{i}@example.com', password=password,
+                date_joined=self.moment(), created_at=self.now,
+            )
+            for i in range(count)
+        ))
+        return self.new_ids(User, before)
+
+    def seed_hashtags(self, count):
+        names = [f'{self.rng.choice(MAPS + WEAPONS + WORDS[20:])}{i}' for i in range(count)]
+        names[:len(MAPS + WEAPONS)] = MAPS + WEAPONS
+        Hashtag.objects.bulk_create([Hashtag(name=name) for name in names], ignore_conflicts=True)
+        return list(Hashtag.objects.filter(name__in=names).values_list('pk', flat=True))
+
+    def seed_follows(self, per_user):
+        def follows():
+            for follower in self.user_ids:
+                for following in set(self.rng.sample(self.user_ids, min(per_user, len(self.user_ids)))):
+                    if following != follower:
+                        yield Follow(follower_id=follower, following_id=following, created_at=self.moment())
+        return self.insert(Follow, follows(), ignore_conflicts=True)
+
+    def seed_posts(self, count, likes_per_post):
+        before = self.last_pk(Post)
+        self.insert(Post, (
+            Post(
+                author_id=self.rng.choice(self.user_ids), content=self.text()[:280],
+                created_at=self.moment(), updated_at=self.now,
+                likes_count=min(len(self.user_ids), int(self.rng.expovariate(1 / likes_per_post))),
+                is_pinned=i < 3,
+            )
+            for i in range(count)
+        ))
+
+        posts = list(Post.objects.filter(pk__gt=before).order_by('pk').values_list('pk', 'likes_count'))
+        PostLike = Post.likes.through
+        PostHashtag = Post.hashtags.through
+        self.insert(PostLike, (
+            PostLike(post_id=post_id, user_id=user_id)
+            for post_id, likes_count in posts
+            for user_id in self.rng.sample(self.user_ids, likes_count)
+        ), ignore_conflicts=True)
+        self.insert(PostHashtag, (
+            PostHashtag(post_id=post_id, hashtag_id=hashtag_id)
+            for post_id, _ in posts
+            for hashtag_id in set(self.rng.choices(self.hashtag_ids, k=self.rng.randint(0, 3)))
+        ), ignore_conflicts=True)
+        return [post_id for post_id, _ in posts]
+
+    def seed_comments(self, count):
+        return self.insert(Comment, (
+            Comment(
+                post_id=self.rng.choice(self.post_ids), author_id=self.rng.choice(self.user_ids),
+                content=self.text(6), created_at=self.moment(), updated_at=self.now,
+            )
+            for _ in range(count)
+        ))
+
+    def seed_forum(self, topics, messages):
+        for name, _ in ForumCategory.CATEGORY_CHOICES:
+            ForumCategory.objects.get_or_create(name=name)
+        category_ids = list(ForumCategory.objects.values_list('pk', flat=True))
+
+        before = self.last_pk(Topic)
+        self.insert(Topic, (
+            Topic(
+                category_id=self.rng.choice(category_ids), title=self.text(5)[:200], content=self.text(40),
+                created_by_id=self.rng.choice(self.user_ids), is_pinned=self.rng.random() < 0.001,
+                created_at=self.moment(), updated_at=self.now,
+            )
+            for _ in range(topics)
+        ))
+        topic_ids = self.new_ids(Topic, before)
+        # Кілька «гарячих» тем отримують більшість повідомлень
+        weights = [1 / (rank + 1) for rank in range(len(topic_ids))]
+        self.insert(Message, (
+            Message(
+                topic_id=topic_id, author_id=self.rng.choice(self.user_ids), text=self.text(20),
+                created_at=self.moment(), updated_at=self.now,
+            )
+            for topic_id in self.rng.choices(topic_ids, weights=weights, k=messages)
+        ))
+        return topics + messages
+
+    def seed_gallery(self, items, likes):
+        before = self.last_pk(MediaItem)
+        media_types = [value for value, _ in MediaItem.MEDIA_TYPES]
+        self.insert(MediaItem, (
+            MediaItem(
+                user_id=self.rng.choice(self.user_ids), title=self.text(3)[:200], description=self.text(15),
+                file=f'gallery/bench_{i}.jpg', media_type=self.rng.choice(media_types),
+                is_approved=self.rng.random() < 0.8, created_at=self.moment(),
+            )
+            for i in range(items)
+        ))
+        item_ids = self.new_ids(MediaItem, before)
+        created = self.insert(MediaLike, (
+            MediaLike(user_id=self.rng.choice(self.user_ids), media_item_id=self.rng.choice(item_ids), created_at=self.now)
+            for _ in range(likes)
+        ), ignore_conflicts=True)
+        recount_likes(MediaItem.objects.filter(pk__gt=before))
+        return items + created
+
+    def seed_votes(self, votes, user_votes):
+        vote_types = ['highlight', 'post', 'weapon', 'other']
+        before = self.last_pk(Vote)
+        self.insert(Vote, (
+            Vote(
+                title=self.text(4)[:200], vote_type=self.rng.choice(vote_types), is_active=self.rng.random() < 0.3,
+                created_at=self.moment(), end_date=self.now + timedelta(days=self.rng.randint(-30, 30)),
+            )
+            for _ in range(votes)
+        ))
+        vote_ids = self.new_ids(Vote, before)
+        self.insert(VoteOption, (
+            VoteOption(vote_id=vote_id, text=weapon) for vote_id in vote_ids for weapon in self.rng.sample(WEAPONS, 4)
+        ))
+        options = {}
+        for option_id, vote_id in VoteOption.objects.filter(vote_id__in=vote_ids).values_list('pk', 'vote_id'):
+            options.setdefault(vote_id, []).append(option_id)
+
+        def ballots():
+            for _ in range(user_votes):
+                vote_id = self.rng.choice(vote_ids)
+                yield UserVote(
+                    user_id=self.rng.choice(self.user_ids), vote_id=vote_id,
+                    option_id=self.rng.choice(options[vote_id]), voted_at=self.moment(),
+                )
+        created = self.insert(UserVote, ballots(), ignore_conflicts=True)
+        return votes + created
+
+    def seed_events(self, events, announcements):
+        event_types = [value for value, _ in Event.EVENT_TYPES]
+        self.insert(Event, (
+            Event(
+                title=self.text(4)[:200], description=self.text(30), event_type=self.rng.choice(event_types),
+                date=self.now + timedelta(days=self.rng.randint(-60, 60)), created_at=self.moment(),
+            )
+            for _ in range(events)
+        ))
+        announcement_types = ['tournament', 'server', 'rules', 'update']
+        self.insert(Announcement, (
+            Announcement(
+                title=self.text(4)[:200], content=self.text(40), author_id=self.rng.choice(self.user_ids),
+                announcement_type=self.rng.choice(announcement_types), is_pinned=self.rng.random() < 0.05,
+                created_at=self.moment(), updated_at=self.now,
+            )
+            for _ in range(announcements)
+        ))
+        return events + announcements
+
+    def seed_timelines(self, users):
+        # Для решти користувачів стрічка наповнюється вже при нових постах
+        total = 0
+        for user_id in self.user_ids[:users]:
+            following = Follow.objects.filter(follower_id=user_id).values_list('following_id', flat=True)
+            posts = Post.objects.filter(author_id__in=following).order_by('-created_at').values_list('pk', 'created_at')
+            total += self.insert(TimelineEntry, (
+                TimelineEntry(user_id=user_id, post_id=post_id, created_at=created_at)
+                for post_id, created_at in posts[:TIMELINE_MAX_LENGTH]
+            ), ignore_conflicts=True)
+        return total
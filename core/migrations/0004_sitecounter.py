@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:24
+
+from django.db import migrations, models
+from django.utils import timezone
+
+COUNTERS = [
+    ('users', 'accounts', 'User', {}),
+    ('posts', 'posts', 'Post', {}),
+    ('comments', 'posts', 'Comment', {}),
+    ('topics', 'forum', 'Topic', {}),
+    ('messages', 'forum', 'Message', {}),
+    ('gallery_approved', 'gallery', 'MediaItem', {'is_approved': True}),
+    ('portfolio_approved', 'portfolio', 'PortfolioItem', {'is_approved': True}),
+]
+
+
+def init_counters(apps, schema_editor):
+    SiteCounter = apps.get_model('core', 'SiteCounter')
+    now = timezone.now()
+    SiteCounter.objects.bulk_create([
+        SiteCounter(
+            name=name,
+            value=apps.get_model(app_label, model_name).objects.filter(**filters).count(),
+            reconciled_at=now,
+        )
+        for name, app_label, model_name, filters in COUNTERS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_statssnapshot'),
+        ('accounts', '0002_follow'),
+        ('posts', '0005_hashtagactivity'),
+        ('forum', '0002_topic_indexes'),
+        ('gallery', '0003_medialike'),
+        ('portfolio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(init_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_sitecounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileInfo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('field', models.CharField(max_length=50)),
+                ('name', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('sha256', models.CharField(blank=True, max_length=64)),
+                ('scan_status', models.CharField(choices=[('pending', 'Очікує'), ('clean', 'Чистий'), ('infected', 'Заражений'), ('skipped', 'Без перевірки')], default='pending', max_length=10)),
+                ('scan_detail', models.CharField(blank=True, max_length=255)),
+                ('inspected_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('model', 'object_id', 'field')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('queue', models.CharField(default='default', max_length=50)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('queued', 'В черзі'), ('running', 'Виконується'), ('done', 'Виконано'), ('failed', 'Помилка')], default='queued', max_length=10)),
+                ('priority', models.SmallIntegerField(default=0)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3)),
+                ('run_after', models.DateTimeField()),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'queue', 'run_after'], name='core_job_status_e2dab0_idx'), models.Index(fields=['status', 'finished_at'], name='core_job_status_06586a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def _documents(apps):
+    # Ті самі title/body, що в core.search.register_defaults, на історичних моделях
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Topic = apps.get_model('forum', 'Topic')
+    MediaItem = apps.get_model('gallery', 'MediaItem')
+    PortfolioItem = apps.get_model('portfolio', 'PortfolioItem')
+
+    for post in Post.objects.select_related('author').iterator(chunk_size=BATCH_SIZE):
+        yield 'post', post.pk, post.author.username, post.content, True
+    for topic in Topic.objects.select_related('created_by').iterator(chunk_size=BATCH_SIZE):
+        yield 'topic', topic.pk, topic.title, f'{topic.content} {topic.created_by.username}', True
+    for kind, model in (('gallery', MediaItem), ('portfolio', PortfolioItem)):
+        for item in model.objects.select_related('user').iterator(chunk_size=BATCH_SIZE):
+            yield kind, item.pk, item.title, f'{item.description} {item.user.username}', item.is_approved
+    for user in User.objects.iterator(chunk_size=BATCH_SIZE):
+        yield 'user', user.pk, user.username, f'{user.first_name} {user.last_name}', True
+
+
+def backfill_search_index(apps, schema_editor):
+    # Об'єкти, створені до появи індексу, інакше не знаходились би до ручного
+    # rebuild_search_index. Тригери FTS5 / згенерована колонка PostgreSQL
+    # заповнюються при вставці
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    batch = []
+    for kind, object_id, title, body, is_public in _documents(apps):
+        batch.append(SearchDocument(
+            kind=kind, object_id=object_id, title=(title or '')[:255], body=body or '', is_public=is_public,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            SearchDocument.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    SearchDocument.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_job_fileinfo'),
+        ('accounts', '0002_follow'),
+        ('posts', '0006_backfill_timelines'),
+        ('forum', '0006_forum_search_indexes'),
+        ('gallery', '0003_medialike'),
+        ('portfolio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -3,3 +3,112 @@ from django.db import models
 class SiteInfo(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
+
+
+class SearchDocument(models.Model):
+    # Денормалізований документ для глобального пошуку (див. core.search).
+    # На PostgreSQL таблиця має згенеровану колонку search_vector з GIN-індексом,
+    # на SQLite — зовнішню FTS5-таблицю core_searchdocument_fts
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    is_public = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['kind', 'object_id']
+
+    def __str__(self):
+        return f"{self.kind}#{self.object_id}: {self.title}"
+
+
+class StatsSnapshot(models.Model):
+    # Знімок агрегатів сторінки статистики; оновлюється core.stats.get_stats / refresh_stats
+    key = models.CharField(max_length=50, unique=True)
+    data = models.JSONField(default=dict)
+    refreshed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key} @ {self.refreshed_at:%Y-%m-%d %H:%M}"
+
+
+class SiteCounter(models.Model):
+    # Денормалізовані загальні лічильники сайту (core.site_counters)
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+class Job(models.Model):
+    # Черга фонових задач у БД (core.jobs); обробляє manage.py run_worker
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'В черзі'),
+        (RUNNING, 'Виконується'),
+        (DONE, 'Виконано'),
+        (FAILED, 'Помилка'),
+    ]
+
+    name = models.CharField(max_length=100)
+    queue = models.CharField(max_length=50, default='default')
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.SmallIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Вибірка наступних задач: WHERE status='queued' AND queue IN (...) AND run_after <= now
+            models.Index(fields=['status', 'queue', 'run_after']),
+            models.Index(fields=['status', 'finished_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name}#{self.pk} ({self.status})"
+
+
+class FileInfo(models.Model):
+    # Метадані та результат перевірки завантаженого файлу (core.uploads)
+    PENDING = 'pending'
+    CLEAN = 'clean'
+    INFECTED = 'infected'
+    SKIPPED = 'skipped'
+    SCAN_CHOICES = [
+        (PENDING, 'Очікує'),
+        (CLEAN, 'Чистий'),
+        (INFECTED, 'Заражений'),
+        (SKIPPED, 'Без перевірки'),
+    ]
+
+    model = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=50)
+    name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    scan_status = models.CharField(max_length=10, choices=SCAN_CHOICES, default=PENDING)
+    scan_detail = models.CharField(max_length=255, blank=True)
+    inspected_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ['model', 'object_id', 'field']
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id}.{self.field}: {self.name}"
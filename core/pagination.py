@@ -0,0 +1,163 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _split(field):
+    if field.startswith('-'):
+        return field[1:], True
+    return field, False
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], reverse=False)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], reverse=True)
+
+
+class CursorPaginator:
+    """Keyset-пагінація за унікальним набором полів, напр. (created_at, id).
+
+    На відміну від django.core.paginator.Paginator не робить COUNT(*) та OFFSET:
+    кожна сторінка — це діапазонний запит по індексу від позиції курсора.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [_split(field) for field in self.ordering]
+
+    def encode_cursor(self, obj, reverse=False):
+        values = []
+        for name, _ in self.fields:
+            value = getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            raw_values = payload['v']
+            reverse = bool(payload.get('r'))
+            if len(raw_values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            opts = self.queryset.model._meta
+            values = [
+                opts.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, raw_values)
+            ]
+            # Поля курсора не бувають NULL; None у фільтрі дав би помилку запиту
+            if any(value is None for value in values):
+                raise InvalidCursor(cursor)
+        except (ValueError, KeyError, TypeError, binascii.Error, ValidationError, FieldDoesNotExist) as exc:
+            raise InvalidCursor(cursor) from exc
+        return values, reverse
+
+    def _after(self, values, reverse):
+        # (a, b) > (x, y)  =>  a > x OR (a = x AND b > y)
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _prepare(self, cursor):
+        queryset = self.queryset
+        reverse = False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._after(values, reverse))
+
+        if reverse:
+            ordering = [name if descending else f'-{name}' for name, descending in self.fields]
+        else:
+            ordering = list(self.ordering)
+        return queryset.order_by(*ordering)[:self.per_page + 1], reverse
+
+    def _build_page(self, rows, cursor, reverse):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True, has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more, has_previous=bool(cursor))
+
+    def page(self, cursor=None):
+        queryset, reverse = self._prepare(cursor)
+        return self._build_page(list(queryset), cursor, reverse)
+
+    async def apage(self, cursor=None):
+        queryset, reverse = self._prepare(cursor)
+        return self._build_page([obj async for obj in queryset], cursor, reverse)
+
+
+class CursorPaginationMixin:
+    """Замінює OFFSET-пагінацію ListView на курсорну (?cursor=...)."""
+
+    cursor_ordering = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, self.get_cursor_ordering())
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise Http404('Невірний курсор сторінки.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    async def apaginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, self.get_cursor_ordering())
+        try:
+            page = await paginator.apage(self.request.GET.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise Http404('Невірний курсор сторінки.')
+        return (paginator, page, page.object_list, page.has_other_pages())
@@ -0,0 +1,319 @@
+import re
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.db import connections, router
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+
+from . import jobs
+from .models import SearchDocument
+
+FTS_TABLE = 'core_searchdocument_fts'
+TOKEN_RE = re.compile(r'\w+')
+INDEX_BATCH_SIZE = 500
+
+
+class SearchSpec:
+    def __init__(self, kind, model, title, body, is_public=None, select_related=(), fields=None, related=None):
+        self.kind = kind
+        self.model = model
+        self.title = title
+        self.body = body
+        self.is_public = is_public
+        self.select_related = select_related
+        # Поля, від яких залежить документ; save(update_fields=...) без них не переіндексовує
+        self.fields = frozenset(fields) if fields else None
+        # Пов'язані моделі, текст яких потрапляє в документ: {модель: (lookup, поля)}.
+        # Зміна цих полів (напр. username автора) переіндексовує документи воркером
+        self.related = related or {}
+
+    def document(self, obj):
+        return SearchDocument(
+            kind=self.kind,
+            object_id=obj.pk,
+            title=(self.title(obj) or '')[:255],
+            body=self.body(obj) or '',
+            is_public=self.is_public(obj) if self.is_public else True,
+        )
+
+    def queryset(self):
+        return self.model._default_manager.select_related(*self.select_related)
+
+
+_registry = {}
+
+
+def register(kind, model, title, body, is_public=None, select_related=(), fields=None, related=None):
+    """Додає модель до глобального пошуку і підписує її на post_save/post_delete."""
+    spec = SearchSpec(kind, model, title, body, is_public, select_related, fields, related)
+    _registry[kind] = spec
+    post_save.connect(_on_save, sender=model, dispatch_uid=f'search-save-{kind}')
+    post_delete.connect(_on_delete, sender=model, dispatch_uid=f'search-delete-{kind}')
+    for related_model in spec.related:
+        post_save.connect(
+            _on_related_save, sender=related_model, dispatch_uid=f'search-related-{related_model._meta.label}',
+        )
+    return spec
+
+
+def _spec_for_model(model):
+    for spec in _registry.values():
+        if spec.model is model:
+            return spec
+    return None
+
+
+def _on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    spec = _spec_for_model(sender)
+    if spec is None:
+        return
+    if update_fields and spec.fields is not None and spec.fields.isdisjoint(update_fields):
+        # Напр. оновлення last_login під час входу
+        return
+    # Документ оновлює воркер (задача search.index), а не запит
+    jobs.enqueue('search.index', kind=spec.kind, pk=instance.pk)
+
+
+def _on_related_save(sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+    if raw or created:
+        return
+    for spec in _registry.values():
+        if sender not in spec.related:
+            continue
+        _, fields = spec.related[sender]
+        if update_fields and set(fields).isdisjoint(update_fields):
+            continue
+        # Без update_fields не відомо, що змінилося; index_related пише лише змінені документи
+        jobs.enqueue('search.index_related', kind=spec.kind, model=sender._meta.label, pk=instance.pk)
+
+
+def _on_delete(sender, instance, **kwargs):
+    spec = _spec_for_model(sender)
+    if spec is not None:
+        SearchDocument.objects.filter(kind=spec.kind, object_id=instance.pk).delete()
+
+
+def index_objects(spec, objects):
+    documents = [spec.document(obj) for obj in objects]
+    SearchDocument.objects.bulk_create(
+        documents,
+        batch_size=INDEX_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['title', 'body', 'is_public', 'updated_at'],
+    )
+
+
+def index_object(kind, pk):
+    spec = _registry[kind]
+    obj = spec.queryset().filter(pk=pk).first()
+    if obj is None:
+        SearchDocument.objects.filter(kind=kind, object_id=pk).delete()
+    else:
+        index_objects(spec, [obj])
+
+
+def index_related(kind, model, pk):
+    """Оновлює документи kind, що беруть текст з об'єкта model pk."""
+    spec = _registry[kind]
+    lookup, _ = spec.related[apps.get_model(model)]
+    objects = spec.queryset().filter(**{lookup: pk}).order_by('pk')
+    batch = []
+    for obj in objects.iterator(chunk_size=INDEX_BATCH_SIZE):
+        batch.append(spec.document(obj))
+        if len(batch) >= INDEX_BATCH_SIZE:
+            _write_changed(batch)
+            batch = []
+    _write_changed(batch)
+
+
+def _write_changed(documents):
+    if not documents:
+        return
+    kind = documents[0].kind
+    current = {
+        object_id: (title, body, is_public)
+        for object_id, title, body, is_public in SearchDocument.objects.filter(
+            kind=kind, object_id__in=[document.object_id for document in documents],
+        ).values_list('object_id', 'title', 'body', 'is_public')
+    }
+    changed = [
+        document for document in documents
+        if current.get(document.object_id) != (document.title, document.body, document.is_public)
+    ]
+    if changed:
+        SearchDocument.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['title', 'body', 'is_public', 'updated_at'],
+        )
+
+
+def reindex_queryset(queryset):
+    """Переіндексовує об'єкти після queryset.update(), який не шле сигналів."""
+    spec = _spec_for_model(queryset.model)
+    if spec is not None:
+        index_objects(spec, queryset.select_related(*spec.select_related))
+
+
+def rebuild(kinds=None):
+    counts = {}
+    for kind, spec in _registry.items():
+        if kinds and kind not in kinds:
+            continue
+        SearchDocument.objects.filter(kind=kind).delete()
+        batch = []
+        total = 0
+        for obj in spec.queryset().iterator(chunk_size=INDEX_BATCH_SIZE):
+            batch.append(spec.document(obj))
+            if len(batch) >= INDEX_BATCH_SIZE:
+                SearchDocument.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+        counts[kind] = total + len(batch)
+    return counts
+
+
+def _has_fts(connection):
+    if not hasattr(connection, '_search_has_fts'):
+        connection._search_has_fts = FTS_TABLE in connection.introspection.table_names()
+    return connection._search_has_fts
+
+
+def _ranked(documents, query):
+    connection = connections[router.db_for_read(SearchDocument)]
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return documents.none()
+
+    if connection.vendor == 'postgresql':
+        tsquery = "websearch_to_tsquery('simple', %s)"
+        return documents.filter(
+            RawSQL(f'search_vector @@ {tsquery}', [query], output_field=BooleanField())
+        ).annotate(
+            rank=RawSQL(f'ts_rank(search_vector, {tsquery})', [query], output_field=FloatField())
+        )
+
+    if connection.vendor == 'sqlite' and _has_fts(connection):
+        # Кожне слово — префіксний термін у лапках, тож синтаксис FTS5 з запиту не виконується
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        # Один JOIN з FTS-таблицею: MATCH виконується раз, bm25 рахується для
+        # знайдених рядків. Менший bm25 — кращий збіг; заголовок важить удвічі більше
+        return documents.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = core_searchdocument.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'rank': f'-bm25({FTS_TABLE}, 2.0, 1.0)'},
+        )
+
+    condition = Q()
+    for token in tokens:
+        condition &= Q(title__icontains=token) | Q(body__icontains=token)
+    return documents.filter(condition).annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+class SearchResults:
+    """Лінива вибірка результатів: Paginator робить COUNT і LIMIT/OFFSET у БД,
+    а об'єкти сторінки завантажуються пачкою — по одному запиту на тип."""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def count(self):
+        return self.documents.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._resolve(list(self.documents[key]))
+        return self._resolve([self.documents[key]])[0]
+
+    async def acount(self):
+        return await self.documents.acount()
+
+    async def aslice(self, start, stop):
+        documents = [document async for document in self.documents[start:stop]]
+        return await sync_to_async(self._resolve)(documents)
+
+    def _resolve(self, documents):
+        ids_by_kind = defaultdict(list)
+        for document in documents:
+            ids_by_kind[document.kind].append(document.object_id)
+
+        objects = {}
+        for kind, ids in ids_by_kind.items():
+            spec = _registry.get(kind)
+            if spec is None:
+                continue
+            for obj in spec.queryset().filter(pk__in=ids):
+                objects[kind, obj.pk] = obj
+
+        return [
+            (document.kind, objects[document.kind, document.object_id])
+            for document in documents
+            if (document.kind, document.object_id) in objects
+        ]
+
+
+def search(query, kinds=None):
+    documents = SearchDocument.objects.filter(is_public=True).only('kind', 'object_id')
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    documents = _ranked(documents, query).order_by('-rank', '-updated_at', '-id')
+    return SearchResults(documents)
+
+
+def register_defaults():
+    from django.contrib.auth import get_user_model
+    from forum.models import Topic
+    from gallery.models import MediaItem
+    from portfolio.models import PortfolioItem
+    from posts.models import Post
+
+    User = get_user_model()
+
+    register(
+        'post', Post,
+        title=lambda post: post.author.username,
+        body=lambda post: post.content,
+        select_related=('author',),
+        related={User: ('author', ('username',))},
+    )
+    register(
+        'topic', Topic,
+        title=lambda topic: topic.title,
+        body=lambda topic: f'{topic.content} {topic.created_by.username}',
+        select_related=('created_by',),
+        related={User: ('created_by', ('username',))},
+    )
+    register(
+        'gallery', MediaItem,
+        title=lambda item: item.title,
+        body=lambda item: f'{item.description} {item.user.username}',
+        is_public=lambda item: item.is_approved,
+        select_related=('user',),
+        related={User: ('user', ('username',))},
+    )
+    register(
+        'portfolio', PortfolioItem,
+        title=lambda item: item.title,
+        body=lambda item: f'{item.description} {item.user.username}',
+        is_public=lambda item: item.is_approved,
+        select_related=('user',),
+        related={User: ('user', ('username',))},
+    )
+    register(
+        'user', User,
+        title=lambda user: user.username,
+        body=lambda user: f'{user.first_name} {user.last_name}',
+        fields=('username', 'first_name', 'last_name'),
+    )
@@ -0,0 +1,142 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from .models import SiteCounter
+
+
+class CounterSpec:
+    def __init__(self, name, model, filters=None):
+        self.name = name
+        self.model = model
+        # Умова, за якою рядок рахується (напр. is_approved=True)
+        self.filters = filters or {}
+
+    def count(self):
+        return self.model._default_manager.filter(**self.filters).count()
+
+
+_registry = {}
+# Поля умов лічильників кожної моделі: лише їх запам'ятовує post_init
+_filter_fields = {}
+_MISSING = object()
+INITIAL_ATTR = '_site_counter_fields'
+
+
+def register(name, model, filters=None):
+    """Заводить лічильник і підписує модель на сигнали.
+
+    Створення й видалення рахують post_save/post_delete. Для лічильників з
+    умовою (is_approved=True) post_init запам'ятовує сирі значення полів умови,
+    а post_save додає чи віднімає різницю за переходом умови.
+    bulk_create та queryset.update() сигналів не шлють — їх наздоганяє reconcile.
+    """
+    spec = CounterSpec(name, model, filters)
+    _registry[name] = spec
+    uid = f'site-counter-{model._meta.label_lower}'
+    if spec.filters:
+        _filter_fields.setdefault(model, set()).update(spec.filters)
+        post_init.connect(_remember, sender=model, dispatch_uid=f'{uid}-init')
+    post_save.connect(_on_save, sender=model, dispatch_uid=f'{uid}-save')
+    post_delete.connect(_on_delete, sender=model, dispatch_uid=f'{uid}-delete')
+    return spec
+
+
+def _specs_for(model):
+    return [spec for spec in _registry.values() if spec.model is model]
+
+
+def _snapshot(sender, instance):
+    # Через __dict__, без дескрипторів: відкладені поля не довантажуються
+    return {field: instance.__dict__.get(field, _MISSING) for field in _filter_fields.get(sender, ())}
+
+
+def _counted(sender, values):
+    """Назви лічильників, що враховують рядок з такими значеннями полів;
+    None, якщо поле умови відкладене (розбіжність виправить reconcile)."""
+    names = set()
+    for spec in _specs_for(sender):
+        current = [values.get(field, _MISSING) for field in spec.filters]
+        if _MISSING in current:
+            return None
+        if current == list(spec.filters.values()):
+            names.add(spec.name)
+    return names
+
+
+def _remember(sender, instance, **kwargs):
+    # Викликається на кожен завантажений об'єкт, тож лише копіює значення
+    instance.__dict__[INITIAL_ATTR] = _snapshot(sender, instance)
+
+
+def _on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    now_counted = _counted(sender, instance.__dict__)
+    if created:
+        counted = set()
+    else:
+        # Без умов оновлення нічого не змінює
+        initial = instance.__dict__.get(INITIAL_ATTR)
+        counted = _counted(sender, initial) if initial is not None else None
+    if counted is not None and now_counted is not None:
+        for name in now_counted - counted:
+            incr(name)
+        for name in counted - now_counted:
+            incr(name, -1)
+    instance.__dict__[INITIAL_ATTR] = _snapshot(sender, instance)
+
+
+def _on_delete(sender, instance, **kwargs):
+    initial = instance.__dict__.get(INITIAL_ATTR)
+    counted = _counted(sender, initial if initial is not None else instance.__dict__)
+    for name in counted or ():
+        incr(name, -1)
+
+
+def incr(name, delta=1):
+    # Атомарний UPDATE ... SET value = value + delta у транзакції запиту
+    updated = SiteCounter.objects.filter(name=name).update(value=F('value') + delta)
+    if not updated:
+        reconcile([name])
+
+
+def get_counters():
+    """Усі лічильники одним запитом по первинному ключу."""
+    values = dict(SiteCounter.objects.values_list('name', 'value'))
+    missing = [name for name in _registry if name not in values]
+    if missing:
+        values.update(reconcile(missing))
+    return values
+
+
+def get_counter(name):
+    return get_counters()[name]
+
+
+def reconcile(names=None):
+    """Перераховує лічильники COUNT-ами; щогодини через reconcile_counters (cron у render.yaml)."""
+    now = timezone.now()
+    values = {}
+    for name, spec in _registry.items():
+        if names and name not in names:
+            continue
+        values[name] = spec.count()
+        SiteCounter.objects.update_or_create(name=name, defaults={'value': values[name], 'reconciled_at': now})
+    return values
+
+
+def register_defaults():
+    from django.contrib.auth import get_user_model
+    from forum.models import Message, Topic
+    from gallery.models import MediaItem
+    from portfolio.models import PortfolioItem
+    from posts.models import Comment, Post
+
+    register('users', get_user_model())
+    register('posts', Post)
+    register('comments', Comment)
+    register('topics', Topic)
+    register('messages', Message)
+    register('gallery_approved', MediaItem, {'is_approved': True})
+    register('portfolio_approved', PortfolioItem, {'is_approved': True})
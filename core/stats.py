@@ -0,0 +1,124 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from forum.models import Topic
+from posts.models import Post
+from surveys.models import Survey
+from votes.models import Vote
+from . import site_counters
+from .models import StatsSnapshot
+
+# Через скільки секунд знімок вважається застарілим
+STATS_SNAPSHOT_MAX_AGE = getattr(settings, 'STATS_SNAPSHOT_MAX_AGE', 300)
+SNAPSHOT_KEY = 'site'
+# Перераховує застарілий знімок лише один запит; решта віддають старий
+REFRESH_LOCK_KEY = 'stats:refresh-lock'
+REFRESH_LOCK_TIMEOUT = 60
+ACTIVITY_DAYS = 7
+TOP_LIMIT = 5
+
+
+def _period_counts(queryset, field, week_ago, month_ago):
+    # Обидва лічильники одним проходом по таблиці
+    return queryset.aggregate(
+        week=Count('pk', filter=Q(**{f'{field}__gte': week_ago})),
+        month=Count('pk', filter=Q(**{f'{field}__gte': month_ago})),
+    )
+
+
+def _daily_counts(queryset, field, since):
+    rows = queryset.filter(**{f'{field}__gte': since}).annotate(
+        day=TruncDate(field)
+    ).values('day').annotate(total=Count('pk')).order_by()
+    return {row['day']: row['total'] for row in rows}
+
+
+def _top_users(queryset, relation, label):
+    return list(
+        queryset.annotate(**{label: Count(relation)}).filter(**{f'{label}__gt': 0})
+        .order_by(f'-{label}', 'pk').values('pk', 'username', label)[:TOP_LIMIT]
+    )
+
+
+def compute_stats(now=None):
+    User = get_user_model()
+    now = now or timezone.now()
+    week_ago = now - timedelta(days=7)
+    month_ago = now - timedelta(days=30)
+
+    users = _period_counts(User.objects.all(), 'date_joined', week_ago, month_ago)
+    posts = _period_counts(Post.objects.all(), 'created_at', week_ago, month_ago)
+    topics = _period_counts(Topic.objects.all(), 'created_at', week_ago, month_ago)
+
+    counters = site_counters.get_counters()
+
+    stats = {
+        'total_users': counters['users'],
+        'total_posts': counters['posts'],
+        'total_topics': counters['topics'],
+        'total_comments': counters['comments'],
+        'total_messages': counters['messages'],
+        'total_gallery': counters['gallery_approved'],
+        'total_portfolio': counters['portfolio_approved'],
+        'total_surveys': Survey.objects.count(),
+        'total_votes': Vote.objects.count(),
+        'new_users_week': users['week'],
+        'new_posts_week': posts['week'],
+        'new_topics_week': topics['week'],
+        'new_users_month': users['month'],
+        'new_posts_month': posts['month'],
+        'new_topics_month': topics['month'],
+        'top_posters': _top_users(User.objects.all(), 'posts', 'post_count'),
+        'top_commenters': _top_users(User.objects.all(), 'comments', 'comment_count'),
+    }
+
+    # Активність за останні 7 днів: по одному GROUP BY дата на таблицю
+    today = timezone.localdate(now)
+    since = timezone.make_aware(datetime.combine(today - timedelta(days=ACTIVITY_DAYS - 1), time.min))
+    daily_posts = _daily_counts(Post.objects.all(), 'created_at', since)
+    daily_topics = _daily_counts(Topic.objects.all(), 'created_at', since)
+    daily_users = _daily_counts(User.objects.all(), 'date_joined', since)
+
+    activity = []
+    for offset in range(ACTIVITY_DAYS - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        activity.append({
+            'date': day.strftime('%d.%m'),
+            'posts': daily_posts.get(day, 0),
+            'topics': daily_topics.get(day, 0),
+            'users': daily_users.get(day, 0),
+        })
+    stats['activity'] = activity
+    return stats
+
+
+def refresh_stats(now=None):
+    now = now or timezone.now()
+    snapshot, _ = StatsSnapshot.objects.update_or_create(
+        key=SNAPSHOT_KEY,
+        defaults={'data': compute_stats(now), 'refreshed_at': now},
+    )
+    return snapshot
+
+
+def get_stats(max_age=STATS_SNAPSHOT_MAX_AGE):
+    """Дані сторінки статистики зі знімка. Застарілий знімок перераховує той
+    запит, що взяв блокування, решта поки віддають попередній."""
+    snapshot = StatsSnapshot.objects.filter(key=SNAPSHOT_KEY).first()
+    if snapshot is not None and snapshot.refreshed_at >= timezone.now() - timedelta(seconds=max_age):
+        return snapshot.data
+    if cache.add(REFRESH_LOCK_KEY, 1, REFRESH_LOCK_TIMEOUT):
+        try:
+            return refresh_stats().data
+        finally:
+            cache.delete(REFRESH_LOCK_KEY)
+    if snapshot is not None:
+        return snapshot.data
+    # Першого знімка ще немає — віддавати нічого, рахуємо без збереження
+    return compute_stats()
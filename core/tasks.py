@@ -0,0 +1,22 @@
+from . import images, search, uploads
+from .jobs import task
+
+
+@task('images.generate_variants', queue='images', cpu_bound=True)
+def generate_image_variants(model, field, name, presets):
+    images.generate_for(model, field, name, presets)
+
+
+@task('uploads.inspect', queue='uploads')
+def inspect_upload(model, pk, field, name):
+    uploads.inspect(model, pk, field, name)
+
+
+@task('search.index', queue='search')
+def index_search_document(kind, pk):
+    search.index_object(kind, pk)
+
+
+@task('search.index_related', queue='search')
+def index_related_search_documents(kind, model, pk):
+    search.index_related(kind, model, pk)
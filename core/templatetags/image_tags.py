@@ -0,0 +1,34 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from core.images import variant_exists, variant_name, variant_url as _variant_url
+
+register = template.Library()
+
+
+@register.filter
+def variant_url(field_file, preset):
+    """{{ user.avatar|variant_url:'square_sm' }} — WebP-варіант або оригінал."""
+    return _variant_url(field_file, preset)
+
+
+@register.simple_tag
+def picture(field_file, preset, **attrs):
+    """{% picture post.author.avatar 'square_sm' class='rounded-circle' width=48 height=48 %}
+
+    <picture> з WebP і JPEG-варіантами; поки варіантів немає — звичайний <img> з оригіналом.
+    """
+    if not field_file:
+        return ''
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    storage = field_file.storage
+    webp = variant_name(field_file.name, preset, 'webp')
+    jpeg = variant_name(field_file.name, preset, 'jpg')
+    if variant_exists(storage, webp) and variant_exists(storage, jpeg):
+        return format_html(
+            '<picture><source srcset="{}" type="image/webp"><img src="{}"{}></picture>',
+            storage.url(webp), storage.url(jpeg), flatatt(attrs),
+        )
+    return format_html('<img src="{}"{}>', field_file.url, flatatt(attrs))
@@ -1,3 +1,372 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from gallery.models import MediaItem
+from posts.models import Post
+from .models import FileInfo, Job, SearchDocument, StatsSnapshot
+from materials.models import Material
+from accounts.models import Follow
+from posts.timeline import timeline_for
+from . import facets, images, jobs, site_counters, stats, uploads
+from .instrumentation import QueryBudgetExceeded, view_stats
+from .pagination import CursorPaginator, InvalidCursor
+from .search import rebuild
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class GlobalSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('s1mple', password='pass12345')
+        cls.post = Post.objects.create(author=cls.author, content='Найкращий смоук на Mirage')
+        cls.hidden = MediaItem.objects.create(
+            user=cls.author, title='Mirage smoke', media_type='image', file='gallery/smoke.png'
+        )
+        # Пошуковий індекс оновлює воркер
+        jobs.run_pending(queues=['search'])
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('core:global_search'), {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.context['results']
+
+    def test_documents_follow_model_changes(self):
+        self.assertTrue(SearchDocument.objects.filter(kind='post', object_id=self.post.pk).exists())
+        self.post.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind='post', object_id=self.post.pk).exists())
+
+    def test_search_matches_prefix_and_skips_unapproved_items(self):
+        self.assertEqual(self.search('mira'), [('post', self.post)])
+        self.assertEqual(self.search('СМОУК'), [('post', self.post)])
+
+    def test_username_change_reindexes_authored_documents(self):
+        self.author.username = 'zywoo'
+        self.author.save()
+        jobs.run_pending(queues=['search'])
+        self.assertEqual(SearchDocument.objects.get(kind='post', object_id=self.post.pk).title, 'zywoo')
+        self.assertCountEqual(self.search('zywoo'), [('user', self.author), ('post', self.post)])
+
+    def test_results_are_paginated_in_database(self):
+        Post.objects.bulk_create([Post(author=self.author, content=f'mirage {i}') for i in range(25)])
+        rebuild(['post'])
+        self.assertEqual(len(self.search('mirage')), 20)
+        self.assertEqual(len(self.search('mirage', page=2)), 6)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', password='pass12345')
+        Post.objects.bulk_create([Post(author=author, content=f'Пост {i}', is_pinned=i % 3 == 0) for i in range(10)])
+        # Однакові created_at: порядок між ними вирішує лише id
+        moment = timezone.now()
+        Post.objects.filter(pk__in=Post.objects.order_by('pk').values('pk')[2:7]).update(created_at=moment)
+
+    def walk(self, paginator):
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return pages
+
+    def test_pages_follow_mixed_ordering_with_ties_in_both_directions(self):
+        ordering = ('-is_pinned', 'created_at', '-id')
+        paginator = CursorPaginator(Post.objects.all(), 3, ordering)
+        pages = self.walk(paginator)
+        expected = list(Post.objects.order_by(*ordering).values_list('pk', flat=True))
+        self.assertEqual([post.pk for page in pages for post in page], expected)
+        self.assertFalse(pages[0].has_previous())
+
+        # Назад від останньої сторінки — ті самі сторінки у зворотному порядку
+        page = pages[-1]
+        for previous in reversed(pages[:-1]):
+            page = paginator.page(page.previous_cursor)
+            self.assertEqual([post.pk for post in page], [post.pk for post in previous])
+            self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_invalid_cursors_are_rejected(self):
+        paginator = CursorPaginator(Post.objects.all(), 3)
+        cursor = paginator.page().next_cursor
+        self.assertEqual(paginator.decode_cursor(cursor + '=' * (-len(cursor) % 4)), paginator.decode_cursor(cursor))
+        wrong_arity = CursorPaginator(Post.objects.all(), 3, ('-id',)).page().next_cursor
+        for bad in (cursor[:-2], cursor[:5] + '!' + cursor[6:], 'e30', 'W10', 'bnVsbA', wrong_arity,
+                    'eyJ2IjpbIjIwMjUteHgiLDFdfQ', 'eyJ2IjpbbnVsbCxudWxsXX0'):
+            with self.subTest(cursor=bad):
+                with self.assertRaises(InvalidCursor):
+                    paginator.decode_cursor(bad)
+
+        response = self.client.get(reverse('posts:post_list'), {'cursor': wrong_arity})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('forum:latest_topics'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class StatsViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('coldzera', password='pass12345')
+        Post.objects.create(author=cls.user, content='ace')
+        Post.objects.create(author=cls.user, content='clutch')
+
+    def test_stats_are_served_from_snapshot(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('core:stats'))
+        self.assertEqual(response.context['total_posts'], 2)
+        self.assertEqual(response.context['activity'][-1]['posts'], 2)
+        self.assertEqual(response.context['top_posters'][0]['post_count'], 2)
+
+        Post.objects.create(author=self.user, content='stale')
+        with self.assertNumQueries(3):
+            # сесія, користувач, знімок
+            response = self.client.get(reverse('core:stats'))
+        self.assertEqual(response.context['total_posts'], 2)
+
+        # Знімок застарів, але його вже перераховує інший запит
+        StatsSnapshot.objects.update(refreshed_at=timezone.now() - timedelta(hours=1))
+        cache.add(stats.REFRESH_LOCK_KEY, 1)
+        self.addCleanup(cache.delete, stats.REFRESH_LOCK_KEY)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('core:stats'))
+        self.assertEqual(response.context['total_posts'], 2)
+        cache.delete(stats.REFRESH_LOCK_KEY)
+        response = self.client.get(reverse('core:stats'))
+        self.assertEqual(response.context['total_posts'], 3)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class HomeFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('zywoo', password='pass12345')
+
+    def test_fragments_are_cached_until_models_change(self):
+        self.client.get(reverse('core:home'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('core:home'))
+
+        post = Post.objects.create(author=self.author, content='новий пост')
+        response = self.client.get(reverse('core:home'))
+        self.assertEqual(response.context['latest_posts'], [post])
+        self.assertEqual(response.context['stats']['posts_count'], 1)
+
+
+class SiteCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ropz', password='pass12345')
+
+    def test_counters_follow_creates_approvals_and_deletes(self):
+        item = MediaItem.objects.create(user=self.user, title='clip', media_type='video', file='gallery/clip.mp4')
+        self.assertEqual(site_counters.get_counter('gallery_approved'), 0)
+
+        item = MediaItem.objects.get(pk=item.pk)
+        item.is_approved = True
+        item.save()
+        self.assertEqual(site_counters.get_counter('gallery_approved'), 1)
+        # Поле умови відкладене — лічильник не чіпаємо і поле не довантажуємо:
+        # вибірка, UPDATE і задача пошукового індексу
+        with self.assertNumQueries(3):
+            MediaItem.objects.only('title').get(pk=item.pk).save(update_fields=['title'])
+        self.assertEqual(site_counters.get_counter('gallery_approved'), 1)
+
+        Post.objects.create(author=self.user, content='gg')
+        self.assertEqual(site_counters.get_counter('posts'), 1)
+
+        self.user.delete()
+        counters = site_counters.get_counters()
+        self.assertEqual((counters['users'], counters['posts'], counters['gallery_approved']), (0, 0, 0))
+
+    def test_reconcile_catches_up_with_bulk_writes(self):
+        Post.objects.bulk_create([Post(author=self.user, content='bulk') for _ in range(3)])
+        self.assertEqual(site_counters.get_counter('posts'), 0)
+        site_counters.reconcile(['posts'])
+        self.assertEqual(site_counters.get_counter('posts'), 3)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class FacetCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('device', password='pass12345')
+
+    def test_counts_are_cached_and_invalidated_on_change(self):
+        MediaItem.objects.create(user=self.user, title='clip', media_type='video', file='gallery/clip.mp4', is_approved=True)
+        MediaItem.objects.create(user=self.user, title='hidden', media_type='video', file='gallery/x.mp4')
+        self.assertEqual(facets.get_counts('gallery:media_type')['gallery:media_type']['video'], 1)
+        with self.assertNumQueries(0):
+            facets.get_counts('gallery:media_type')
+
+        Material.objects.create(title='cfg', description='', category='configs')
+        response = self.client.get(reverse('materials:material_list'))
+        self.assertIn(('configs', 'Конфіги (cfg-файли)', 1), response.context['categories'])
+        Material.objects.all().delete()
+        self.assertEqual(facets.get_counts('materials:category')['materials:category']['configs'], 0)
+
+
+def png_upload(name):
+    buffer = BytesIO()
+    Image.new('RGBA', (300, 200), (255, 0, 0, 128)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ImageVariantTests(TestCase):
+    def tearDown(self):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_variants_are_generated_after_upload(self):
+        user = User.objects.create_user('s1mple', password='pass12345')
+        user.avatar = png_upload('s1mple.png')
+        user.save()
+        self.assertEqual(jobs.run_pending(queues=['images']), 1)
+
+        small = images.variant_name(user.avatar.name, 'square_sm', 'jpg')
+        with default_storage.open(small) as fh:
+            self.assertEqual(Image.open(fh).size, (96, 96))
+        html = Template("{% load image_tags %}{% picture avatar 'square_sm' width=48 %}").render(Context({'avatar': user.avatar}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(images.variant_name(user.avatar.name, 'square_sm', 'jpg'), html)
+
+        # Збереження без нового файлу варіанти не перераховує
+        User.objects.get(pk=user.pk).save()
+        self.assertFalse(Job.objects.filter(queue='images', status=Job.QUEUED).exists())
+
+    def test_missing_variants_are_cached_until_generated(self):
+        cache.clear()
+        path = default_storage.save('gallery/smoke.png', png_upload('smoke.png'))
+        webp = images.variant_name(path, 'thumb', 'webp')
+        with mock.patch.object(default_storage, 'exists', wraps=default_storage.exists) as exists:
+            self.assertFalse(images.variant_exists(default_storage, webp))
+            self.assertFalse(images.variant_exists(default_storage, webp))
+            self.assertEqual(exists.call_count, 1)
+        images.generate_variants(default_storage, path, ['thumb'])
+        self.assertTrue(images.variant_exists(default_storage, webp))
+
+    def test_non_images_are_skipped(self):
+        path = default_storage.save('gallery/clip.mp4', ContentFile(b'not an image'))
+        self.assertEqual(images.generate_variants(default_storage, path, ['thumb']), [])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class JobQueueTests(TestCase):
+    def tearDown(self):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def test_failed_jobs_are_retried_with_backoff(self):
+        job = jobs.enqueue('search.index', kind='no-such-kind', pk=1)
+        with self.assertLogs('core.jobs', 'WARNING'):
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('KeyError', job.last_error)
+        self.assertGreater(job.run_after, timezone.now())
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now(), attempts=job.max_attempts - 1)
+        with self.assertLogs('core.jobs', 'ERROR'):
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_stale_jobs_are_requeued_until_attempts_run_out(self):
+        hour_ago = timezone.now() - timedelta(hours=1)
+        running = dict(status=Job.RUNNING, locked_by='dead:1', locked_at=hour_ago, run_after=hour_ago)
+        retry = Job.objects.create(name='search.index', attempts=1, **running)
+        exhausted = Job.objects.create(name='search.index', attempts=3, **running)
+        alive = Job.objects.create(name='search.index', attempts=3, **running)
+
+        worker = jobs.Worker()
+        Job.objects.filter(pk=alive.pk).update(locked_by=worker.worker_id)
+        worker.inflight[object()] = alive
+        worker.heartbeat()
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.assertEqual(jobs.requeue_stale(), (1, 1))
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(
+            [statuses[retry.pk], statuses[exhausted.pk], statuses[alive.pk]], [Job.QUEUED, Job.FAILED, Job.RUNNING],
+        )
+
+    def test_upload_is_inspected_by_worker(self):
+        user = User.objects.create_user('broky', password='pass12345')
+        item = MediaItem.objects.create(
+            user=user, title='clip', media_type='image', is_approved=True,
+            file=png_upload('clip.png'),
+        )
+        self.assertFalse(FileInfo.objects.exists())
+
+        with mock.patch.object(uploads, 'UPLOAD_SCANNERS', ['core.tests.infected_scanner']):
+            with self.assertLogs('core.uploads', 'WARNING'):
+                jobs.run_pending(queues=['uploads'])
+        info = FileInfo.objects.get(model='gallery.mediaitem', object_id=item.pk)
+        self.assertEqual((info.width, info.height, info.scan_status), (300, 200, FileInfo.INFECTED))
+        item.refresh_from_db()
+        self.assertFalse(item.is_approved)
+
+    def test_new_post_reaches_followers_through_worker(self):
+        author = User.objects.create_user('author', password='pass12345')
+        follower = User.objects.create_user('follower', password='pass12345')
+        Follow.objects.create(follower=follower, following=author)
+        self.client.force_login(author)
+        with override_settings(SECURE_SSL_REDIRECT=False):
+            self.client.post(reverse('posts:post_create'), {'content': 'gg wp', 'media_type': 'none'})
+        post = Post.objects.get()
+        self.assertEqual([entry.post_id for entry in timeline_for(author)], [post.pk])
+        self.assertFalse(timeline_for(follower).exists())
+        jobs.run_pending()
+        self.assertEqual([entry.post_id for entry in timeline_for(follower)], [post.pk])
+
+
+def infected_scanner(field_file):
+    return False, 'EICAR-Test-Signature'
+
+
+class HealthEndpointTests(TestCase):
+    def test_healthz_does_not_touch_database(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/healthz')
+        self.assertEqual(response.json(), {'status': 'ok'})
+
+    def test_readyz_reports_checks(self):
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['checks'], {'database': 'ok', 'migrations': 'ok', 'media': 'ok'})
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class QueryInstrumentationTests(TestCase):
+    def setUp(self):
+        view_stats.reset()
+        self.admin = User.objects.create_user('admin', password='pass12345', role='admin')
+
+    def test_server_timing_and_aggregates(self):
+        response = self.client.get(reverse('core:about'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('core:query_metrics'))
+        views = {row['view']: row for row in response.json()['views']}
+        self.assertEqual(views['core:about']['requests'], 1)
+
+    @override_settings(QUERY_BUDGET_STRICT=True, QUERY_BUDGETS={'core:status': 0})
+    def test_strict_budget_fails_request(self):
+        with self.assertLogs('core.instrumentation', 'WARNING'), self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('core:status'))
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.client.force_login(User.objects.create_user('player', password='pass12345'))
+        response = self.client.get(reverse('core:query_metrics'))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import mimetypes
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_init, post_save
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image, UnidentifiedImageError
+
+from . import jobs
+from .models import FileInfo
+
+logger = logging.getLogger(__name__)
+
+# Антивірусні перевірки: dotted-шляхи до функцій scanner(file) -> (чистий?, деталі).
+# Порожній список — файли позначаються як 'skipped'
+UPLOAD_SCANNERS = getattr(settings, 'UPLOAD_SCANNERS', [])
+
+_registry = []
+
+
+def on_new_file(model, field, callback, uid):
+    """Викликає callback(instance, field_file), коли в полі field зберегли
+    новий файл. Попередня назва запам'ятовується на post_init."""
+    attr = f'_{uid}_original_name'
+
+    def remember(sender, instance, **kwargs):
+        # Без звернення до дескриптора, щоб не довантажувати відкладені поля
+        value = instance.__dict__.get(field)
+        instance.__dict__[attr] = getattr(value, 'name', value)
+
+    def on_save(sender, instance, raw=False, **kwargs):
+        # Відкладене поле не завантажували, отже й не змінювали
+        if raw or field not in instance.__dict__:
+            return
+        field_file = getattr(instance, field)
+        if field_file and field_file.name != instance.__dict__.get(attr):
+            instance.__dict__[attr] = field_file.name
+            callback(instance, field_file)
+
+    dispatch_uid = f'{uid}-{model._meta.label_lower}-{field}'
+    post_init.connect(remember, sender=model, weak=False, dispatch_uid=f'{dispatch_uid}-init')
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f'{dispatch_uid}-save')
+
+
+def register(model, field):
+    """Після завантаження файлу ставить у чергу uploads.inspect."""
+    _registry.append((model, field))
+
+    def schedule(instance, field_file):
+        jobs.enqueue('uploads.inspect', model=model._meta.label_lower, pk=instance.pk, field=field, name=field_file.name)
+
+    on_new_file(model, field, schedule, uid='uploads')
+
+
+def scan(field_file):
+    if not UPLOAD_SCANNERS:
+        return FileInfo.SKIPPED, ''
+    for path in UPLOAD_SCANNERS:
+        field_file.open('rb')
+        try:
+            clean, detail = import_string(path)(field_file)
+        finally:
+            field_file.close()
+        if not clean:
+            return FileInfo.INFECTED, str(detail)[:255]
+    return FileInfo.CLEAN, ''
+
+
+def inspect(model, pk, field, name):
+    """Метадані (розмір, тип, розміри зображення, sha256) і антивірусна перевірка.
+
+    Заражений файл прибирається з модерації: is_approved скидається в False.
+    """
+    model_class = apps.get_model(model)
+    instance = model_class._default_manager.filter(pk=pk).first()
+    if instance is None or getattr(instance, field).name != name:
+        # Об'єкт видалили або файл уже замінили — для нового файлу є своя задача
+        return None
+    field_file = getattr(instance, field)
+
+    digest = hashlib.sha256()
+    with field_file.open('rb') as fh:
+        for chunk in fh.chunks():
+            digest.update(chunk)
+        fh.seek(0)
+        try:
+            width, height = Image.open(fh).size
+        except (UnidentifiedImageError, OSError):
+            width = height = None
+
+    scan_status, scan_detail = scan(field_file)
+    info, _ = FileInfo.objects.update_or_create(
+        model=model, object_id=pk, field=field,
+        defaults={
+            'name': name,
+            'size': field_file.size,
+            'content_type': mimetypes.guess_type(name)[0] or '',
+            'width': width,
+            'height': height,
+            'sha256': digest.hexdigest(),
+            'scan_status': scan_status,
+            'scan_detail': scan_detail,
+            'inspected_at': timezone.now(),
+        },
+    )
+    if scan_status == FileInfo.INFECTED:
+        logger.warning('Заражений файл %s у %s#%s: %s', name, model, pk, scan_detail)
+        if any(f.name == 'is_approved' for f in model_class._meta.fields):
+            model_class._default_manager.filter(pk=pk).update(is_approved=False)
+    return info
+
+
+def register_defaults():
+    from gallery.models import MediaItem
+    from materials.models import Material
+    from portfolio.models import PortfolioItem
+    from posts.models import Post
+
+    register(MediaItem, 'file')
+    register(PortfolioItem, 'file')
+    register(Post, 'media_file')
+    register(Material, 'file')
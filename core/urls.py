@@ -29,6 +29,7 @@ urlpatterns = [
     
     # Статус сайту
     path('status/', views.StatusView.as_view(), name='status'),
+    path('metrics/queries/', views.QueryMetricsView.as_view(), name='query_metrics'),
     
     # Карта сайту
     path('sitemap/', views.SitemapView.as_view(), name='sitemap'),
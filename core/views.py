@@ -1,66 +1,48 @@
-from django.views.generic import TemplateView, ListView
+from django.views.generic import TemplateView, View
 from django.views.generic.edit import FormView
 from django.urls import reverse_lazy
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth import get_user_model
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404, JsonResponse
 from django.utils import timezone
 from datetime import timedelta
 from .forms import ContactForm
 
 # Імпортуємо моделі з інших додатків
-from posts.models import Post, Hashtag
+from posts.models import Post
+from . import health, search, site_counters, stats
+from .instrumentation import view_stats
+from .async_views import AsyncTemplateView
+from .fragment_cache import aget_fragments
 from forum.models import Topic
 from gallery.models import MediaItem
 from portfolio.models import PortfolioItem
 from events.models import Event
-from announcements.models import Announcement
-from surveys.models import Survey
 from votes.models import Vote
 
 User = get_user_model()
 
-class HomeView(TemplateView):
+class HomeView(AsyncTemplateView):
     template_name = 'core/home.html'
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        
-        # Останні пости
-        context['latest_posts'] = Post.objects.all().order_by('-created_at')[:5]
-        
-        # Популярні хештеги
-        context['trending_hashtags'] = Hashtag.objects.annotate(
-            post_count=Count('posts')
-        ).order_by('-post_count')[:10]
-        
-        # Активні події
-        now = timezone.now()
-        context['upcoming_events'] = Event.objects.filter(
-            date__gte=now, 
-            is_active=True
-        ).order_by('date')[:3]
-        
-        # Останні оголошення
-        context['latest_announcements'] = Announcement.objects.filter(
-            is_pinned=True
-        ).order_by('-created_at')[:3]
-        
-        # Активні голосування
-        context['active_votes'] = Vote.objects.filter(
-            is_active=True
-        ).filter(
-            Q(end_date__isnull=True) | Q(end_date__gt=now)
-        )[:3]
-        
-        # Статистика
-        context['stats'] = {
-            'users_count': User.objects.count(),
-            'posts_count': Post.objects.count(),
-            'topics_count': Topic.objects.count(),
-            'gallery_count': MediaItem.objects.filter(is_approved=True).count(),
-            'portfolio_count': PortfolioItem.objects.filter(is_approved=True).count(),
-        }
+    async def aget_context_data(self, **kwargs):
+        context = await super().aget_context_data(**kwargs)
+        
+        # Блоки беремо з кешу фрагментів (core.fragments) одним переходом у sync-потік;
+        # читаються вони послідовно, не паралельно
+        fragments = await aget_fragments(
+            'home:latest_posts',
+            'home:trending_hashtags',
+            'home:upcoming_events',
+            'home:latest_announcements',
+            'home:active_votes',
+            'home:stats',
+        )
+        for name, value in fragments.items():
+            context[name.split(':', 1)[1]] = value
         
         return context
 
@@ -150,145 +132,107 @@ class StatsView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        now = timezone.now()
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
-        
-        # Загальна статистика
-        context['total_users'] = User.objects.count()
-        context['total_posts'] = Post.objects.count()
-        context['total_comments'] = Post.objects.aggregate(total=Count('comments'))['total']
-        context['total_topics'] = Topic.objects.count()
-        context['total_messages'] = Topic.objects.aggregate(total=Count('messages'))['total']
-        context['total_gallery'] = MediaItem.objects.filter(is_approved=True).count()
-        context['total_portfolio'] = PortfolioItem.objects.filter(is_approved=True).count()
-        context['total_surveys'] = Survey.objects.count()
-        context['total_votes'] = Vote.objects.count()
-        
-        # Статистика за останній тиждень
-        context['new_users_week'] = User.objects.filter(date_joined__gte=week_ago).count()
-        context['new_posts_week'] = Post.objects.filter(created_at__gte=week_ago).count()
-        context['new_topics_week'] = Topic.objects.filter(created_at__gte=week_ago).count()
-        
-        # Статистика за останній місяць
-        context['new_users_month'] = User.objects.filter(date_joined__gte=month_ago).count()
-        context['new_posts_month'] = Post.objects.filter(created_at__gte=month_ago).count()
-        context['new_topics_month'] = Topic.objects.filter(created_at__gte=month_ago).count()
-        
-        # Топ-користувачі
-        context['top_users'] = User.objects.annotate(
-            post_count=Count('posts')
-        ).order_by('-post_count')[:5]
-        
-        context['top_posters'] = User.objects.annotate(
-            post_count=Count('posts')
-        ).order_by('-post_count')[:5]
-        
-        context['top_commenters'] = User.objects.annotate(
-            comment_count=Count('comments')
-        ).order_by('-comment_count')[:5]
-        
-        # Активність за останні 7 днів
-        activity = []
-        for i in range(7):
-            day = now - timedelta(days=i)
-            activity.append({
-                'date': day.strftime('%d.%m'),
-                'posts': Post.objects.filter(created_at__date=day.date()).count(),
-                'topics': Topic.objects.filter(created_at__date=day.date()).count(),
-                'users': User.objects.filter(date_joined__date=day.date()).count(),
-            })
-        context['activity'] = activity[::-1]
+        # Усі агрегати беруться з періодично оновлюваного знімка (core.stats)
+        context.update(stats.get_stats())
         
         return context
 
-class GlobalSearchView(ListView):
+class GlobalSearchView(AsyncTemplateView):
     template_name = 'core/search.html'
-    context_object_name = 'results'
     paginate_by = 20
     
-    def get_queryset(self):
-        query = self.request.GET.get('q', '').strip()
-        if not query:
-            return []
-        
-        results = []
-        
-        # Пошук у постах
-        posts = Post.objects.filter(
-            Q(content__icontains=query) |
-            Q(author__username__icontains=query)
-        )[:10]
-        results.extend([('post', post) for post in posts])
-        
-        # Пошук у темах форуму
-        topics = Topic.objects.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query) |
-            Q(created_by__username__icontains=query)
-        )[:10]
-        results.extend([('topic', topic) for topic in topics])
-        
-        # Пошук у галереї
-        gallery_items = MediaItem.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(user__username__icontains=query),
-            is_approved=True
-        )[:10]
-        results.extend([('gallery', item) for item in gallery_items])
-        
-        # Пошук у портфоліо
-        portfolio_items = PortfolioItem.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(user__username__icontains=query),
-            is_approved=True
-        )[:10]
-        results.extend([('portfolio', item) for item in portfolio_items])
-        
-        # Пошук користувачів
-        users = User.objects.filter(
-            Q(username__icontains=query) |
-            Q(email__icontains=query)
-        )[:10]
-        results.extend([('user', user) for user in users])
-        
-        return results
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    async def aget_context_data(self, **kwargs):
+        context = await super().aget_context_data(**kwargs)
         context['query'] = self.request.GET.get('q', '')
+        context['results'] = []
+        query = context['query'].strip()
+        if not query:
+            return context
+        
+        # Один ранжований запит до індексу core.SearchDocument; COUNT і LIMIT/OFFSET — у БД.
+        # Paginator над range(total) лише рахує межі сторінки
+        found = await sync_to_async(search.search)(query)
+        paginator = Paginator(range(await found.acount()), self.paginate_by)
+        page_number = self.request.GET.get('page') or 1
+        if page_number == 'last':
+            page_number = paginator.num_pages
+        try:
+            page = paginator.page(page_number)
+        except InvalidPage:
+            raise Http404('Невірний номер сторінки.')
+        page.object_list = await found.aslice(page.start_index() - 1, page.end_index())
+        
+        context.update({
+            'results': page.object_list,
+            'page_obj': page,
+            'paginator': paginator,
+            'is_paginated': page.has_other_pages(),
+        })
         return context
 
 class StatusView(TemplateView):
     template_name = 'core/status.html'
+    # Скільки секунд кешувати зібраний статус
+    cache_timeout = 5
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
+        status = cache.get('core:status')
+        if status is None:
+            status = self.collect_status()
+            cache.set('core:status', status, self.cache_timeout)
+        context['status'] = status
+        
+        return context
+    
+    def collect_status(self):
         import time
         start_time = time.time()
         
         # Перевіряємо підключення до бази даних
-        try:
-            User.objects.first()
-            db_status = 'ok'
-        except Exception:
-            db_status = 'error'
+        db_ok, _ = health.check_database()
+        db_status = 'ok' if db_ok else 'error'
         
         response_time = int((time.time() - start_time) * 1000)
         
-        context['status'] = {
+        status = {
             'database': db_status,
             'response_time': response_time,
             'server_time': timezone.now().strftime('%d.%m.%Y %H:%M:%S'),
             'users_online': User.objects.filter(last_login__gte=timezone.now() - timedelta(minutes=15)).count(),
-            'total_users': User.objects.count(),
-            'total_posts': Post.objects.count(),
         }
-        
-        return context
+        counters = site_counters.get_counters()
+        status['total_users'] = counters['users']
+        status['total_posts'] = counters['posts']
+        return status
+
+class HealthzView(View):
+    # Liveness: процес відповідає; без БД, сесій і шаблонів
+    def get(self, request):
+        return JsonResponse({'status': 'ok'})
+
+class ReadyzView(View):
+    # Readiness: БД (SELECT 1 з таймаутом), застосовані міграції, доступ до MEDIA_ROOT
+    def get(self, request):
+        ready, checks = health.readiness()
+        return JsonResponse(
+            {'status': 'ok' if ready else 'error', 'checks': checks},
+            status=200 if ready else 503,
+        )
+
+class QueryMetricsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    # Агрегати QueryInstrumentationMiddleware по view цього процесу
+    def test_func(self):
+        return self.request.user.is_admin()
+    
+    def get(self, request):
+        views = view_stats.snapshot()
+        ordering = request.GET.get('sort', 'avg_queries')
+        if ordering not in {'avg_queries', 'max_queries', 'avg_db_ms', 'avg_total_ms', 'requests', 'over_budget'}:
+            ordering = 'avg_queries'
+        rows = sorted(views.items(), key=lambda item: item[1][ordering], reverse=True)
+        return JsonResponse({'sort': ordering, 'views': [{'view': name, **row} for name, row in rows]})
 
 class SitemapView(TemplateView):
     template_name = 'core/sitemap.html'
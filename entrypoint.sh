@@ -11,12 +11,55 @@ python manage.py migrate --noinput
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+# Воркер фонових задач (мініатюри, пошуковий індекс, розсилка постів).
+# Працює в тому ж контейнері, бо йому потрібен той самий media/. Якщо впаде —
+# перезапускається; SIGTERM пересилається, щоб Worker.stop дочекався задач
+supervise_worker() {
+    stopping=0
+    trap 'stopping=1; kill -TERM "$worker" 2>/dev/null' TERM INT
+    while [ "$stopping" = 0 ]; do
+        python manage.py run_worker &
+        worker=$!
+        wait "$worker"
+        status=$?
+        # wait перериває сигнал — чекаємо, поки воркер завершить поточні задачі
+        if kill -0 "$worker" 2>/dev/null; then
+            wait "$worker"
+            status=$?
+        fi
+        if [ "$stopping" = 0 ]; then
+            echo "Background worker exited with status $status, restarting in 5 s..."
+            sleep 5
+        fi
+    done
+}
+
+echo "Starting background worker..."
+supervise_worker &
+supervisor=$!
+
 # Запустити Gunicorn
 echo "Starting Gunicorn server..."
-exec gunicorn group_project.wsgi:application \
-    --bind 0.0.0.0:8000 \
+# ASGI з uvicorn-воркерами; GUNICORN_APP=group_project.wsgi:application
+# і GUNICORN_WORKER_CLASS=sync повертають звичайний WSGI-режим
+gunicorn "${GUNICORN_APP:-group_project.asgi:application}" \
+    --worker-class "${GUNICORN_WORKER_CLASS:-uvicorn_worker.UvicornWorker}" \
+    --bind "0.0.0.0:${PORT:-8000}" \
     --workers 4 \
     --timeout 120 \
     --access-logfile - \
     --error-logfile - \
-    --log-level info
\ No newline at end of file
+    --log-level info &
+web=$!
+
+trap 'kill -TERM "$web" 2>/dev/null' TERM INT
+wait "$web"
+status=$?
+if kill -0 "$web" 2>/dev/null; then
+    wait "$web"
+    status=$?
+fi
+# Gunicorn завершився (сигнал чи помилка) — зупиняємо й воркер
+kill -TERM "$supervisor" 2>/dev/null
+wait "$supervisor"
+exit "$status"
@@ -4,6 +4,7 @@ from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
 from django.utils import timezone
+from core.facets import get_facets
 from .models import Event
 from .forms import EventForm
 from django.views import View
@@ -28,6 +29,7 @@ class EventListView(ListView):
             is_active=True, 
             date__lt=now
         ).order_by('-date')[:5]
+        context['event_types'] = get_facets('events:event_type')['events:event_type']
         return context
 
 class UpcomingEventListView(ListView):
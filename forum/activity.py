@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import overview
+from .models import ForumCategory, Message, Topic
+
+
+def record_topic(topic):
+    """Нова тема: +1 до лічильника категорії, тема стає останньою."""
+    ForumCategory.objects.filter(pk=topic.category_id).update(
+        topic_count=F('topic_count') + 1,
+        last_topic=topic.pk,
+    )
+    transaction.on_commit(overview.invalidate)
+
+
+def record_reply(message):
+    """Оновлює лічильник і останню активність теми й категорії після нової відповіді.
+
+    Викликається в тій самій транзакції, що й збереження повідомлення; F()
+    не губить паралельні відповіді.
+    """
+    Topic.objects.filter(pk=message.topic_id).update(
+        reply_count=F('reply_count') + 1,
+        last_message_at=message.created_at,
+        last_message_author=message.author_id,
+    )
+    ForumCategory.objects.filter(pk=message.topic.category_id).update(
+        message_count=F('message_count') + 1,
+        last_topic=message.topic_id,
+    )
+    transaction.on_commit(overview.invalidate)
+
+
+def refresh(topic_ids=None):
+    """Перераховує активність тем з таблиці Message (після видалення відповіді
+    чи масових змін). Тема без відповідей повертається до власного created_at.
+
+    Без topic_ids — усі теми (recount_forum).
+    """
+    topics = Topic.objects.all() if topic_ids is None else Topic.objects.filter(pk__in=topic_ids)
+    latest = Message.objects.filter(topic=OuterRef('pk')).order_by('-created_at', '-pk')
+    replies = (
+        Message.objects.filter(topic=OuterRef('pk')).order_by()
+        .values('topic').annotate(n=Count('pk')).values('n')
+    )
+    return topics.update(
+        reply_count=Coalesce(Subquery(replies, output_field=IntegerField()), Value(0)),
+        last_message_at=Coalesce(Subquery(latest.values('created_at')[:1]), F('created_at')),
+        last_message_author=Subquery(latest.values('author')[:1]),
+    )
+
+
+def refresh_categories(category_ids=None):
+    """Перераховує лічильники категорій з уже денормалізованих колонок Topic
+    (після видалення чи перенесення теми). Без category_ids — усі категорії."""
+    categories = ForumCategory.objects.all() if category_ids is None else ForumCategory.objects.filter(pk__in=category_ids)
+    totals = Topic.objects.filter(category=OuterRef('pk')).order_by().values('category')
+    latest = Topic.objects.filter(category=OuterRef('pk')).order_by('-last_message_at', '-pk')
+    updated = categories.update(
+        topic_count=Coalesce(Subquery(totals.annotate(n=Count('pk')).values('n'), output_field=IntegerField()), Value(0)),
+        message_count=Coalesce(
+            Subquery(totals.annotate(n=Sum('reply_count')).values('n'), output_field=IntegerField()), Value(0),
+        ),
+        last_topic=Subquery(latest.values('pk')[:1]),
+    )
+    transaction.on_commit(overview.invalidate)
+    return updated
+
+
+def refresh_topics_and_categories(topic_ids, category_ids=()):
+    """refresh() для тем і перерахунок їхніх категорій та category_ids
+    (категорії вже видалених тем з БД не дізнатися)."""
+    refresh(topic_ids)
+    category_ids = set(category_ids)
+    category_ids.update(Topic.objects.filter(pk__in=topic_ids).values_list('category_id', flat=True))
+    return refresh_categories(category_ids)
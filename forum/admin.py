@@ -1,3 +1,46 @@
 from django.contrib import admin
+from .activity import refresh_categories, refresh_topics_and_categories
+from .models import ForumCategory, Topic, Message
 
-# Register your models here.
+@admin.register(ForumCategory)
+class ForumCategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'topic_count', 'message_count', 'last_topic')
+    readonly_fields = ('topic_count', 'message_count', 'last_topic')
+    
+    actions = ['recount']
+    
+    @admin.action(description='Перерахувати лічильники форуму')
+    def recount(self, request, queryset):
+        topic_ids = Topic.objects.filter(category__in=queryset).values_list('pk', flat=True)
+        refresh_topics_and_categories(list(topic_ids), queryset.values_list('pk', flat=True))
+
+@admin.register(Topic)
+class TopicAdmin(admin.ModelAdmin):
+    list_display = ('title', 'category', 'created_by', 'reply_count', 'last_message_at', 'is_pinned', 'is_closed')
+    list_filter = ('category', 'is_pinned', 'is_closed')
+    search_fields = ('title', 'created_by__username')
+    readonly_fields = ('reply_count', 'last_message_at', 'last_message_author', 'created_at', 'updated_at')
+    
+    actions = ['recount']
+    
+    @admin.action(description='Перерахувати лічильники форуму')
+    def recount(self, request, queryset):
+        refresh_topics_and_categories(list(queryset.values_list('pk', flat=True)))
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change or 'category' in form.changed_data:
+            # Як у TopicUpdateView: тема з відповідями переходить в іншу категорію
+            refresh_categories([form.initial.get('category'), obj.category_id])
+
+@admin.register(Message)
+class MessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'topic', 'author', 'created_at')
+    search_fields = ('text', 'author__username')
+    raw_id_fields = ('topic', 'author')
+    readonly_fields = ('created_at', 'updated_at')
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            refresh_topics_and_categories([obj.topic_id])
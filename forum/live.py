@@ -0,0 +1,99 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+from . import pages
+
+# Як часто потік SSE сам перевіряє БД на нові відповіді, секунди. Це запасний
+# шлях для відповідей, створених в інших воркерах: сповіщення брокера лише
+# в межах процесу. Заодно інтервал коментаря-пінгу для проксі
+FORUM_LIVE_POLL_INTERVAL = getattr(settings, 'FORUM_LIVE_POLL_INTERVAL', 5)
+# Скільки тримати одне з'єднання; далі браузер перепідключиться з Last-Event-ID
+FORUM_LIVE_STREAM_TIMEOUT = getattr(settings, 'FORUM_LIVE_STREAM_TIMEOUT', 300)
+# Затримка перепідключення EventSource, мс
+FORUM_LIVE_RETRY_MS = getattr(settings, 'FORUM_LIVE_RETRY_MS', 3000)
+
+
+class Broker:
+    """Pub/sub у межах процесу: publish(topic_id) будить усі потоки цієї теми.
+
+    Повідомлення не передаються — потік сам вибирає нові рядки з БД, тож
+    пропущене сповіщення лише відкладає доставку до наступного опитування.
+    publish можна викликати з будь-якого потоку.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = defaultdict(set)
+
+    def subscribe(self, topic_id):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters[topic_id].add(waiter)
+        return waiter
+
+    def unsubscribe(self, topic_id, waiter):
+        with self._lock:
+            waiters = self._waiters.get(topic_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[topic_id]
+
+    def publish(self, topic_id):
+        with self._lock:
+            waiters = list(self._waiters.get(topic_id, ()))
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Цикл подій уже закрито — підписник зникне в unsubscribe
+                pass
+
+    def subscribers(self, topic_id):
+        with self._lock:
+            return len(self._waiters.get(topic_id, ()))
+
+
+broker = Broker()
+
+
+def publish(topic_id):
+    broker.publish(topic_id)
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in data.splitlines() or [''])
+    return '\n'.join(lines) + '\n\n'
+
+
+async def stream(topic, last_id, moderator):
+    """SSE-потік нових відповідей теми: подія messages з HTML фрагментом
+    (як у ?after=) та id останнього повідомлення для Last-Event-ID."""
+    loop = asyncio.get_running_loop()
+    waiter = broker.subscribe(topic.pk)
+    _, wakeup = waiter
+    deadline = loop.time() + FORUM_LIVE_STREAM_TIMEOUT
+    try:
+        yield f'retry: {FORUM_LIVE_RETRY_MS}\n\n'
+        while loop.time() < deadline:
+            # Скидаємо до запиту: publish під час запиту не загубиться
+            wakeup.clear()
+            new_messages, has_more = await pages.amessages_after(topic, last_id)
+            if new_messages:
+                last_id = new_messages[-1].pk
+                yield format_event('messages', pages.render_messages(new_messages, moderator), last_id)
+                if has_more:
+                    continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), min(FORUM_LIVE_POLL_INTERVAL, max(deadline - loop.time(), 0)))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+    finally:
+        broker.unsubscribe(topic.pk, waiter)
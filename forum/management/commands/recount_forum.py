@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from forum.activity import refresh, refresh_categories
+
+
+class Command(BaseCommand):
+    help = 'Перераховує лічильники й останню активність усіх тем і категорій форуму з таблиці Message'
+
+    def handle(self, *args, **options):
+        topics = refresh()
+        categories = refresh_categories()
+        self.stdout.write(self.style.SUCCESS(f'Перераховано тем: {topics}, категорій: {categories}'))
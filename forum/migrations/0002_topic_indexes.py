@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['-created_at', '-id'], name='forum_topic_created_9fc375_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='forum_topic_categor_eff178_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0002_topic_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['topic', 'id'], name='forum_messa_topic_i_2af89d_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_activity(apps, schema_editor):
+    Topic = apps.get_model('forum', 'Topic')
+    Message = apps.get_model('forum', 'Message')
+    latest = Message.objects.filter(topic=OuterRef('pk')).order_by('-created_at', '-pk')
+    replies = Message.objects.filter(topic=OuterRef('pk')).order_by().values('topic').annotate(
+        total=Count('*')
+    ).values('total')
+    Topic.objects.update(
+        reply_count=Coalesce(Subquery(replies, output_field=IntegerField()), Value(0)),
+        last_message_at=Coalesce(Subquery(latest.values('created_at')[:1]), F('created_at')),
+        last_message_author=Subquery(latest.values('author')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0003_message_topic_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='last_message_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='last_message_author',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['category', '-is_pinned', '-last_message_at', '-id'], name='forum_topic_categor_40045a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['-last_message_at', '-id'], name='forum_topic_last_me_db1fa8_idx'),
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    ForumCategory = apps.get_model('forum', 'ForumCategory')
+    Topic = apps.get_model('forum', 'Topic')
+    totals = Topic.objects.filter(category=OuterRef('pk')).order_by().values('category')
+    latest = Topic.objects.filter(category=OuterRef('pk')).order_by('-last_message_at', '-pk')
+    ForumCategory.objects.update(
+        topic_count=Coalesce(Subquery(totals.annotate(total=Count('*')).values('total'), output_field=IntegerField()), Value(0)),
+        message_count=Coalesce(
+            Subquery(totals.annotate(total=Sum('reply_count')).values('total'), output_field=IntegerField()), Value(0),
+        ),
+        last_topic=Subquery(latest.values('pk')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0004_topic_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forumcategory',
+            name='last_topic',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='forum.topic'),
+        ),
+        migrations.AddField(
+            model_name='forumcategory',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='forumcategory',
+            name='topic_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
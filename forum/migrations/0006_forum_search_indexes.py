@@ -0,0 +1,118 @@
+from django.db import OperationalError, migrations
+
+# Вирази індексів мають збігатися з forum.search (PG_TOPIC_VECTOR, PG_MESSAGE_VECTOR)
+POSTGRES_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    """
+    CREATE INDEX forum_topic_vector_idx ON forum_topic
+    USING GIN (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(content, '')))
+    """,
+    "CREATE INDEX forum_message_vector_idx ON forum_message USING GIN (to_tsvector('simple', text))",
+    'CREATE INDEX forum_topic_title_trgm_idx ON forum_topic USING GIN (title gin_trgm_ops)',
+]
+
+POSTGRES_DROP_SQL = [
+    'DROP INDEX IF EXISTS forum_topic_vector_idx',
+    'DROP INDEX IF EXISTS forum_message_vector_idx',
+    'DROP INDEX IF EXISTS forum_topic_title_trgm_idx',
+]
+
+SQLITE_SQL = [
+    """
+    CREATE VIRTUAL TABLE forum_topic_fts USING fts5(
+        title, content, content='forum_topic', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE forum_message_fts USING fts5(
+        text, content='forum_message', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER forum_topic_fts_ai AFTER INSERT ON forum_topic BEGIN
+        INSERT INTO forum_topic_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER forum_topic_fts_ad AFTER DELETE ON forum_topic BEGIN
+        INSERT INTO forum_topic_fts(forum_topic_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    # Лише при зміні тексту: лічильники активності оновлюють тему на кожну відповідь
+    """
+    CREATE TRIGGER forum_topic_fts_au AFTER UPDATE OF title, content ON forum_topic BEGIN
+        INSERT INTO forum_topic_fts(forum_topic_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO forum_topic_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER forum_message_fts_ai AFTER INSERT ON forum_message BEGIN
+        INSERT INTO forum_message_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER forum_message_fts_ad AFTER DELETE ON forum_message BEGIN
+        INSERT INTO forum_message_fts(forum_message_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER forum_message_fts_au AFTER UPDATE OF text ON forum_message BEGIN
+        INSERT INTO forum_message_fts(forum_message_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO forum_message_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    # Наявні теми й відповіді
+    "INSERT INTO forum_topic_fts(forum_topic_fts) VALUES ('rebuild')",
+    "INSERT INTO forum_message_fts(forum_message_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS forum_topic_fts_ai',
+    'DROP TRIGGER IF EXISTS forum_topic_fts_ad',
+    'DROP TRIGGER IF EXISTS forum_topic_fts_au',
+    'DROP TRIGGER IF EXISTS forum_message_fts_ai',
+    'DROP TRIGGER IF EXISTS forum_message_fts_ad',
+    'DROP TRIGGER IF EXISTS forum_message_fts_au',
+    'DROP TABLE IF EXISTS forum_topic_fts',
+    'DROP TABLE IF EXISTS forum_message_fts',
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for sql in POSTGRES_SQL:
+            schema_editor.execute(sql)
+    elif vendor == 'sqlite':
+        try:
+            for sql in SQLITE_SQL:
+                schema_editor.execute(sql)
+        except OperationalError:
+            # SQLite зібрано без FTS5 — forum.search працюватиме через icontains
+            for sql in SQLITE_DROP_SQL:
+                schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for sql in POSTGRES_DROP_SQL:
+            schema_editor.execute(sql)
+    elif vendor == 'sqlite':
+        for sql in SQLITE_DROP_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0005_category_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
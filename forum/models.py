@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class ForumCategory(models.Model):
     CATEGORY_CHOICES = [
@@ -13,6 +14,13 @@ class ForumCategory(models.Model):
     name = models.CharField(max_length=100, choices=CATEGORY_CHOICES, unique=True)
     description = models.TextField(blank=True)
     icon = models.CharField(max_length=50, blank=True)
+    # Лічильники для /forum/ (forum.activity): змінюються разом із темами й відповідями
+    topic_count = models.PositiveIntegerField(default=0, editable=False)
+    message_count = models.PositiveIntegerField(default=0, editable=False)
+    # Тема з останньою активністю в категорії
+    last_topic = models.ForeignKey(
+        'Topic', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+',
+    )
 
     def __str__(self):
         return self.get_name_display()
@@ -26,6 +34,22 @@ class Topic(models.Model):
     is_closed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Денормалізована активність (forum.activity): оновлюється разом зі
+    # створенням/видаленням відповіді, без підрахунків по Message у списках
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
+    last_message_at = models.DateTimeField(default=timezone.now, editable=False)
+    last_message_author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+',
+    )
+
+    class Meta:
+        # Індекси під курсорну пагінацію за (created_at, id) і за активністю
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['category', '-created_at', '-id']),
+            models.Index(fields=['category', '-is_pinned', '-last_message_at', '-id']),
+            models.Index(fields=['-last_message_at', '-id']),
+        ]
 
     def __str__(self):
         return self.title
@@ -38,4 +62,8 @@ class Message(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['created_at']
\ No newline at end of file
+        ordering = ['created_at']
+        # Сторінки теми та ?after=<id> вибираються за (topic, id)
+        indexes = [
+            models.Index(fields=['topic', 'id']),
+        ]
\ No newline at end of file
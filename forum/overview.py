@@ -0,0 +1,22 @@
+from core.fragment_cache import bump, fragment, get_fragment
+
+from .models import ForumCategory, Topic
+
+
+# Знімок категорій для /forum/. Лічильники оновлюються через queryset.update(),
+# який сигналів не шле, тому forum.activity скидає версію сам (invalidate).
+# Іншим процесам скидання видно лише зі спільним кешем (REDIS_URL/CACHE_DIR),
+# інакше вони віддають знімок до 300 с
+@fragment('forum:categories', depends_on=[ForumCategory, Topic], ttl=300)
+def categories():
+    return list(
+        ForumCategory.objects.select_related('last_topic', 'last_topic__last_message_author').order_by('pk')
+    )
+
+
+def get_categories():
+    return get_fragment('forum:categories')
+
+
+def invalidate():
+    bump(ForumCategory)
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+# Повідомлень на сторінці теми
+FORUM_MESSAGES_PER_PAGE = getattr(settings, 'FORUM_MESSAGES_PER_PAGE', 30)
+# Скільки тримати відрендерену сторінку повідомлень, секунди; нова відповідь,
+# редагування чи видалення змінюють ключ раніше
+FORUM_PAGE_CACHE_TIMEOUT = getattr(settings, 'FORUM_PAGE_CACHE_TIMEOUT', 600)
+
+MESSAGE_LIST_TEMPLATE = 'forum/includes/message_list.html'
+
+
+def messages_queryset(topic):
+    return topic.messages.select_related('author').order_by('pk')
+
+
+async def amessages_state(topic):
+    """Кількість повідомлень, id останнього і час останньої зміни — одним запитом.
+
+    Кількість іде в Paginator, а разом з id і часом складає ключ кешу сторінки.
+    """
+    return await topic.messages.order_by().aaggregate(
+        count=Count('pk'), last_id=Max('pk'), changed=Max('updated_at'),
+    )
+
+
+def page_cache_key(topic_id, number, state, moderator):
+    changed = state['changed'].timestamp() if state['changed'] else 0
+    variant = 'mod' if moderator else 'all'
+    return f"forum:topic:{topic_id}:p{number}:{state['count']}:{state['last_id']}:{changed}:{variant}"
+
+
+def render_messages(messages, moderator):
+    # Кнопки автора рендеряться приховано для всіх, тож HTML не залежить від
+    # користувача; показує їх стиль на сторінці теми (права перевіряють view)
+    return render_to_string(MESSAGE_LIST_TEMPLATE, {'messages': messages, 'moderator': moderator})
+
+
+async def arender_page(topic, page, state, moderator):
+    """HTML сторінки повідомлень з кешу; при промаху — один запит з JOIN автора."""
+    key = page_cache_key(topic.pk, page.number, state, moderator)
+    html = await cache.aget(key)
+    if html is None:
+        queryset = messages_queryset(topic)[page.start_index() - 1:page.end_index()]
+        page.object_list = [message async for message in queryset]
+        html = render_messages(page.object_list, moderator)
+        await cache.aset(key, str(html), FORUM_PAGE_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+async def amessages_after(topic, after_id, limit=FORUM_MESSAGES_PER_PAGE):
+    """Повідомлення з id > after_id (довантаження нових відповідей); ще одне
+    зайве — щоб знати, чи є наступні."""
+    queryset = messages_queryset(topic).filter(pk__gt=after_id)[:limit + 1]
+    rows = [message async for message in queryset]
+    return rows[:limit], len(rows) > limit
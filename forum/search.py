@@ -0,0 +1,156 @@
+import re
+
+from django.db import connections, router
+from django.db.models import BooleanField, Count, ExpressionWrapper, F, IntegerField, OuterRef, Q, Subquery, Value, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Message, Topic
+
+TOPIC_FTS_TABLE = 'forum_topic_fts'
+MESSAGE_FTS_TABLE = 'forum_message_fts'
+TOKEN_RE = re.compile(r'\w+')
+# Скільки відповідей-збігів показувати під темою і скільки слів у фрагменті
+SNIPPETS_PER_TOPIC = 3
+SNIPPET_WORDS = 30
+
+# Вирази мають збігатися з індексами з міграції forum 0006 дослівно
+PG_TOPIC_VECTOR = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(content, ''))"
+PG_MESSAGE_VECTOR = "to_tsvector('simple', text)"
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+def _backend(model):
+    connection = connections[router.db_for_read(model)]
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite':
+        if not hasattr(connection, '_forum_has_fts'):
+            connection._forum_has_fts = TOPIC_FTS_TABLE in connection.introspection.table_names()
+        if connection._forum_has_fts:
+            return 'sqlite'
+    return None
+
+
+def _tsquery(tokens):
+    # Кожне слово — префікс; токени \w+ не містять операторів tsquery
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def _fts5_query(tokens):
+    # Кожне слово — префіксний термін у лапках, тож синтаксис FTS5 з запиту не виконується
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _like_pattern(query):
+    return '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def topic_ids(tokens, query):
+    """Підзапит id тем, у заголовку чи тексті яких є всі слова запиту."""
+    backend = _backend(Topic)
+    if backend == 'postgresql':
+        # tsvector для слів і trigram-індекс для підрядка в заголовку
+        return RawSQL(
+            f"SELECT id FROM forum_topic WHERE {PG_TOPIC_VECTOR} @@ to_tsquery('simple', %s) OR title ILIKE %s",
+            [_tsquery(tokens), _like_pattern(query.strip())],
+        )
+    if backend == 'sqlite':
+        return RawSQL(f'SELECT rowid FROM {TOPIC_FTS_TABLE} WHERE {TOPIC_FTS_TABLE} MATCH %s', [_fts5_query(tokens)])
+    condition = Q()
+    for token in tokens:
+        condition &= Q(title__icontains=token) | Q(content__icontains=token)
+    return Topic.objects.filter(condition).values('pk')
+
+
+def message_ids(tokens):
+    """Підзапит id відповідей, що містять усі слова запиту."""
+    backend = _backend(Message)
+    if backend == 'postgresql':
+        return RawSQL(
+            f"SELECT id FROM forum_message WHERE {PG_MESSAGE_VECTOR} @@ to_tsquery('simple', %s)", [_tsquery(tokens)],
+        )
+    if backend == 'sqlite':
+        return RawSQL(f'SELECT rowid FROM {MESSAGE_FTS_TABLE} WHERE {MESSAGE_FTS_TABLE} MATCH %s', [_fts5_query(tokens)])
+    condition = Q()
+    for token in tokens:
+        condition &= Q(text__icontains=token)
+    return Message.objects.filter(condition).values('pk')
+
+
+def search_topics(query):
+    """Теми, у заголовку/тексті чи відповідях яких є всі слова запиту.
+
+    Одна тема — один рядок: збіги у відповідях згортаються в message_hits.
+    COUNT і LIMIT/OFFSET для сторінки виконуються в БД.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return Topic.objects.none()
+    matched_topics = topic_ids(tokens, query)
+    matching_messages = Message.objects.filter(pk__in=message_ids(tokens))
+    hits = (
+        matching_messages.filter(topic=OuterRef('pk')).order_by()
+        .values('topic').annotate(n=Count('pk')).values('n')
+    )
+    return (
+        Topic.objects.filter(Q(pk__in=matched_topics) | Q(pk__in=matching_messages.values('topic_id')))
+        .select_related('category', 'created_by')
+        .annotate(
+            title_hit=ExpressionWrapper(Q(pk__in=matched_topics), output_field=BooleanField()),
+            message_hits=Coalesce(Subquery(hits, output_field=IntegerField()), Value(0)),
+        )
+        .order_by('-title_hit', '-message_hits', '-last_message_at', '-id')
+    )
+
+
+def highlight(text, tokens, words=None):
+    """Екранований текст з <mark> навколо слів, що починаються з токенів запиту.
+
+    words обрізає текст до фрагмента навколо першого збігу.
+    """
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(token) for token in tokens) + r')\w*', re.IGNORECASE)
+    if words:
+        parts = text.split()
+        first = next((i for i, part in enumerate(parts) if pattern.search(part)), 0)
+        start = max(0, first - words // 3)
+        fragment = ' '.join(parts[start:start + words])
+        text = ('… ' if start else '') + fragment + (' …' if start + words < len(parts) else '')
+    result = []
+    position = 0
+    for match in pattern.finditer(text):
+        result.append(escape(text[position:match.start()]))
+        result.append(f'<mark>{escape(match.group())}</mark>')
+        position = match.end()
+    result.append(escape(text[position:]))
+    return mark_safe(''.join(result))
+
+
+def attach_snippets(topics, query):
+    """Додає темам сторінки title_html, content_snippet і snippets — до
+    SNIPPETS_PER_TOPIC найновіших відповідей-збігів (один запит на сторінку)."""
+    tokens = tokenize(query)
+    topics = list(topics)
+    if not topics or not tokens:
+        return topics
+    messages = (
+        Message.objects.filter(topic__in=topics, pk__in=message_ids(tokens))
+        .select_related('author')
+        .annotate(row=Window(RowNumber(), partition_by=F('topic'), order_by=F('pk').desc()))
+        .filter(row__lte=SNIPPETS_PER_TOPIC)
+        .order_by('topic', '-pk')
+    )
+    by_topic = {}
+    for message in messages:
+        message.snippet = highlight(message.text, tokens, SNIPPET_WORDS)
+        by_topic.setdefault(message.topic_id, []).append(message)
+    for topic in topics:
+        topic.title_html = highlight(topic.title, tokens)
+        topic.content_snippet = highlight(topic.content, tokens, SNIPPET_WORDS * 2)
+        topic.snippets = by_topic.get(topic.pk, [])
+    return topics
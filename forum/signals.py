@@ -0,0 +1,45 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from . import activity
+from .models import Message, Topic
+
+# Теми й категорії, чиї лічильники треба перерахувати після коміту. Видалення
+# через адмінку чи каскадом від користувача обходять view, тож лічильники
+# підтримуються тут, один перерахунок на транзакцію
+_pending = threading.local()
+
+
+def _schedule(topic_id=None, category_id=None):
+    if not hasattr(_pending, 'topics'):
+        _pending.topics, _pending.categories = set(), set()
+    if topic_id is not None:
+        _pending.topics.add(topic_id)
+    if category_id is not None:
+        _pending.categories.add(category_id)
+    # Колбек на кожне видалення: перший забирає все накопичене, решта нічого не
+    # роблять. Після відкату id лишаються до наступного коміту — перерахунок
+    # ідемпотентний, тож це лише зайва робота
+    transaction.on_commit(_flush)
+
+
+def _flush():
+    topics = getattr(_pending, 'topics', None)
+    if not topics and not getattr(_pending, 'categories', None):
+        return
+    categories = _pending.categories
+    del _pending.topics, _pending.categories
+    activity.refresh_topics_and_categories(topics, categories)
+
+
+@receiver(post_delete, sender=Message)
+def forget_message(sender, instance, **kwargs):
+    _schedule(topic_id=instance.topic_id)
+
+
+@receiver(post_delete, sender=Topic)
+def forget_topic(sender, instance, **kwargs):
+    _schedule(category_id=instance.category_id)
@@ -1,3 +1,236 @@
-from django.test import TestCase
+import asyncio
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from accounts.models import User
+from . import activity, live
+from .models import ForumCategory, Message, Topic
+from .views import TopicDetailView
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class TopicDetailViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('author', password='pass')
+        category = ForumCategory.objects.create(name='maps')
+        cls.topic = Topic.objects.create(category=category, title='Mirage', content='Смоки', created_by=cls.user)
+        for n in range(3):
+            Message.objects.create(topic=cls.topic, author=cls.user, text=f'Відповідь {n}')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_topic_detail_pages_are_cached_until_new_reply(self):
+        url = reverse('forum:topic_detail', args=[self.topic.pk])
+        with mock.patch.object(TopicDetailView, 'paginate_by', 2):
+            # Тема, стан повідомлень (COUNT/MAX) і сама сторінка з JOIN автора
+            with self.assertNumQueries(3):
+                response = self.client.get(url)
+            self.assertContains(response, 'Відповідь 1')
+            self.assertNotContains(response, 'Відповідь 2')
+            with self.assertNumQueries(2):
+                self.client.get(url)
+
+            response = self.client.get(url, {'page': 'last'})
+            self.assertEqual(response.context['page_obj'].number, 2)
+            self.assertContains(response, 'Відповідь 2')
+
+            Message.objects.create(topic=self.topic, author=self.user, text='Свіжа відповідь')
+            self.assertContains(self.client.get(url, {'page': 'last'}), 'Свіжа відповідь')
+        self.assertEqual(self.client.get(url, {'page': 5}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('forum:topic_detail', args=[0])).status_code, 404)
+
+    def test_after_returns_only_newer_messages(self):
+        url = reverse('forum:topic_detail', args=[self.topic.pk])
+        first = self.topic.messages.order_by('pk').first()
+        response = self.client.get(url, {'after': first.pk})
+        self.assertNotContains(response, 'Відповідь 0')
+        self.assertContains(response, 'Відповідь 2')
+        self.assertEqual(response['X-Last-Message-Id'], str(self.topic.messages.order_by('pk').last().pk))
+        self.assertEqual(response['X-Has-More'], 'false')
+        self.assertEqual(self.client.get(url, {'after': 'x'}).status_code, 404)
+
+    async def test_topic_detail_under_asgi(self):
+        response = await self.async_client.get(reverse('forum:topic_detail', args=[self.topic.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['paginator'].count, 3)
+        self.assertTrue(response.context['live_updates'])
+        self.assertContains(response, 'Відповідь 0')
+
+    @mock.patch.object(live, 'FORUM_LIVE_STREAM_TIMEOUT', 0.2)
+    @mock.patch.object(live, 'FORUM_LIVE_POLL_INTERVAL', 0.05)
+    async def test_live_stream_sends_messages_after_last_event_id(self):
+        first = await self.topic.messages.order_by('pk').afirst()
+        response = await self.async_client.get(
+            reverse('forum:topic_live', args=[self.topic.pk]), headers={'Last-Event-ID': str(first.pk)},
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        last = await self.topic.messages.order_by('pk').alast()
+        self.assertIn(f'id: {last.pk}\nevent: messages\n', body)
+        self.assertIn('Відповідь 2', body)
+        self.assertNotIn('Відповідь 0', body)
+        self.assertIn(': ping', body)
+        self.assertEqual(live.broker.subscribers(self.topic.pk), 0)
+
+    def test_live_stream_is_not_offered_under_wsgi(self):
+        response = self.client.get(reverse('forum:topic_live', args=[self.topic.pk]))
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(reverse('forum:topic_detail', args=[self.topic.pk]))
+        self.assertFalse(response.context['live_updates'])
+        self.assertNotContains(response, reverse('forum:topic_live', args=[self.topic.pk]))
+
+    async def test_publish_from_another_thread_wakes_subscribers(self):
+        waiter = live.broker.subscribe(self.topic.pk)
+        _, wakeup = waiter
+        try:
+            await sync_to_async(live.publish, thread_sensitive=False)(self.topic.pk)
+            await asyncio.wait_for(wakeup.wait(), 1)
+        finally:
+            live.broker.unsubscribe(self.topic.pk, waiter)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class TopicActivityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('author', password='pass')
+        cls.category = ForumCategory.objects.create(name='maps')
+        cls.old = Topic.objects.create(category=cls.category, title='Стара тема', content='...', created_by=cls.user)
+        cls.new = Topic.objects.create(category=cls.category, title='Нова тема', content='...', created_by=cls.user)
+
+    def test_reply_bumps_topic_and_delete_restores_it(self):
+        self.client.login(username='author', password='pass')
+        self.client.post(reverse('forum:add_message', args=[self.old.pk]), {'text': 'Ап'})
+        self.old.refresh_from_db()
+        message = self.old.messages.get()
+        self.assertEqual(self.old.reply_count, 1)
+        self.assertEqual(self.old.last_message_at, message.created_at)
+        self.assertEqual(self.old.last_message_author, self.user)
+
+        url = reverse('forum:topic_by_category', args=[self.category.pk])
+        # Сесія, користувач, категорія і теми з JOIN авторів — без запиту на кожну тему
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(list(response.context['topics']), [self.old, self.new])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('forum:message_delete', args=[message.pk]))
+        self.old.refresh_from_db()
+        self.assertEqual(self.old.reply_count, 0)
+        self.assertEqual(self.old.last_message_at, self.old.created_at)
+        self.assertIsNone(self.old.last_message_author)
+        response = self.client.get(reverse('forum:latest_topics'))
+        self.assertEqual(list(response.context['topics']), [self.new, self.old])
+
+    def test_counters_survive_deletes_outside_views(self):
+        other = User.objects.create_user('other', password='pass')
+        Message.objects.create(topic=self.old, author=self.user, text='Раз')
+        last = Message.objects.create(topic=self.old, author=other, text='Два')
+        activity.refresh_topics_and_categories([self.old.pk])
+        # Каскад від видалення користувача, як з адмінки
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.old.refresh_from_db()
+        self.category.refresh_from_db()
+        self.assertEqual(self.old.reply_count, 1)
+        self.assertNotEqual(self.old.last_message_at, last.created_at)
+        self.assertEqual((self.category.topic_count, self.category.message_count), (2, 1))
+
+        Topic.objects.filter(pk=self.old.pk).update(reply_count=7)
+        ForumCategory.objects.update(topic_count=0, message_count=0)
+        call_command('recount_forum', stdout=StringIO())
+        self.old.refresh_from_db()
+        self.category.refresh_from_db()
+        self.assertEqual(self.old.reply_count, 1)
+        self.assertEqual((self.category.topic_count, self.category.message_count), (2, 1))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ForumOverviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('author', password='pass')
+        cls.maps = ForumCategory.objects.create(name='maps')
+        cls.memes = ForumCategory.objects.create(name='memes')
+
+    def setUp(self):
+        cache.clear()
+
+    def overview(self):
+        return {category.pk: category for category in self.client.get(reverse('forum:category_list')).context['categories']}
+
+    def test_counters_follow_topic_and_message_writes(self):
+        self.client.login(username='author', password='pass')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('forum:topic_create'), {'category': self.maps.pk, 'title': 'Inferno', 'content': '...'})
+        topic = Topic.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('forum:add_message', args=[topic.pk]), {'text': 'Раз'})
+            self.client.post(reverse('forum:add_message', args=[topic.pk]), {'text': 'Два'})
+
+        maps = self.overview()[self.maps.pk]
+        self.assertEqual((maps.topic_count, maps.message_count, maps.last_topic), (1, 2, topic))
+        self.assertEqual(maps.last_topic.last_message_author, self.user)
+        self.client.logout()
+        # Знімок береться з кешу без жодного запиту
+        with self.assertNumQueries(0):
+            self.client.get(reverse('forum:category_list'))
+
+        self.client.login(username='author', password='pass')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('forum:message_delete', args=[topic.messages.first().pk]))
+            self.client.post(reverse('forum:topic_update', args=[topic.pk]), {'category': self.memes.pk, 'title': 'Inferno', 'content': '...'})
+        categories = self.overview()
+        self.assertEqual((categories[self.maps.pk].topic_count, categories[self.maps.pk].message_count), (0, 0))
+        self.assertIsNone(categories[self.maps.pk].last_topic)
+        self.assertEqual((categories[self.memes.pk].topic_count, categories[self.memes.pk].message_count), (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('forum:topic_delete', args=[topic.pk]))
+        self.assertEqual(self.overview()[self.memes.pk].topic_count, 0)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ForumSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('author', password='pass')
+        category = ForumCategory.objects.create(name='maps')
+        cls.nuke = Topic.objects.create(category=category, title='Раскидки на Nuke', content='Смоки на аутсайд', created_by=cls.user)
+        cls.mirage = Topic.objects.create(category=category, title='Mirage', content='Загальне', created_by=cls.user)
+        for n in range(4):
+            Message.objects.create(topic=cls.mirage, author=cls.user, text=f'Флешка {n} на <b>рампу</b> через nukeбокс')
+        Message.objects.create(topic=cls.mirage, author=cls.user, text='Без збігів')
+
+    def test_results_are_grouped_by_topic_with_highlighted_snippets(self):
+        response = self.client.get(reverse('forum:forum_search'), {'q': 'nuke'})
+        topics = response.context['topics']
+        self.assertEqual([topic.pk for topic in topics], [self.nuke.pk, self.mirage.pk])
+        self.assertEqual(response.context['paginator'].count, 2)
+        self.assertTrue(topics[0].title_hit)
+        self.assertEqual(topics[1].message_hits, 4)
+        # Під темою — лише кілька найновіших відповідей-збігів
+        self.assertEqual(len(topics[1].snippets), 3)
+        self.assertContains(response, 'Раскидки на <mark>Nuke</mark>', html=False)
+        self.assertContains(response, '&lt;b&gt;рампу&lt;/b&gt; через <mark>nukeбокс</mark>', html=False)
+
+        response = self.client.get(reverse('forum:forum_search'), {'q': 'флешка рамп'})
+        self.assertEqual([topic.pk for topic in response.context['topics']], [self.mirage.pk])
+        self.assertFalse(response.context['topics'][0].title_hit)
+        self.assertEqual(list(self.client.get(reverse('forum:forum_search'), {'q': '!!'}).context['topics']), [])
+
+    def test_message_link_opens_page_with_message(self):
+        last = self.mirage.messages.order_by('pk').last()
+        with mock.patch.object(TopicDetailView, 'paginate_by', 2):
+            response = self.client.get(reverse('forum:topic_detail', args=[self.mirage.pk]), {'message': last.pk})
+        self.assertRedirects(
+            response, reverse('forum:topic_detail', args=[self.mirage.pk]) + f'?page=3#message-{last.pk}',
+            fetch_redirect_response=False,
+        )
@@ -17,6 +17,7 @@ urlpatterns = [
     path('topic/<int:pk>/delete/', views.TopicDeleteView.as_view(), name='topic_delete'),
     path('topic/<int:pk>/close/', views.CloseTopicView.as_view(), name='topic_close'),
     path('topic/<int:pk>/pin/', views.PinTopicView.as_view(), name='topic_pin'),
+    path('topic/<int:pk>/live/', views.TopicLiveView.as_view(), name='topic_live'),
     
     # Повідомлення в темах
     path('topic/<int:topic_id>/message/', views.MessageCreateView.as_view(), name='add_message'),
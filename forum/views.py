@@ -1,9 +1,16 @@
-from django.views.generic import ListView, CreateView, DetailView, UpdateView, DeleteView, View
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, View
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.urls import reverse_lazy
-from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse, reverse_lazy
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect
 from django.contrib import messages
-from django.db.models import Q
+from django.db import transaction
+from core.async_views import AsyncTemplateView
+from core.pagination import CursorPaginationMixin
+from . import activity, live, overview, pages
+from . import search as forum_search
 from .models import Topic, Message, ForumCategory
 from .forms import TopicForm, MessageForm
 
@@ -11,21 +18,27 @@ class CategoryListView(ListView):
     model = ForumCategory
     template_name = 'forum/category_list.html'
     context_object_name = 'categories'
+    
+    def get_queryset(self):
+        # Знімок з лічильниками й останньою темою з кешу фрагментів (forum.overview)
+        return overview.get_categories()
 
-class TopicListView(ListView):
+class TopicListView(CursorPaginationMixin, ListView):
     model = Topic
     template_name = 'forum/topic_list.html'
     context_object_name = 'topics'
     paginate_by = 20
+    # Закріплені зверху, далі за останньою відповіддю; індекс (category, -is_pinned, -last_message_at, -id)
+    cursor_ordering = ('-is_pinned', '-last_message_at', '-id')
     
     def get_queryset(self):
         category_id = self.kwargs.get('category_id')
-        queryset = Topic.objects.all()
+        queryset = Topic.objects.select_related('created_by', 'last_message_author')
         
         if category_id:
             queryset = queryset.filter(category_id=category_id)
         
-        return queryset.order_by('-created_at')
+        return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -40,23 +53,107 @@ class TopicCreateView(LoginRequiredMixin, CreateView):
     
     def form_valid(self, form):
         form.instance.created_by = self.request.user
+        with transaction.atomic():
+            response = super().form_valid(form)
+            activity.record_topic(self.object)
         messages.success(self.request, 'Тему успішно створено!')
-        return super().form_valid(form)
+        return response
     
     def get_success_url(self):
         return reverse_lazy('forum:topic_detail', kwargs={'pk': self.object.pk})
 
-class TopicDetailView(DetailView):
-    model = Topic
+class TopicDetailView(AsyncTemplateView):
     template_name = 'forum/topic_detail.html'
-    context_object_name = 'topic'
+    paginate_by = pages.FORUM_MESSAGES_PER_PAGE
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['message_form'] = MessageForm()
-        context['messages'] = self.object.messages.all().order_by('created_at')
+    async def get(self, request, *args, **kwargs):
+        self.topic = await aget_object_or_404(Topic.objects.select_related('created_by', 'category'), pk=self.kwargs['pk'])
+        self.user = await request.auser()
+        self.moderator = self.user.is_authenticated and self.user.is_moderator()
+        if 'after' in request.GET:
+            return await self.get_new_messages()
+        if 'message' in request.GET:
+            return await self.redirect_to_message()
+        return await super().get(request, *args, **kwargs)
+    
+    async def redirect_to_message(self):
+        # ?message=<id> (посилання з пошуку) — на сторінку теми, де є це повідомлення
+        try:
+            message_id = int(self.request.GET['message'])
+        except ValueError:
+            raise Http404('Невірний id повідомлення.')
+        position = await self.topic.messages.filter(pk__lt=message_id).acount()
+        page_number = position // self.paginate_by + 1
+        url = reverse('forum:topic_detail', kwargs={'pk': self.topic.pk})
+        return redirect(f'{url}?page={page_number}#message-{message_id}')
+    
+    async def get_new_messages(self):
+        # ?after=<id> — лише HTML нових відповідей для довантаження на сторінці
+        try:
+            after_id = int(self.request.GET['after'])
+        except ValueError:
+            raise Http404('Невірний id повідомлення.')
+        new_messages, has_more = await pages.amessages_after(self.topic, after_id)
+        response = HttpResponse(pages.render_messages(new_messages, self.moderator))
+        if new_messages:
+            response['X-Last-Message-Id'] = str(new_messages[-1].pk)
+        response['X-Has-More'] = 'true' if has_more else 'false'
+        return response
+    
+    async def aget_context_data(self, **kwargs):
+        context = await super().aget_context_data(**kwargs)
+        topic = self.topic
+        # COUNT для Paginator і ключ кешу сторінки — один запит
+        state = await pages.amessages_state(topic)
+        paginator = Paginator(range(state['count']), self.paginate_by)
+        page_number = self.request.GET.get('page') or 1
+        if page_number == 'last':
+            page_number = paginator.num_pages
+        try:
+            page = paginator.page(page_number)
+        except InvalidPage:
+            raise Http404('Невірний номер сторінки.')
+        
+        context.update({
+            'topic': topic,
+            'object': topic,
+            'message_form': MessageForm(),
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'last_message_id': state['last_id'] or 0,
+            # SSE лише під ASGI, інакше сторінка опитує ?after=
+            'live_updates': isinstance(self.request, ASGIRequest),
+            'messages_html': await pages.arender_page(topic, page, state, self.moderator) if state['count'] else '',
+        })
         return context
 
+class TopicLiveView(View):
+    """Server-sent events: нові відповіді теми без перезавантаження сторінки."""
+    
+    async def get(self, request, pk):
+        if not isinstance(request, ASGIRequest):
+            # Під WSGI (runserver, GUNICORN_WORKER_CLASS=sync) потік зайняв би воркер
+            # на FORUM_LIVE_STREAM_TIMEOUT і нічого не доставив би до кінця;
+            # 204 зупиняє EventSource, сторінка переходить на опитування ?after=
+            return HttpResponse(status=204)
+        topic = await aget_object_or_404(Topic, pk=pk)
+        user = await request.auser()
+        moderator = user.is_authenticated and user.is_moderator()
+        # Після перепідключення EventSource сам надсилає Last-Event-ID
+        last_id = request.headers.get('Last-Event-ID') or request.GET.get('after')
+        if last_id is None:
+            last_id = (await pages.amessages_state(topic))['last_id'] or 0
+        try:
+            last_id = int(last_id)
+        except ValueError:
+            raise Http404('Невірний id повідомлення.')
+        response = StreamingHttpResponse(live.stream(topic, last_id, moderator), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Щоб nginx не буферизував потік
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
 class TopicUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Topic
     form_class = TopicForm
@@ -67,8 +164,13 @@ class TopicUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         return self.request.user == topic.created_by or self.request.user.is_moderator()
     
     def form_valid(self, form):
+        with transaction.atomic():
+            response = super().form_valid(form)
+            if 'category' in form.changed_data:
+                # Тема разом з відповідями переходить в іншу категорію
+                activity.refresh_categories([form.initial['category'], self.object.category_id])
         messages.success(self.request, 'Тему успішно оновлено!')
-        return super().form_valid(form)
+        return response
     
     def get_success_url(self):
         return reverse_lazy('forum:topic_detail', kwargs={'pk': self.object.pk})
@@ -126,11 +228,16 @@ class MessageCreateView(LoginRequiredMixin, CreateView):
         
         form.instance.topic = topic
         form.instance.author = self.request.user
+        with transaction.atomic():
+            response = super().form_valid(form)
+            activity.record_reply(self.object)
+            transaction.on_commit(lambda: live.publish(topic.pk))
         messages.success(self.request, 'Повідомлення додано!')
-        return super().form_valid(form)
+        return response
     
     def get_success_url(self):
-        return reverse_lazy('forum:topic_detail', kwargs={'pk': self.kwargs['topic_id']})
+        url = reverse('forum:topic_detail', kwargs={'pk': self.kwargs['topic_id']})
+        return f'{url}?page=last#message-{self.object.pk}'
 
 class MessageUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Message
@@ -166,25 +273,23 @@ class ForumSearchView(ListView):
     paginate_by = 20
     
     def get_queryset(self):
-        query = self.request.GET.get('q', '')
-        if query:
-            return Topic.objects.filter(
-                Q(title__icontains=query) | 
-                Q(content__icontains=query) |
-                Q(messages__text__icontains=query)
-            ).distinct().order_by('-created_at')
-        return Topic.objects.none()
+        # Індексований пошук по темах і відповідях (forum.search), одна тема — один рядок
+        return forum_search.search_topics(self.request.GET.get('q', ''))
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['query'] = self.request.GET.get('q', '')
+        # Підсвічені фрагменти лише для тем поточної сторінки
+        context['topics'] = context['object_list'] = forum_search.attach_snippets(context['object_list'], context['query'])
         return context
 
-class LatestTopicsView(ListView):
+class LatestTopicsView(CursorPaginationMixin, ListView):
     model = Topic
     template_name = 'forum/latest_topics.html'
     context_object_name = 'topics'
     paginate_by = 20
     
+    cursor_ordering = ('-last_message_at', '-id')
+    
     def get_queryset(self):
-        return Topic.objects.all().order_by('-created_at')
\ No newline at end of file
+        return Topic.objects.select_related('category', 'created_by', 'last_message_author')
\ No newline at end of file
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from core import facets, site_counters
+from core.search import reindex_queryset
+from .likes import recount_likes
 from .models import MediaItem
 
 @admin.register(MediaItem)
@@ -8,8 +11,15 @@ class MediaItemAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description', 'user__username')
     readonly_fields = ('likes', 'created_at')
     
-    actions = ['approve_media']
+    actions = ['approve_media', 'recount_media_likes']
     
     def approve_media(self, request, queryset):
         queryset.update(is_approved=True)
-    approve_media.short_description = "Схвалити вибрані медіа"
\ No newline at end of file
+        reindex_queryset(queryset)
+        site_counters.reconcile(['gallery_approved'])
+        facets.invalidate_model(queryset.model)
+    approve_media.short_description = "Схвалити вибрані медіа"
+    
+    def recount_media_likes(self, request, queryset):
+        recount_likes(queryset)
+    recount_media_likes.short_description = "Перерахувати лайки"
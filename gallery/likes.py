@@ -0,0 +1,43 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from core.counters import BufferedCounter
+from .models import MediaItem, MediaLike
+
+# MediaItem.likes оновлюється пачками з фонового потоку (див. core.counters).
+# Буфер скидається й при нормальному завершенні процесу (atexit; gunicorn і
+# uvicorn завершуються так і на SIGTERM). Після SIGKILL/OOM втрачаються
+# інкременти до COUNTER_FLUSH_INTERVAL секунд — їх відновлює recount_likes
+media_likes = BufferedCounter(MediaItem, 'likes')
+
+
+def like_media(media_item, user):
+    """Зараховує лайк один раз на користувача. Повертає True для нового лайка."""
+    _, created = MediaLike.objects.get_or_create(user=user, media_item=media_item)
+    if created:
+        media_likes.incr(media_item.pk)
+    return created
+
+
+def likes_count(media_item):
+    # Значення з БД плюс ще не скинуті інкременти цього процесу
+    return media_item.likes + media_likes.pending(media_item.pk)
+
+
+@receiver(post_delete, sender=MediaLike)
+def forget_like(sender, instance, **kwargs):
+    # Лайк прибрано (адмінка, видалення користувача) — віднімаємо його з лічильника
+    media_likes.incr(instance.media_item_id, -1)
+
+
+def recount_likes(queryset=None):
+    """Перераховує MediaItem.likes з таблиці MediaLike (адмінка, після втрати буфера)."""
+    media_likes.flush()
+    if queryset is None:
+        queryset = MediaItem.objects.all()
+    liked = MediaLike.objects.filter(media_item_id=OuterRef('pk')).order_by().values('media_item_id')
+    return queryset.update(
+        likes=Coalesce(Subquery(liked.annotate(total=Count('*')).values('total'), output_field=IntegerField()), Value(0)),
+    )
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(fields=['is_approved', '-created_at', '-id'], name='gallery_med_is_appr_80ffe2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(fields=['media_type', 'is_approved', '-created_at', '-id'], name='gallery_med_media_t_a788b7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='gallery_med_user_id_ef1a1e_idx'),
+        ),
+    ]
@@ -18,5 +18,22 @@ class MediaItem(models.Model):
     likes = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Індекси під курсорну пагінацію за (created_at, id)
+        indexes = [
+            models.Index(fields=['is_approved', '-created_at', '-id']),
+            models.Index(fields=['media_type', 'is_approved', '-created_at', '-id']),
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
+
     def __str__(self):
-        return f"{self.user.username}: {self.title or 'Без назви'}"
\ No newline at end of file
+        return f"{self.user.username}: {self.title or 'Без назви'}"
+
+class MediaLike(models.Model):
+    # Хто вже лайкнув медіа — один лайк на користувача
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='media_likes')
+    media_item = models.ForeignKey(MediaItem, on_delete=models.CASCADE, related_name='media_likes')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['user', 'media_item']
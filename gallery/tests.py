@@ -1,3 +1,62 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from accounts.models import User
+from core import counters
+from .likes import media_likes, recount_likes
+from .models import MediaItem, MediaLike
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class MediaLikeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('fan', password='pass12345')
+        self.item = MediaItem.objects.create(
+            user=self.user, title='Ace', media_type='image', is_approved=True, file='gallery/ace.png',
+        )
+        self.client.force_login(self.user)
+        # Фоновий потік скидання в тестах не потрібен: буфер скидаємо явно
+        patcher = mock.patch.object(media_likes, '_ensure_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(media_likes.flush)
+
+    def like(self):
+        return self.client.post(
+            reverse('gallery:like_media', args=[self.item.pk]), HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        ).json()
+
+    def test_like_is_counted_once_per_user_and_flushed_in_batch(self):
+        self.assertEqual(self.like(), {'liked': True, 'likes': 1})
+        self.assertEqual(self.like(), {'liked': False, 'likes': 1})
+        self.assertEqual(MediaLike.objects.count(), 1)
+        # Поки буфер не скинуто, у БД старе значення
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.likes, 0)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(counters.flush_all(), 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.likes, 1)
+        self.assertEqual(media_likes.pending(self.item.pk), 0)
+
+    def test_deleted_like_is_subtracted_and_recount_repairs_lost_increments(self):
+        self.like()
+        media_likes.flush()
+        MediaLike.objects.get().delete()
+        media_likes.flush()
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.likes, 0)
+
+        # Інкремент, загублений разом з процесом, не робить лічильник від'ємним
+        MediaLike.objects.create(user=User.objects.create_user('other'), media_item=self.item)
+        MediaLike.objects.all().delete()
+        media_likes.flush()
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.likes, 0)
+
+        MediaLike.objects.create(user=self.user, media_item=self.item)
+        self.assertEqual(recount_likes(), 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.likes, 1)
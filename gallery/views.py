@@ -6,12 +6,15 @@ from django.contrib import messages
 from django.db.models import Q
 from django.http import JsonResponse
 from django.contrib.auth import get_user_model
-from .models import MediaItem
+from core.facets import get_facets
+from core.pagination import CursorPaginationMixin
+from .models import MediaItem, MediaLike
 from .forms import MediaItemForm
+from .likes import like_media, likes_count
 
 User = get_user_model()
 
-class GalleryListView(ListView):
+class GalleryListView(CursorPaginationMixin, ListView):
     model = MediaItem
     template_name = 'gallery/gallery_list.html'
     context_object_name = 'media_items'
@@ -23,11 +26,11 @@ class GalleryListView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['media_types'] = MediaItem.MEDIA_TYPES
+        context['media_types'] = get_facets('gallery:media_type')['gallery:media_type']
         context['featured'] = MediaItem.objects.filter(is_approved=True).order_by('-likes')[:4]
         return context
 
-class MediaByTypeListView(ListView):
+class MediaByTypeListView(CursorPaginationMixin, ListView):
     model = MediaItem
     template_name = 'gallery/media_by_type.html'
     context_object_name = 'media_items'
@@ -65,6 +68,12 @@ class MediaDetailView(DetailView):
             self.request.user.is_moderator()
         )
         
+        context['likes_count'] = likes_count(media_item)
+        context['has_liked'] = (
+            self.request.user.is_authenticated and
+            MediaLike.objects.filter(user=self.request.user, media_item=media_item).exists()
+        )
+        
         # Додаємо схожі медіа
         context['similar_media'] = MediaItem.objects.filter(
             media_type=media_item.media_type,
@@ -133,14 +142,14 @@ class LikeMediaView(LoginRequiredMixin, View):
     def post(self, request, pk):
         media_item = get_object_or_404(MediaItem, pk=pk)
         
-        # Проста логіка лайків (без збереження хто лайкнув)
-        media_item.likes += 1
-        media_item.save()
+        # Один лайк на користувача; лічильник оновлюється відкладено пачками
+        liked = like_media(media_item, request.user)
         
         # Для AJAX запитів
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
             return JsonResponse({
-                'likes': media_item.likes
+                'liked': liked,
+                'likes': likes_count(media_item)
             })
         
         return redirect('gallery:media_detail', pk=pk)
@@ -184,7 +193,7 @@ class RejectMediaView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         context['is_reject'] = True
         return context
 
-class UserGalleryListView(ListView):
+class UserGalleryListView(CursorPaginationMixin, ListView):
     model = MediaItem
     template_name = 'gallery/user_gallery.html'
     context_object_name = 'media_items'
@@ -215,7 +224,7 @@ class PopularMediaListView(ListView):
     def get_queryset(self):
         return MediaItem.objects.filter(is_approved=True).order_by('-likes')
 
-class LatestMediaListView(ListView):
+class LatestMediaListView(CursorPaginationMixin, ListView):
     model = MediaItem
     template_name = 'gallery/latest_media.html'
     context_object_name = 'media_items'
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.QueryInstrumentationMiddleware',  # Кількість запитів до БД і Server-Timing
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise для статичних файлів
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -69,6 +70,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'group_project.wsgi.application'
+ASGI_APPLICATION = 'group_project.asgi.application'
 
 # Database - використовуємо PostgreSQL на Render.com, SQLite для локальної розробки
 if os.environ.get('DATABASE_URL'):
@@ -133,10 +135,89 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'noreply@cs2microtwitter.com'
 CONTACT_EMAIL = 'contact@cs2microtwitter.com'
 
+# Відкладені лічильники (core.counters): інтервал скидання в БД, секунди
+COUNTER_FLUSH_INTERVAL = int(os.environ.get('COUNTER_FLUSH_INTERVAL', 5))
+
+# Кеш: за замовчуванням пам'ять процесу; CACHE_DIR вмикає файловий кеш,
+# спільний для всіх воркерів на одному сервері, REDIS_URL — спільний для
+# всіх сервісів (веб, воркер задач, cron). Версії фрагментів (core.fragment_cache)
+# мусять бачити всі процеси, тож у продакшені потрібен один з двох останніх
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'cs2-microtwitter',
+        }
+    }
+
+# TTL фрагментів головної сторінки (core.fragments) і /forum/ (forum.overview), секунди
+FRAGMENT_CACHE_TTLS = {
+    'home:latest_posts': 30,
+    'home:trending_hashtags': 60,
+    'home:upcoming_events': 300,
+    'home:latest_announcements': 300,
+    'home:active_votes': 120,
+    'home:stats': 300,
+    'forum:categories': 300,
+}
+
+# Інструментація запитів (core.instrumentation)
+QUERY_BUDGET = int(os.environ['QUERY_BUDGET']) if os.environ.get('QUERY_BUDGET') else None
+QUERY_BUDGETS = {}
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', 'False') == 'True'
+SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('INSTRUMENTATION_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Знімок сторінки статистики (core.stats): максимальний вік, секунди
+STATS_SNAPSHOT_MAX_AGE = int(os.environ.get('STATS_SNAPSHOT_MAX_AGE', 300))
+
+# Завантаження матеріалів (materials.downloads): 'django', 'x-accel' (nginx)
+# або 'x-sendfile'. Для nginx потрібна internal-локація, напр.:
+#   location /protected-media/ { internal; alias /app/media/; }
+MATERIALS_DOWNLOAD_MODE = os.environ.get('MATERIALS_DOWNLOAD_MODE', 'django')
+MATERIALS_X_ACCEL_PREFIX = os.environ.get('MATERIALS_X_ACCEL_PREFIX', '/protected-media/')
+
+# Фонові задачі (core.jobs). Без воркера (локальна розробка) JOBS_EAGER
+# виконує їх одразу після коміту в процесі запиту
+JOBS_EAGER = os.environ.get('JOBS_EAGER', str(DEBUG)) == 'True'
+JOB_QUEUE_CONCURRENCY = {'images': 2}
+# Антивірус для завантажень (core.uploads): dotted-шляхи до scanner(file) -> (чистий?, деталі)
+UPLOAD_SCANNERS = [path for path in os.environ.get('UPLOAD_SCANNERS', '').split(',') if path]
+
 # Security settings for production
 if not DEBUG:
     SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
     SECURE_SSL_REDIRECT = True
+    # Проби балансувальника ходять по HTTP усередині мережі
+    SECURE_REDIRECT_EXEMPT = [r'^healthz$', r'^readyz$']
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     SECURE_HSTS_SECONDS = 31536000
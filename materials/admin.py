@@ -1,9 +1,15 @@
 from django.contrib import admin
-from .models import Material
+from .models import Material, MaterialDownload
 
 @admin.register(Material)
 class MaterialAdmin(admin.ModelAdmin):
     list_display = ('title', 'category', 'downloads', 'created_at')
     list_filter = ('category', 'created_at')
     search_fields = ('title', 'description')
-    readonly_fields = ('downloads', 'created_at', 'updated_at')
\ No newline at end of file
+    readonly_fields = ('downloads', 'created_at', 'updated_at')
+
+@admin.register(MaterialDownload)
+class MaterialDownloadAdmin(admin.ModelAdmin):
+    list_display = ('material', 'user', 'created_at', 'counted')
+    list_filter = ('counted', 'created_at')
+    raw_id_fields = ('material', 'user')
@@ -0,0 +1,233 @@
+import mimetypes
+import os
+import re
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils import timezone
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from .models import Material, MaterialDownload
+
+# Хто віддає байти файлу:
+#   'django'     — сам застосунок (з підтримкою Range)
+#   'x-accel'    — nginx через X-Accel-Redirect на internal-локацію
+#                  MATERIALS_X_ACCEL_PREFIX, що дивиться в MEDIA_ROOT
+#   'x-sendfile' — Apache mod_xsendfile / lighttpd за абсолютним шляхом
+MATERIALS_DOWNLOAD_MODE = getattr(settings, 'MATERIALS_DOWNLOAD_MODE', 'django')
+MATERIALS_X_ACCEL_PREFIX = getattr(settings, 'MATERIALS_X_ACCEL_PREFIX', '/protected-media/')
+DOWNLOAD_CHUNK_SIZE = getattr(settings, 'DOWNLOAD_CHUNK_SIZE', 64 * 1024)
+# Скільки днів тримати вже зведені події (має перекривати найбільше вікно)
+DOWNLOAD_EVENTS_RETENTION_DAYS = getattr(settings, 'DOWNLOAD_EVENTS_RETENTION_DAYS', 90)
+# Вікна для популярних матеріалів: {параметр ?window=: днів або None — за весь час}
+POPULARITY_WINDOWS = {'7d': 7, '30d': 30, 'all': None}
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def file_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """Повертає (start, end) включно або None, якщо віддаємо файл цілком.
+
+    Підтримується один діапазон; кілька діапазонів (multipart/byteranges)
+    RFC 9110 дозволяє проігнорувати й віддати 200.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N — останні N байтів
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def _range_applies(request, etag, last_modified):
+    # If-Range: діапазон дійсний лише для тієї ж версії файлу
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _read_file(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(DOWNLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+async def _aread_file(path, start, length):
+    # Під ASGI синхронний генератор Django вичитав би цілком (sync_to_async(list))
+    # ще до першого байта; тут кожен шматок читається окремо в пулі потоків
+    read_in_thread = partial(sync_to_async, thread_sensitive=False)
+    fh = await read_in_thread(open)(path, 'rb')
+    try:
+        await read_in_thread(fh.seek)(start)
+        while length > 0:
+            chunk = await read_in_thread(fh.read)(min(DOWNLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        await read_in_thread(fh.close)()
+
+
+def serve_file(request, field_file, filename=None):
+    """Відповідь на GET/HEAD файлу з FileField: 200, 206, 304 або 416."""
+    path = field_file.path
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404('Файл не знайдено.')
+
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    filename = filename or os.path.basename(path)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    if MATERIALS_DOWNLOAD_MODE in ('x-accel', 'x-sendfile'):
+        # Python лише авторизує запит; Range і conditional-запити до байтів
+        # обробляє веб-сервер
+        response = HttpResponse(content_type=content_type)
+        if MATERIALS_DOWNLOAD_MODE == 'x-accel':
+            name = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+            response['X-Accel-Redirect'] = quote(MATERIALS_X_ACCEL_PREFIX.rstrip('/') + '/' + name)
+        else:
+            response['X-Sendfile'] = path
+    else:
+        size = stat.st_size
+        byte_range = None
+        header = request.headers.get('Range')
+        if header and _range_applies(request, etag, last_modified):
+            try:
+                byte_range = parse_range(header, size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1 if size else 0
+        reader = _aread_file if isinstance(request, ASGIRequest) else _read_file
+        response = StreamingHttpResponse(reader(path, start, length), content_type=content_type)
+        if byte_range:
+            response.status_code = 206
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
+
+
+def is_new_download(request, response):
+    """Чи рахувати запит як нове завантаження: докачування частинами
+    і 304 лічильник не збільшують."""
+    if request.method != 'GET' or response.status_code not in (200, 206):
+        return False
+    if response.status_code == 206:
+        return response['Content-Range'].startswith('bytes 0-')
+    if response.has_header('X-Accel-Redirect') or response.has_header('X-Sendfile'):
+        # Діапазон обробить веб-сервер — дивимось на сам запит
+        match = RANGE_RE.match(request.headers.get('Range', '').replace(' ', ''))
+        return match is None or match.group(1) == '0'
+    return True
+
+
+def download_material(request, material):
+    response = serve_file(request, material.file)
+    if is_new_download(request, response):
+        # Лише INSERT у журнал; Material.downloads оновлює aggregate_downloads
+        MaterialDownload.objects.create(
+            material=material,
+            user=request.user if request.user.is_authenticated else None,
+        )
+    return response
+
+
+def aggregate_downloads(batch_size=5000):
+    """Зводить ще не враховані події в Material.downloads через F().
+
+    Рядки беруться з SKIP LOCKED, тож кілька паралельних запусків не
+    порахують одну подію двічі. Повертає кількість зведених подій.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                MaterialDownload.objects.filter(counted=False).order_by('pk')
+                .select_for_update(skip_locked=True).values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            per_material = (
+                MaterialDownload.objects.filter(pk__in=ids).order_by()
+                .values('material').annotate(n=Count('pk')).values_list('material', 'n')
+            )
+            by_amount = defaultdict(list)
+            for material_id, amount in per_material:
+                by_amount[amount].append(material_id)
+            # Один UPDATE на кожну різну величину приросту; updated_at не чіпаємо
+            for amount, material_ids in by_amount.items():
+                Material.objects.filter(pk__in=material_ids).update(downloads=F('downloads') + amount)
+            MaterialDownload.objects.filter(pk__in=ids).update(counted=True)
+        total += len(ids)
+
+
+def prune_download_events(days=DOWNLOAD_EVENTS_RETENTION_DAYS):
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = MaterialDownload.objects.filter(counted=True, created_at__lt=cutoff).delete()
+    return deleted
+
+
+def with_recent_downloads(queryset, days):
+    """Анотує recent_downloads — завантаження за останні days днів.
+
+    Події ще не зведені в Material.downloads теж враховуються, тож
+    рейтинг не чекає на aggregate_downloads.
+    """
+    since = timezone.now() - timedelta(days=days)
+    return queryset.annotate(
+        recent_downloads=Count('download_events', filter=Q(download_events__created_at__gte=since)),
+    )
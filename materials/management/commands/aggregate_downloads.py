@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from materials.downloads import DOWNLOAD_EVENTS_RETENTION_DAYS, aggregate_downloads, prune_download_events
+
+
+class Command(BaseCommand):
+    help = 'Зводить журнал завантажень у Material.downloads і видаляє старі події'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--retention-days', type=int, default=DOWNLOAD_EVENTS_RETENTION_DAYS)
+        parser.add_argument('--no-prune', action='store_true', help='Не видаляти зведені події')
+
+    def handle(self, *args, **options):
+        counted = aggregate_downloads(batch_size=options['batch_size'])
+        self.stdout.write(f'Зведено подій: {counted}')
+        if not options['no_prune']:
+            deleted = prune_download_events(options['retention_days'])
+            self.stdout.write(f'Видалено старих подій: {deleted}')
+        self.stdout.write(self.style.SUCCESS('Лічильники завантажень оновлено'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materials', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaterialDownload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('counted', models.BooleanField(default=False)),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='download_events', to='materials.material')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='material_downloads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'material'], name='materials_m_created_e4c563_idx'), models.Index(fields=['material', 'created_at'], name='materials_m_materia_584c80_idx'), models.Index(fields=['counted', 'id'], name='materials_m_counted_0d175b_idx')],
+            },
+        ),
+    ]
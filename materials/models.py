@@ -1,4 +1,5 @@
 from django.db import models
+from django.conf import settings
 
 class Material(models.Model):
     CATEGORY_CHOICES = [
@@ -20,4 +21,23 @@ class Material(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+class MaterialDownload(models.Model):
+    """Журнал завантажень: вставка на кожне завантаження, у Material.downloads
+    зводиться пачками командою aggregate_downloads."""
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='download_events')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='material_downloads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    counted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Вікна популярності: WHERE created_at >= ... GROUP BY material
+            models.Index(fields=['created_at', 'material']),
+            models.Index(fields=['material', 'created_at']),
+            models.Index(fields=['counted', 'id']),
+        ]
+
+    def __str__(self):
+        return f'{self.material_id} @ {self.created_at:%Y-%m-%d %H:%M}'
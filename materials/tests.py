@@ -1,3 +1,90 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from . import downloads
+from .models import Material, MaterialDownload
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, MEDIA_ROOT=MEDIA_ROOT)
+class MaterialDownloadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.material = Material(title='Демка', description='Фінал', category='demos')
+        self.material.file.save('final.dem', ContentFile(b'0123456789'), save=True)
+        self.url = reverse('materials:material_download', args=[self.material.pk])
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_and_ranged_downloads(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.body(response), b'0123456789')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=4-', HTTP_IF_RANGE=response['ETag'])
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 4-9/10')
+        self.assertEqual(self.body(response), b'456789')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(self.body(response), b'789')
+        # If-Range зі старим ETag — файл змінився, віддаємо цілком
+        response = self.client.get(self.url, HTTP_RANGE='bytes=4-', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+        # Докачування частинами не рахується як нове завантаження
+        self.assertEqual(MaterialDownload.objects.filter(material=self.material).count(), 2)
+
+    @mock.patch.object(downloads, 'DOWNLOAD_CHUNK_SIZE', 4)
+    async def test_asgi_download_is_streamed_in_chunks(self):
+        response = await self.async_client.get(self.url, headers={'Range': 'bytes=1-'})
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(chunks, [b'1234', b'5678', b'9'])
+
+    def test_conditional_request_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @mock.patch.object(downloads, 'MATERIALS_DOWNLOAD_MODE', 'x-accel')
+    def test_x_accel_mode_only_authorizes(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.material.file.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_events_are_aggregated_and_ranked_by_window(self):
+        other = Material.objects.create(title='Конфіг', description='cfg', category='configs', downloads=100)
+        MaterialDownload.objects.bulk_create([MaterialDownload(material=self.material) for _ in range(3)])
+        old = MaterialDownload.objects.create(material=other)
+        MaterialDownload.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=40))
+
+        self.assertEqual(downloads.aggregate_downloads(batch_size=2), 4)
+        self.assertEqual(downloads.aggregate_downloads(), 0)
+        self.material.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.material.downloads, other.downloads), (3, 101))
+
+        url = reverse('materials:popular_materials')
+        weekly = self.client.get(url).context['materials']
+        self.assertEqual([m.pk for m in weekly], [self.material.pk, other.pk])
+        all_time = self.client.get(url, {'window': 'all'}).context['materials']
+        self.assertEqual(all_time[0].pk, other.pk)
+
+        self.assertEqual(downloads.prune_download_events(days=30), 1)
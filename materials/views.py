@@ -4,10 +4,10 @@ from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
 from django.db.models import Q
-from django.http import FileResponse
-import os
 from .models import Material
+from core.facets import get_facets
 from .forms import MaterialForm
+from .downloads import POPULARITY_WINDOWS, download_material, with_recent_downloads
 
 class MaterialListView(ListView):
     model = Material
@@ -20,11 +20,8 @@ class MaterialListView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Додаємо підрахунок матеріалів по категоріях
-        context['categories'] = Material.CATEGORY_CHOICES
-        context['category_counts'] = {}
-        for category_value, category_name in Material.CATEGORY_CHOICES:
-            context['category_counts'][category_value] = Material.objects.filter(category=category_value).count()
+        # Категорії з кількістю матеріалів — один кешований GROUP BY (core.facets)
+        context['categories'] = get_facets('materials:category')['materials:category']
         return context
 
 class MaterialCategoryListView(ListView):
@@ -70,15 +67,8 @@ class MaterialDownloadView(View):
         material = get_object_or_404(Material, pk=pk)
         
         if material.file:
-            # Збільшуємо лічильник завантажень
-            material.downloads += 1
-            material.save()
-            
-            # Віддаємо файл для завантаження
-            file_path = material.file.path
-            response = FileResponse(open(file_path, 'rb'))
-            response['Content-Disposition'] = f'attachment; filename="{os.path.basename(file_path)}"'
-            return response
+            # Range, ETag/Last-Modified та X-Accel-Redirect — див. materials.downloads
+            return download_material(request, material)
         else:
             messages.error(request, 'Файл не знайдено.')
             return redirect('materials:material_detail', pk=pk)
@@ -149,8 +139,22 @@ class PopularMaterialListView(ListView):
     context_object_name = 'materials'
     paginate_by = 12
     
+    def get_window(self):
+        window = self.request.GET.get('window', '7d')
+        return window if window in POPULARITY_WINDOWS else '7d'
+    
     def get_queryset(self):
-        return Material.objects.all().order_by('-downloads')
+        days = POPULARITY_WINDOWS[self.get_window()]
+        if days is None:
+            return Material.objects.all().order_by('-downloads', '-pk')
+        # Популярність за вікном, із загальною кількістю як тай-брейком
+        return with_recent_downloads(Material.objects.all(), days).order_by('-recent_downloads', '-downloads', '-pk')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['window'] = self.get_window()
+        context['windows'] = [('7d', 'За тиждень'), ('30d', 'За місяць'), ('all', 'За весь час')]
+        return context
 
 class MaterialUploadView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
     model = Material
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from core import facets, site_counters
+from core.search import reindex_queryset
 from .models import PortfolioItem
 
 @admin.register(PortfolioItem)
@@ -12,4 +14,7 @@ class PortfolioItemAdmin(admin.ModelAdmin):
     
     def approve_items(self, request, queryset):
         queryset.update(is_approved=True)
+        reindex_queryset(queryset)
+        site_counters.reconcile(['portfolio_approved'])
+        facets.invalidate_model(queryset.model)
     approve_items.short_description = "Схвалити вибрані елементи"
\ No newline at end of file
@@ -5,6 +5,7 @@ from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
 from django.db.models import Q
 from django.contrib.auth import get_user_model
+from core.facets import get_facets
 from .models import PortfolioItem
 from .forms import PortfolioItemForm
 
@@ -22,8 +23,9 @@ class PortfolioListView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['item_types'] = PortfolioItem.ITEM_TYPES
-        context['roles'] = PortfolioItem.ROLES
+        facets = get_facets('portfolio:item_type', 'portfolio:role')
+        context['item_types'] = facets['portfolio:item_type']
+        context['roles'] = facets['portfolio:role']
         return context
 
 class UserPortfolioListView(ListView):
@@ -1,17 +1,23 @@
 from django.contrib import admin
 from .models import Post, Comment, Hashtag
+from .likes import recount_likes
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('id', 'short_content', 'author', 'media_type', 'is_pinned', 'created_at')
+    list_display = ('id', 'short_content', 'author', 'media_type', 'is_pinned', 'likes_count', 'created_at')
     list_filter = ('media_type', 'is_pinned', 'created_at')
     search_fields = ('content', 'author__username')
     filter_horizontal = ('hashtags',)
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('likes_count', 'created_at', 'updated_at')
     
     def short_content(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     short_content.short_description = 'Зміст'
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Лайки могли змінитися через форму — синхронізуємо лічильник
+        recount_likes(Post.objects.filter(pk=form.instance.pk))
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
@@ -0,0 +1,76 @@
+import re
+
+from django.db import router
+from django.db.models.signals import m2m_changed
+
+from .models import Hashtag, Post
+
+HASHTAG_RE = re.compile(r'#(\w+)')
+HASHTAG_MAX_LENGTH = Hashtag._meta.get_field('name').max_length
+
+
+def _normalize(name):
+    return name.strip().lower().replace('#', '')[:HASHTAG_MAX_LENGTH]
+
+
+def parse_hashtags(hashtags_text='', content=''):
+    """Збирає хештеги з поля форми (через кому, як і раніше: "smoke spot" —
+    один тег) та #тегів у тексті."""
+    candidates = (hashtags_text or '').split(',')
+    candidates.extend(HASHTAG_RE.findall(content or ''))
+
+    names = []
+    for candidate in candidates:
+        name = _normalize(candidate)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def resolve_hashtags(names):
+    """Повертає Hashtag для кожної назви: один INSERT ... ON CONFLICT DO NOTHING + один SELECT."""
+    if not names:
+        return []
+    Hashtag.objects.bulk_create([Hashtag(name=name) for name in names], ignore_conflicts=True)
+    return list(Hashtag.objects.filter(name__in=names))
+
+
+def _send_m2m_changed(post, action, pk_set):
+    # Зв'язки пишуться напряму в through-таблицю, тож сигнали, які надіслав би
+    # post.hashtags.add()/remove(), шлемо самі
+    m2m_changed.send(
+        sender=Post.hashtags.through, instance=post, action=action, reverse=False,
+        model=Hashtag, pk_set=pk_set, using=router.db_for_write(Post.hashtags.through, instance=post),
+    )
+
+
+def set_post_hashtags(post, names, replace=False):
+    """Встановлює хештеги поста одним INSERT.
+
+    replace=True (редагування) спершу видаляє зв'язки з тегами, яких більше немає.
+    Слухачі m2m_changed (зокрема лічильники трендів, posts.signals) отримують
+    ті самі pre/post_add і pre/post_remove, що й від post.hashtags.
+    """
+    hashtags = resolve_hashtags(names)
+    hashtag_ids = [hashtag.pk for hashtag in hashtags]
+
+    PostHashtag = Post.hashtags.through
+    existing = set()
+    if replace:
+        links = PostHashtag.objects.filter(post_id=post.pk)
+        existing = set(links.values_list('hashtag_id', flat=True))
+        removed = existing.difference(hashtag_ids)
+        if removed:
+            _send_m2m_changed(post, 'pre_remove', removed)
+            links.filter(hashtag_id__in=removed).delete()
+            _send_m2m_changed(post, 'post_remove', removed)
+
+    added = [hashtag_id for hashtag_id in hashtag_ids if hashtag_id not in existing]
+    if added:
+        _send_m2m_changed(post, 'pre_add', set(added))
+        PostHashtag.objects.bulk_create(
+            [PostHashtag(post_id=post.pk, hashtag_id=hashtag_id) for hashtag_id in added],
+            ignore_conflicts=True,
+        )
+        _send_m2m_changed(post, 'post_add', set(added))
+    return hashtags
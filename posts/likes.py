@@ -0,0 +1,50 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef
+
+from .models import Post
+from .querysets import count_of
+
+Like = Post.likes.through
+
+
+def toggle_like(post_id, user_id):
+    """Ставить або знімає лайк. Повертає (liked, likes_count).
+
+    Наявність лайка перевіряється по унікальному індексу (post_id, user_id)
+    таблиці зв'язку, а лічильник змінюється атомарно через F() — без
+    завантаження всіх лайкнувших і без COUNT(*).
+    """
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(post_id=post_id, user_id=user_id).delete()
+        if deleted:
+            liked, delta = False, -deleted
+        else:
+            try:
+                with transaction.atomic():
+                    Like.objects.create(post_id=post_id, user_id=user_id)
+                liked, delta = True, 1
+            except IntegrityError:
+                # Паралельний запит уже поставив лайк
+                liked, delta = True, 0
+
+        likes_count = add_likes(post_id, delta)
+    return liked, likes_count
+
+
+def add_likes(post_id, delta):
+    """Атомарно додає delta до likes_count і повертає нове значення.
+
+    UPDATE блокує рядок до кінця транзакції, тож SELECT після нього бачить
+    саме наш результат, а не значення паралельного запиту.
+    """
+    with transaction.atomic():
+        if delta:
+            Post.objects.filter(pk=post_id).update(likes_count=F('likes_count') + delta)
+        return Post.objects.filter(pk=post_id).values_list('likes_count', flat=True).get()
+
+
+def recount_likes(queryset=None):
+    """Перераховує likes_count з таблиці зв'язку (для адмінки та звірки)."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.update(likes_count=count_of(Like.objects.filter(post_id=OuterRef('pk'))))
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.timeline import TIMELINE_MAX_LENGTH, backfill_timeline
+
+
+class Command(BaseCommand):
+    help = 'Заповнює персональні стрічки з постів користувачів та їхніх підписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Лише ці користувачі (за замовчуванням усі)')
+        parser.add_argument('--max-length', type=int, default=TIMELINE_MAX_LENGTH)
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        total = sum(
+            backfill_timeline(user_id, options['max_length'])
+            for user_id in users.values_list('pk', flat=True).iterator()
+        )
+        self.stdout.write(self.style.SUCCESS(f'Записів стрічки оброблено: {total}'))
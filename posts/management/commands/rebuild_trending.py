@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import TRENDING_WINDOW_HOURS, prune, rebuild
+
+
+class Command(BaseCommand):
+    help = f'Перераховує погодинні лічильники хештегів за останні {TRENDING_WINDOW_HOURS} год.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true',
+                            help='Лише видалити бакети, старші за вікно трендів (для cron)')
+
+    def handle(self, *args, **options):
+        if options['prune']:
+            deleted = prune()
+            self.stdout.write(self.style.SUCCESS(f'Видалено старих бакетів: {deleted}'))
+            return
+        buckets = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Збережено бакетів активності: {buckets}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.timeline import TIMELINE_MAX_LENGTH, trim_timelines
+
+
+class Command(BaseCommand):
+    help = 'Обрізає персональні стрічки до TIMELINE_MAX_LENGTH записів'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-length', type=int, default=TIMELINE_MAX_LENGTH)
+
+    def handle(self, *args, **options):
+        deleted = trim_timelines(options['max_length'])
+        self.stdout.write(self.style.SUCCESS(f'Видалено записів стрічки: {deleted}'))
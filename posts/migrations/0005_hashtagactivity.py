@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_likes_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HashtagActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='posts.hashtag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket'], name='posts_hasht_bucket_85c896_idx')],
+                'unique_together': {('hashtag', 'bucket')},
+            },
+        ),
+    ]
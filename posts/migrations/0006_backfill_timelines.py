@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Q
+
+
+def backfill_timelines(apps, schema_editor):
+    # Те саме, що posts.timeline.backfill_timeline, на історичних моделях:
+    # пости, написані до появи стрічок, у /feed/ не потрапили
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Follow = apps.get_model('accounts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    max_length = getattr(settings, 'TIMELINE_MAX_LENGTH', 500)
+    for user_id in User.objects.values_list('pk', flat=True).iterator():
+        following = Follow.objects.filter(follower_id=user_id).values('following_id')
+        posts = Post.objects.filter(Q(author_id=user_id) | Q(author_id__in=following)).order_by(
+            '-created_at', '-id'
+        ).values_list('pk', 'created_at')
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user_id=user_id, post_id=pk, created_at=created_at) for pk, created_at in posts[:max_length]],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_hashtagactivity'),
+        ('accounts', '0002_follow'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -9,6 +9,21 @@ class Hashtag(models.Model):
     def __str__(self):
         return self.name
 
+class HashtagActivity(models.Model):
+    # Погодинні лічильники використання хештегів для трендів (posts.trending)
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='activity')
+    bucket = models.DateTimeField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['hashtag', 'bucket']
+        indexes = [
+            models.Index(fields=['bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.hashtag_id} @ {self.bucket:%Y-%m-%d %H}: {self.count}"
+
 class Post(models.Model):
     MEDIA_CHOICES = [
         ('image', 'Зображення'),
@@ -23,10 +38,19 @@ class Post(models.Model):
     media_file = models.FileField(upload_to='posts/media/', blank=True, null=True)
     is_pinned = models.BooleanField(default=False)
     likes = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='liked_posts', blank=True)
+    # Денормалізований лічильник лайків, оновлюється через F() у posts.likes
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
     hashtags = models.ManyToManyField(Hashtag, blank=True, related_name='posts')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Індекси під курсорну пагінацію за (created_at, id)
+        indexes = [
+            models.Index(fields=['is_pinned', '-created_at', '-id']),
+            models.Index(fields=['author', '-created_at', '-id']),
+        ]
+
     def __str__(self):
         return f"{self.author.username}: {self.content[:50]}"
 
@@ -41,4 +65,20 @@ class Comment(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"Comment by {self.author.username}"
\ No newline at end of file
+        return f"Comment by {self.author.username}"
+
+class TimelineEntry(models.Model):
+    # Денормалізована стрічка: пост розсилається підписникам при створенні,
+    # тому /feed/ читає лише діапазон за індексом (user, created_at)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['user', 'post']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.post_id}"
@@ -0,0 +1,37 @@
+from django.db.models import Count, Exists, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Post, Comment
+
+
+def count_of(queryset):
+    # Корельований підзапит COUNT замість JOIN + GROUP BY, щоб лічильники
+    # не перемножувалися між собою
+    counted = queryset.order_by().values('post_id').annotate(total=Count('*')).values('total')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def post_cards(queryset=None, user=None):
+    """Queryset для рендеру posts/includes/post_card.html без N+1.
+
+    Автор підтягується JOIN-ом, хештеги — одним prefetch-запитом, а
+    comments_count / is_liked рахуються в тому ж SELECT (likes_count —
+    денормалізована колонка Post).
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+
+    queryset = queryset.select_related('author').prefetch_related('hashtags').annotate(
+        comments_count=count_of(Comment.objects.filter(post_id=OuterRef('pk'))),
+    )
+
+    if user is not None and user.is_authenticated:
+        is_liked = Exists(Post.likes.through.objects.filter(post_id=OuterRef('pk'), user_id=user.pk))
+    else:
+        is_liked = Value(False)
+    return queryset.annotate(is_liked=is_liked)
+
+
+def prefetch_post_cards(user=None, lookup='post'):
+    """Prefetch для моделей, що посилаються на пост (напр. TimelineEntry)."""
+    return Prefetch(lookup, queryset=post_cards(user=user))
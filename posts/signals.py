@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from django.dispatch import receiver
+
+from . import trending
+from .likes import Like, recount_likes
+from .models import Post
+
+User = get_user_model()
+
+
+@receiver(pre_delete, sender=Post)
+def forget_post_hashtags(sender, instance, **kwargs):
+    # Зв'язки з хештегами ще існують — віднімаємо пост із лічильників трендів
+    hashtag_ids = Post.hashtags.through.objects.filter(post_id=instance.pk).values_list('hashtag_id', flat=True)
+    trending.record(list(hashtag_ids), instance.created_at, delta=-1)
+
+
+def _links(instance, reverse, pk_set=None):
+    """Пари (hashtag_id, created_at поста) для зміненого зв'язку."""
+    if not reverse:
+        if pk_set is None:
+            pk_set = instance.hashtags.values_list('pk', flat=True)
+        return [(hashtag_id, instance.created_at) for hashtag_id in pk_set]
+    posts = instance.posts.all() if pk_set is None else Post.objects.filter(pk__in=pk_set)
+    return [(instance.pk, created_at) for created_at in posts.values_list('created_at', flat=True)]
+
+
+@receiver(m2m_changed, sender=Post.hashtags.through)
+def track_hashtag_links(sender, instance, action, reverse, pk_set, **kwargs):
+    # Будь-яка зміна post.hashtags (set_post_hashtags, filter_horizontal в
+    # адмінці) потрапляє в лічильники трендів
+    if action == 'pre_clear':
+        # Після clear() зв'язків уже немає, тож запам'ятовуємо їх заздалегідь
+        instance._cleared_hashtag_links = _links(instance, reverse)
+        return
+    if action == 'post_clear':
+        links, delta = instance.__dict__.pop('_cleared_hashtag_links', []), -1
+    elif action in ('post_add', 'post_remove'):
+        links, delta = _links(instance, reverse, pk_set), 1 if action == 'post_add' else -1
+    else:
+        return
+    by_moment = {}
+    for hashtag_id, created_at in links:
+        by_moment.setdefault(created_at, []).append(hashtag_id)
+    for created_at, hashtag_ids in by_moment.items():
+        trending.record(hashtag_ids, created_at, delta=delta)
+
+
+@receiver(pre_delete, sender=User)
+def remember_liked_posts(sender, instance, **kwargs):
+    # Лайки користувача видаляються каскадом повз toggle_like
+    instance.__dict__['_liked_post_ids'] = list(Like.objects.filter(user_id=instance.pk).values_list('post_id', flat=True))
+
+
+@receiver(post_delete, sender=User)
+def recount_liked_posts(sender, instance, **kwargs):
+    post_ids = instance.__dict__.pop('_liked_post_ids', None)
+    if post_ids:
+        recount_likes(Post.objects.filter(pk__in=post_ids))
@@ -0,0 +1,10 @@
+from core.jobs import task
+from .models import Post
+from . import timeline
+
+
+@task('posts.fan_out')
+def fan_out(post_id):
+    post = Post.objects.filter(pk=post_id).only('pk', 'author_id', 'created_at').first()
+    if post is not None:
+        timeline.fan_out_post(post)
@@ -1,3 +1,205 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import m2m_changed
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import Follow, User
+from .models import Post, Comment, Hashtag, HashtagActivity, TimelineEntry
+from .hashtags import parse_hashtags, set_post_hashtags
+from .likes import toggle_like
+from . import timeline, trending
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PostCardQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pass12345')
+        cls.readers = [User.objects.create_user(f'reader{i}', password='pass12345') for i in range(3)]
+        cls.hashtags = [Hashtag.objects.create(name=name) for name in ('mirage', 'awp', 'ace')]
+
+    def setUp(self):
+        # Тренди кешуються; прогріваємо кеш, щоб він не впливав на підрахунок запитів
+        cache.delete(trending.CACHE_KEY)
+        trending.top_hashtags()
+
+    def create_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(author=self.author, content=f'Пост {i}')
+            post.hashtags.set(self.hashtags)
+            post.likes.set(self.readers)
+            Comment.objects.create(post=post, author=self.readers[0], content='gg')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_post_list_query_count_does_not_grow_with_page_size(self):
+        self.client.force_login(self.readers[0])
+        self.create_posts(2)
+        small_page = self.count_queries(reverse('posts:post_list'))
+        self.create_posts(18)
+        full_page = self.count_queries(reverse('posts:post_list'))
+        self.assertEqual(small_page, full_page)
+
+    def test_hashtag_and_user_lists_query_count_does_not_grow(self):
+        self.create_posts(2)
+        hashtag_small = self.count_queries(reverse('posts:hashtag_posts', args=['mirage']))
+        user_small = self.count_queries(reverse('posts:user_posts', args=[self.author.pk]))
+        self.create_posts(18)
+        self.assertEqual(hashtag_small, self.count_queries(reverse('posts:hashtag_posts', args=['mirage'])))
+        self.assertEqual(user_small, self.count_queries(reverse('posts:user_posts', args=[self.author.pk])))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pass12345')
+        cls.reader = User.objects.create_user('reader', password='pass12345')
+        # Від нових до старих, як у стрічці
+        cls.posts = [Post.objects.create(author=cls.author, content=f'Пост {i}') for i in range(3)][::-1]
+
+    def feed(self, user):
+        self.client.force_login(user)
+        return [entry.post_id for entry in self.client.get(reverse('posts:post_feed')).context['entries']]
+
+    def test_follow_backfills_and_unfollow_removes_author_posts(self):
+        url = reverse('accounts:follow', args=[self.author.pk])
+        self.client.force_login(self.reader)
+        self.assertEqual(self.client.post(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json(), {'following': True})
+        self.assertEqual(self.feed(self.reader), [post.pk for post in self.posts])
+
+        self.assertEqual(self.client.post(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json(), {'following': False})
+        self.assertEqual(self.feed(self.reader), [])
+
+    def test_backfill_covers_posts_written_before_timelines(self):
+        Follow.objects.create(follower=self.reader, following=self.author)
+        own = Post.objects.create(author=self.reader, content='Мій пост')
+        self.assertEqual(self.feed(self.reader), [])
+
+        call_command('backfill_timelines', stdout=StringIO())
+        self.assertEqual(self.feed(self.reader), [own.pk] + [post.pk for post in self.posts])
+        self.assertEqual(self.feed(self.author), [post.pk for post in self.posts])
+        # Повторний запуск не дублює записи
+        self.assertEqual(timeline.backfill_timeline(self.reader.pk, max_length=2), 2)
+        self.assertEqual(TimelineEntry.objects.filter(user=self.reader).count(), 4)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class LikePostViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('fan', password='pass12345')
+        self.post = Post.objects.create(author=self.user, content='clutch 1v5')
+        self.client.force_login(self.user)
+
+    def like(self):
+        return self.client.post(
+            reverse('posts:like_post', args=[self.post.pk]),
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        ).json()
+
+    def test_toggle_updates_denormalized_counter(self):
+        self.assertEqual(self.like(), {'liked': True, 'likes_count': 1})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+        self.assertTrue(self.post.likes.filter(pk=self.user.pk).exists())
+
+        self.assertEqual(self.like(), {'liked': False, 'likes_count': 0})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+        self.assertFalse(self.post.likes.exists())
+
+    def test_counter_is_returned_after_the_update_and_survives_user_deletion(self):
+        # Значення з toggle_like — те, що записане в БД, а не збільшене в пам'яті
+        Post.objects.filter(pk=self.post.pk).update(likes_count=41)
+        self.assertEqual(toggle_like(self.post.pk, self.user.pk), (True, 42))
+        self.assertEqual(toggle_like(self.post.pk, self.user.pk), (False, 41))
+        Post.objects.filter(pk=self.post.pk).update(likes_count=0)
+        self.assertEqual(toggle_like(self.post.pk, self.user.pk), (True, 1))
+
+        other = User.objects.create_user('hater', password='pass12345')
+        toggle_like(self.post.pk, other.pk)
+        other.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+
+
+class HashtagServiceTests(TestCase):
+    def test_parse_splits_field_on_commas_and_collects_inline_tags(self):
+        self.assertEqual(
+            parse_hashtags('#Mirage, smoke spot,, AWP,mirage', 'Ейс на #Inferno і ще #mirage'),
+            ['mirage', 'smoke spot', 'awp', 'inferno'],
+        )
+        self.assertEqual(parse_hashtags('', ''), [])
+
+    def test_set_writes_links_in_bulk_and_sends_m2m_changed(self):
+        post = Post.objects.create(author=User.objects.create_user('tagger'), content='gg')
+        Hashtag.objects.create(name='awp')
+        events = []
+
+        def listener(sender, action, pk_set, **kwargs):
+            events.append((action, {Hashtag.objects.get(pk=pk).name for pk in pk_set}))
+        m2m_changed.connect(listener, sender=Post.hashtags.through)
+        self.addCleanup(m2m_changed.disconnect, listener, sender=Post.hashtags.through)
+
+        # INSERT тегів, SELECT тегів, INSERT зв'язків (+ лічильники трендів)
+        with CaptureQueriesContext(connection) as ctx:
+            set_post_hashtags(post, ['awp', 'ace'])
+        self.assertEqual(sum('"posts_post_hashtags"' in q['sql'] for q in ctx.captured_queries), 1)
+        self.assertEqual(events, [('pre_add', {'awp', 'ace'}), ('post_add', {'awp', 'ace'})])
+
+        events.clear()
+        set_post_hashtags(post, ['ace', 'clutch'], replace=True)
+        self.assertEqual(sorted(post.hashtags.values_list('name', flat=True)), ['ace', 'clutch'])
+        self.assertEqual(events, [
+            ('pre_remove', {'awp'}), ('post_remove', {'awp'}), ('pre_add', {'clutch'}), ('post_add', {'clutch'}),
+        ])
+
+
+class TrendingHashtagsTests(TestCase):
+    def setUp(self):
+        cache.delete(trending.CACHE_KEY)
+        self.author = User.objects.create_user('trender', password='pass12345')
+
+    def create_post(self, names, hours_ago=0):
+        post = Post.objects.create(author=self.author, content='gg')
+        Post.objects.filter(pk=post.pk).update(created_at=timezone.now() - timedelta(hours=hours_ago))
+        post.refresh_from_db()
+        set_post_hashtags(post, names)
+        return post
+
+    def test_recent_activity_outranks_older_activity(self):
+        self.create_post(['old'], hours_ago=20)
+        self.create_post(['old'], hours_ago=20)
+        self.create_post(['fresh'])
+        names = [hashtag.name for hashtag in trending.compute_trending()]
+        self.assertEqual(names, ['fresh', 'old'])
+
+    def test_deleted_post_is_removed_from_counts(self):
+        post = self.create_post(['ace'])
+        post.delete()
+        self.assertEqual(trending.compute_trending(), [])
+
+    def test_direct_m2m_changes_are_counted(self):
+        # Так зберігає зв'язки filter_horizontal в адмінці
+        post = self.create_post(['ace'])
+        awp = Hashtag.objects.create(name='awp')
+        post.hashtags.set([awp])
+        self.assertEqual([hashtag.name for hashtag in trending.compute_trending()], ['awp'])
+        awp.posts.clear()
+        self.assertEqual(trending.compute_trending(), [])
+
+    def test_prune_drops_buckets_outside_window(self):
+        self.create_post(['old'], hours_ago=trending.TRENDING_WINDOW_HOURS + 2)
+        self.create_post(['fresh'])
+        self.assertEqual(trending.prune(), 1)
+        self.assertEqual(list(HashtagActivity.objects.values_list('hashtag__name', flat=True)), ['fresh'])
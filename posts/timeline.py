@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.db.models import Q
+
+from accounts.models import Follow
+from .models import Post, TimelineEntry
+from .querysets import prefetch_post_cards
+
+# Скільки останніх постів тримаємо у стрічці кожного користувача
+TIMELINE_MAX_LENGTH = getattr(settings, 'TIMELINE_MAX_LENGTH', 500)
+# Скільки постів автора копіюємо у стрічку одразу після підписки
+TIMELINE_BACKFILL_SIZE = getattr(settings, 'TIMELINE_BACKFILL_SIZE', 50)
+FAN_OUT_BATCH_SIZE = 1000
+
+
+def deliver(post, user_ids):
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=user_id, post_id=post.pk, created_at=post.created_at) for user_id in user_ids],
+        batch_size=FAN_OUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out_post(post):
+    """Розсилає новий пост у стрічки автора та всіх його підписників."""
+    follower_ids = Follow.objects.filter(following_id=post.author_id).values_list('follower_id', flat=True)
+    recipients = [post.author_id]
+    recipients.extend(follower_ids.iterator())
+    deliver(post, recipients)
+
+
+def backfill_author(user, author):
+    """Додає останні пости автора у стрічку нового підписника."""
+    posts = Post.objects.filter(author=author).order_by('-created_at').values_list('pk', 'created_at')
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user=user, post_id=pk, created_at=created_at) for pk, created_at in posts[:TIMELINE_BACKFILL_SIZE]],
+        ignore_conflicts=True,
+    )
+
+
+def remove_author(user, author):
+    """Прибирає пости автора зі стрічки після відписки."""
+    TimelineEntry.objects.filter(user=user, post__author=author).delete()
+
+
+def follow(user, author):
+    """Підписує користувача на автора. Повертає True, якщо підписка нова."""
+    _, created = Follow.objects.get_or_create(follower=user, following=author)
+    if created:
+        backfill_author(user, author)
+    return created
+
+
+def unfollow(user, author):
+    deleted, _ = Follow.objects.filter(follower=user, following=author).delete()
+    if deleted:
+        remove_author(user, author)
+    return bool(deleted)
+
+
+def backfill_timeline(user_id, max_length=TIMELINE_MAX_LENGTH):
+    """Заповнює стрічку власними постами користувача й постами тих, на кого
+    він підписаний (пости, написані до появи стрічок, fan-out не бачив)."""
+    following = Follow.objects.filter(follower_id=user_id).values('following_id')
+    posts = Post.objects.filter(Q(author_id=user_id) | Q(author_id__in=following)).order_by(
+        '-created_at', '-id'
+    ).values_list('pk', 'created_at')
+    entries = [TimelineEntry(user_id=user_id, post_id=pk, created_at=created_at) for pk, created_at in posts[:max_length]]
+    TimelineEntry.objects.bulk_create(entries, batch_size=FAN_OUT_BATCH_SIZE, ignore_conflicts=True)
+    return len(entries)
+
+
+def timeline_for(user):
+    """Стрічка користувача: діапазон за індексом (user, -created_at, -id)."""
+    return TimelineEntry.objects.filter(user=user).prefetch_related(
+        prefetch_post_cards(user)
+    ).order_by('-created_at', '-id')
+
+
+def trim_timelines(max_length=TIMELINE_MAX_LENGTH):
+    """Видаляє записи стрічок, які вийшли за межі TIMELINE_MAX_LENGTH."""
+    deleted = 0
+    user_ids = TimelineEntry.objects.values_list('user_id', flat=True).distinct()
+    for user_id in user_ids.iterator():
+        boundary = list(TimelineEntry.objects.filter(user_id=user_id).order_by(
+            '-created_at', '-id'
+        ).values_list('created_at', flat=True)[max_length:max_length + 1])
+        if boundary:
+            count, _ = TimelineEntry.objects.filter(user_id=user_id, created_at__lte=boundary[0]).delete()
+            deleted += count
+    return deleted
@@ -0,0 +1,103 @@
+import math
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Hashtag, HashtagActivity
+
+TRENDING_WINDOW_HOURS = getattr(settings, 'TRENDING_WINDOW_HOURS', 24)
+TRENDING_HALF_LIFE_HOURS = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 6)
+TRENDING_TOP_K = getattr(settings, 'TRENDING_TOP_K', 10)
+TRENDING_CACHE_TTL = getattr(settings, 'TRENDING_CACHE_TTL', 60)
+
+CACHE_KEY = 'posts:trending'
+
+
+def bucket_for(moment):
+    """Початок години (UTC), до якої належить момент."""
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def record(hashtag_ids, moment, delta=1):
+    """Додає delta до погодинних лічильників хештегів."""
+    hashtag_ids = list(hashtag_ids)
+    if not hashtag_ids:
+        return
+    bucket = bucket_for(moment)
+    activity = HashtagActivity.objects.filter(hashtag_id__in=hashtag_ids, bucket=bucket)
+    if delta > 0:
+        HashtagActivity.objects.bulk_create(
+            [HashtagActivity(hashtag_id=hashtag_id, bucket=bucket) for hashtag_id in hashtag_ids],
+            ignore_conflicts=True,
+        )
+    else:
+        # Старі бакети могли вже бути видалені — не йдемо в мінус
+        activity = activity.filter(count__gte=-delta)
+    activity.update(count=F('count') + delta)
+
+
+def compute_trending(now=None, limit=TRENDING_TOP_K):
+    """Рахує тренди зі спадаючою вагою: score = Σ count · 2^(-вік / half_life)."""
+    now = now or timezone.now()
+    since = bucket_for(now) - timedelta(hours=TRENDING_WINDOW_HOURS - 1)
+    decay = math.log(2) / TRENDING_HALF_LIFE_HOURS
+
+    scores = defaultdict(float)
+    rows = HashtagActivity.objects.filter(bucket__gte=since, count__gt=0).values_list('hashtag_id', 'bucket', 'count')
+    for hashtag_id, bucket, count in rows:
+        age_hours = max((now - bucket).total_seconds() / 3600, 0)
+        scores[hashtag_id] += count * math.exp(-decay * age_hours)
+
+    top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+    hashtags = Hashtag.objects.in_bulk([hashtag_id for hashtag_id, _ in top])
+    trending = []
+    for hashtag_id, score in top:
+        hashtag = hashtags.get(hashtag_id)
+        if hashtag is not None:
+            hashtag.score = score
+            trending.append(hashtag)
+    return trending
+
+
+def top_hashtags(limit=TRENDING_TOP_K):
+    """Топ-K трендових хештегів з кешу; таблицю зв'язку Post×Hashtag не читає."""
+    trending = cache.get(CACHE_KEY)
+    if trending is None:
+        trending = compute_trending(limit=TRENDING_TOP_K)
+        cache.set(CACHE_KEY, trending, TRENDING_CACHE_TTL)
+    return trending[:limit]
+
+
+def prune(now=None):
+    """Видаляє бакети, старші за вікно трендів (rebuild_trending --prune, щогодини)."""
+    now = now or timezone.now()
+    since = bucket_for(now) - timedelta(hours=TRENDING_WINDOW_HOURS - 1)
+    deleted, _ = HashtagActivity.objects.filter(bucket__lt=since).delete()
+    return deleted
+
+
+def rebuild(now=None):
+    """Перебудовує лічильники за вікно з наявних постів і видаляє старі бакети."""
+    from .models import Post
+
+    now = now or timezone.now()
+    since = bucket_for(now) - timedelta(hours=TRENDING_WINDOW_HOURS - 1)
+    HashtagActivity.objects.all().delete()
+
+    counts = defaultdict(int)
+    links = Post.hashtags.through.objects.filter(post__created_at__gte=since).values_list(
+        'hashtag_id', 'post__created_at'
+    )
+    for hashtag_id, created_at in links.iterator():
+        counts[(hashtag_id, bucket_for(created_at))] += 1
+
+    HashtagActivity.objects.bulk_create(
+        [HashtagActivity(hashtag_id=hashtag_id, bucket=bucket, count=count) for (hashtag_id, bucket), count in counts.items()],
+        batch_size=1000,
+    )
+    cache.delete(CACHE_KEY)
+    return len(counts)
@@ -4,35 +4,42 @@ from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
 from django.db.models import Q
+from asgiref.sync import sync_to_async
+from core import jobs
+from core.async_views import AsyncCursorListView
+from core.pagination import CursorPaginationMixin
 from .models import Post, Comment, Hashtag
 from .forms import PostForm, CommentForm, HashtagForm
+from . import timeline, trending
+from .querysets import post_cards
+from .likes import toggle_like
+from .hashtags import parse_hashtags, set_post_hashtags
 
-class PostListView(ListView):
-    model = Post
+class PostListView(CursorPaginationMixin, AsyncCursorListView):
     template_name = 'posts/post_list.html'
     context_object_name = 'posts'
     paginate_by = 20
     
     def get_queryset(self):
-        queryset = Post.objects.filter(is_pinned=False).order_by('-created_at')
-        return queryset
+        return post_cards(Post.objects.filter(is_pinned=False), self.user).order_by('-created_at')
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['pinned_posts'] = Post.objects.filter(is_pinned=True)
-        context['trending_hashtags'] = Hashtag.objects.all()[:10]  # Топ-10 хештегів
+    async def aget_context_data(self, **kwargs):
+        context = await super().aget_context_data(**kwargs)
+        pinned = post_cards(Post.objects.filter(is_pinned=True), self.user)
+        context['pinned_posts'] = [post async for post in pinned]
+        context['trending_hashtags'] = await sync_to_async(trending.top_hashtags)()  # Топ-10 хештегів
         return context
 
-class PostFeedView(LoginRequiredMixin, ListView):
+class PostFeedView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     model = Post
     template_name = 'posts/post_feed.html'
-    context_object_name = 'posts'
+    context_object_name = 'entries'
     paginate_by = 20
     
     def get_queryset(self):
-        # Показуємо пости від користувачів, на яких підписаний поточний користувач
-        # Поки що просто всі пости
-        return Post.objects.filter(is_pinned=False).order_by('-created_at')
+        # Пости від користувачів, на яких підписаний поточний користувач,
+        # вже розіслані у його стрічку при створенні (див. posts.timeline)
+        return timeline.timeline_for(self.request.user)
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
@@ -43,15 +50,14 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         form.instance.author = self.request.user
         response = super().form_valid(form)
         
-        # Обробка хештегів
-        hashtags_text = form.cleaned_data.get('hashtags', '')
-        if hashtags_text:
-            # Видаляємо символ # якщо він є і розділяємо по комах
-            hashtag_names = [name.strip().lower().replace('#', '') for name in hashtags_text.split(',') if name.strip()]
-            for name in hashtag_names:
-                if name:  # Перевіряємо, що не пустий
-                    hashtag, created = Hashtag.objects.get_or_create(name=name)
-                    self.object.hashtags.add(hashtag)
+        # Обробка хештегів: з поля форми та #тегів у тексті
+        hashtag_names = parse_hashtags(form.cleaned_data.get('hashtags', ''), self.object.content)
+        set_post_hashtags(self.object, hashtag_names)
+        
+        # Автор бачить пост у своїй стрічці одразу, підписникам його
+        # розсилає воркер (задача posts.fan_out)
+        timeline.deliver(self.object, [self.object.author_id])
+        jobs.enqueue('posts.fan_out', post_id=self.object.pk)
         
         messages.success(self.request, 'Пост успішно створено!')
         return response
@@ -64,10 +70,13 @@ class PostDetailView(DetailView):
     template_name = 'posts/post_detail.html'
     context_object_name = 'post'
     
+    def get_queryset(self):
+        return post_cards(user=self.request.user)
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['comment_form'] = CommentForm()
-        context['comments'] = self.object.comments.all()
+        context['comments'] = self.object.comments.select_related('author')
         context['can_edit'] = (
             self.request.user == self.object.author or 
             self.request.user.is_moderator()
@@ -83,21 +92,17 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         post = self.get_object()
         return self.request.user == post.author or self.request.user.is_moderator()
     
+    def get_initial(self):
+        initial = super().get_initial()
+        initial['hashtags'] = ', '.join(f'#{hashtag.name}' for hashtag in self.object.hashtags.all())
+        return initial
+    
     def form_valid(self, form):
         # Оновлюємо хештеги
         response = super().form_valid(form)
         
-        # Очищаємо старі хештеги
-        self.object.hashtags.clear()
-        
-        # Додаємо нові хештеги
-        hashtags_text = form.cleaned_data.get('hashtags', '')
-        if hashtags_text:
-            hashtag_names = [name.strip().lower().replace('#', '') for name in hashtags_text.split(',') if name.strip()]
-            for name in hashtag_names:
-                if name:
-                    hashtag, created = Hashtag.objects.get_or_create(name=name)
-                    self.object.hashtags.add(hashtag)
+        hashtag_names = parse_hashtags(form.cleaned_data.get('hashtags', ''), self.object.content)
+        set_post_hashtags(self.object, hashtag_names, replace=True)
         
         messages.success(self.request, 'Пост успішно оновлено!')
         return response
@@ -160,20 +165,15 @@ class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
 
 class LikePostView(LoginRequiredMixin, View):
     def post(self, request, pk):
-        post = get_object_or_404(Post, pk=pk)
-        if request.user in post.likes.all():
-            post.likes.remove(request.user)
-            liked = False
-        else:
-            post.likes.add(request.user)
-            liked = True
+        post = get_object_or_404(Post.objects.only('pk'), pk=pk)
+        liked, likes_count = toggle_like(post.pk, request.user.pk)
         
         # Для AJAX запитів
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
             from django.http import JsonResponse
             return JsonResponse({
                 'liked': liked,
-                'likes_count': post.likes.count()
+                'likes_count': likes_count
             })
         
         return redirect('posts:post_detail', pk=pk)
@@ -184,7 +184,7 @@ class LikeCommentView(LoginRequiredMixin, View):
         # Тут можна додати логіку для лайків коментарів, якщо потрібно
         return redirect('posts:post_detail', pk=comment.post.pk)
 
-class HashtagPostListView(ListView):
+class HashtagPostListView(CursorPaginationMixin, ListView):
     model = Post
     template_name = 'posts/hashtag_posts.html'
     context_object_name = 'posts'
@@ -193,7 +193,7 @@ class HashtagPostListView(ListView):
     def get_queryset(self):
         hashtag_name = self.kwargs.get('hashtag')
         hashtag = get_object_or_404(Hashtag, name=hashtag_name.lower())
-        return hashtag.posts.filter(is_pinned=False).order_by('-created_at')
+        return post_cards(hashtag.posts.filter(is_pinned=False), self.request.user).order_by('-created_at')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -222,7 +222,7 @@ class PinPostView(LoginRequiredMixin, UserPassesTestMixin, View):
         messages.success(request, f'Пост {action}!')
         return redirect('posts:post_detail', pk=pk)
 
-class UserPostListView(ListView):
+class UserPostListView(CursorPaginationMixin, ListView):
     model = Post
     template_name = 'posts/user_posts.html'
     context_object_name = 'posts'
@@ -230,7 +230,7 @@ class UserPostListView(ListView):
     
     def get_queryset(self):
         user_id = self.kwargs.get('user_id')
-        return Post.objects.filter(author_id=user_id).order_by('-created_at')
+        return post_cards(Post.objects.filter(author_id=user_id), self.request.user).order_by('-created_at')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1,10 +1,11 @@
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, View
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect
 from django.contrib import messages
 from django.utils import timezone
 from django.db.models import Q, Count
+from core.async_views import AsyncTemplateView
 from .models import Vote, VoteOption, UserVote
 from .forms import VoteForm, VoteOptionForm, UserVoteForm
 
@@ -114,17 +115,16 @@ class VoteCastView(LoginRequiredMixin, View):
         messages.success(request, 'Ваш голос враховано!')
         return redirect('votes:vote_results', pk=pk)
 
-class VoteResultsView(DetailView):
-    model = Vote
+class VoteResultsView(AsyncTemplateView):
     template_name = 'votes/vote_results.html'
-    context_object_name = 'vote'
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        vote = self.get_object()
+    async def aget_context_data(self, **kwargs):
+        context = await super().aget_context_data(**kwargs)
+        vote = await aget_object_or_404(Vote, pk=self.kwargs['pk'])
+        context['vote'] = context['object'] = vote
         
         # Збираємо результати
-        options = vote.options.all().order_by('-votes')
+        options = [option async for option in vote.options.order_by('-votes')]
         total_votes = sum(option.votes for option in options)
         
         results = []
@@ -139,8 +139,9 @@ class VoteResultsView(DetailView):
         context['total_votes'] = total_votes
         
         # Перевіряємо, чи користувач голосував
-        if self.request.user.is_authenticated:
-            context['user_voted'] = UserVote.objects.filter(user=self.request.user, vote=vote).exists()
+        user = await self.request.auser()
+        if user.is_authenticated:
+            context['user_voted'] = await UserVote.objects.filter(user=user, vote=vote).aexists()
         
         return context
 